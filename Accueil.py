@@ -0,0 +1,49 @@
+import streamlit as st
+from anisan import noyau, prechargement, profilage
+
+# ---------- APPLICATION MULTIPAGE ----------
+# Point d'entrée unique : streamlit run Accueil.py
+# Les pages (dossier pages/) partagent le noyau anisan.noyau : un seul
+# référentiel, un seul modèle, un seul stockage et des agrégats communs pour
+# toutes les sessions du processus.
+st.set_page_config(page_title="ANISAN", page_icon="🧒🏽", layout="wide")
+profilage.demarrer()
+
+
+def accueil():
+    st.title("🧒🏽 ANISAN - Suivi Nutritionnel de l’Enfant")
+    synthese = noyau.synthese()
+    synthese.actualiser()
+    categories = synthese.cube.par_categorie()
+    total = int(categories.sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("👶 Enfants enregistrés", total)
+    col2.metric("🔴 % MAS", f"{100 * categories.get('MAS', 0) / total:.1f}%" if total else "–")
+    col3.metric("🟠 % MAM", f"{100 * categories.get('MAM', 0) / total:.1f}%" if total else "–")
+    alertes = synthese.surveillance.alertes()
+    if not alertes.empty:
+        st.warning(f"🚨 {len(alertes)} région(s) en alerte cette semaine : voir le tableau de bord.")
+
+    st.page_link(FORMULAIRE, label="Enregistrer un enfant", icon="➕")
+    st.page_link(REGISTRE, label="Consulter le registre", icon="🧾")
+    st.page_link(TABLEAU_DE_BORD, label="Tableau de bord et alertes", icon="📊")
+    st.page_link(CARTE, label="Carte des dépistages", icon="🗺️")
+    st.page_link(PREDICTION, label="Prédiction par l’IA", icon="🧠")
+
+
+FORMULAIRE = st.Page("pages/formulaire.py", title="Formulaire", icon="➕")
+REGISTRE = st.Page("pages/registre.py", title="Registre", icon="🧾")
+TABLEAU_DE_BORD = st.Page("pages/tableau_de_bord.py", title="Tableau de bord", icon="📊")
+CARTE = st.Page("pages/carte.py", title="Carte", icon="🗺️")
+PREDICTION = st.Page("pages/prediction.py", title="Prédiction IA", icon="🧠")
+
+page = st.navigation([st.Page(accueil, title="Accueil", icon="🏠", default=True),
+                      FORMULAIRE, REGISTRE, TABLEAU_DE_BORD, CARTE, PREDICTION])
+noyau.demarrer_archive()
+noyau.demarrer_synchronisation()
+page.run()
+
+profilage.terminer()
+
+prechargement.prechauffer("sklearn.ensemble", "openpyxl", "scipy.spatial", "folium", "streamlit_folium",
+                          modele=True)
@@ -0,0 +1 @@
+# Noyau partagé des applications ANISAN (stockage, classification, modèles...)
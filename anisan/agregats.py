@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+
+# ---------- AGRÉGATS INCRÉMENTAUX ----------
+# Pour chaque groupe (pays, région, tranche d'âge, sexe), un vecteur de compteurs :
+#   n, puis un compteur par catégorie (MAS / MAM / Normal), le nombre
+#   d'enfants émaciés (WHZ < -2), puis pour chaque mesure : nombre de
+#   valeurs, somme, somme des carrés.
+# Un ajout ou une suppression ne touche qu'un vecteur : O(1), quel que soit
+# le nombre d'enfants enregistrés.
+CATEGORIES = ("MAS", "MAM", "Normal")
+METRIQUES = ("pb", "poids", "taille", "whz", "haz", "waz")
+
+# Tranches d'âge des graphiques de anisan_app (2)
+BORNES_AGE = [5, 11, 23, 59]
+TRANCHES_AGE = ["0–5", "6–11", "12–23", "24–59", "60+"]
+
+_EMACIES = 1 + len(CATEGORIES)
+_MESURES = _EMACIES + 1
+_TAILLE = _MESURES + 3 * len(METRIQUES)
+
+
+def tranche_age(age):
+    for borne, tranche in zip(BORNES_AGE, TRANCHES_AGE):
+        if age <= borne:
+            return tranche
+    return TRANCHES_AGE[-1]
+
+
+class Agregats:
+    def __init__(self):
+        self.groupes = {}
+        self._total = np.zeros(_TAILLE)
+
+    def _vecteur(self, categorie, mesures):
+        vecteur = np.zeros(_TAILLE)
+        vecteur[0] = 1
+        if categorie in CATEGORIES:
+            vecteur[1 + CATEGORIES.index(categorie)] = 1
+        for i, metrique in enumerate(METRIQUES):
+            valeur = mesures.get(metrique)
+            if valeur is not None and not math.isnan(valeur):
+                vecteur[_MESURES + 3 * i:_MESURES + 3 * i + 3] = (1, valeur, valeur * valeur)
+        whz = mesures.get("whz")
+        if whz is not None and whz < -2:
+            vecteur[_EMACIES] = 1
+        return vecteur
+
+    def _appliquer(self, signe, pays, region, age, sexe, categorie, mesures):
+        cle = (pays, region, tranche_age(age), sexe)
+        vecteur = signe * self._vecteur(categorie, mesures)
+        groupe = self.groupes.get(cle)
+        if groupe is None:
+            groupe = self.groupes[cle] = np.zeros(_TAILLE)
+        groupe += vecteur
+        self._total += vecteur
+        if groupe[0] <= 0:
+            del self.groupes[cle]
+
+    def ajouter(self, pays, region, age, sexe, categorie, **mesures):
+        self._appliquer(1, pays, region, age, sexe, categorie, mesures)
+
+    def retirer(self, pays, region, age, sexe, categorie, **mesures):
+        self._appliquer(-1, pays, region, age, sexe, categorie, mesures)
+
+    # ---------- LECTURE ----------
+    def _somme(self, pays=None, region=None, tranche=None, sexe=None):
+        if pays is None and region is None and tranche is None and sexe is None:
+            return self._total
+        somme = np.zeros(_TAILLE)
+        for (p, r, t, s), vecteur in self.groupes.items():
+            if ((pays is None or p == pays) and (region is None or r == region)
+                    and (tranche is None or t == tranche) and (sexe is None or s == sexe)):
+                somme += vecteur
+        return somme
+
+    def effectifs(self, dimension="region"):
+        """Nombre d'enfants par pays, région, tranche d'âge ou sexe."""
+        position = ("pays", "region", "tranche", "sexe").index(dimension)
+        resultat = {}
+        for cle, vecteur in self.groupes.items():
+            resultat[cle[position]] = resultat.get(cle[position], 0) + int(round(vecteur[0]))
+        return resultat
+
+    def resume(self, pays=None, region=None, tranche=None, sexe=None):
+        """Effectifs, pourcentages, moyennes et écarts-types ; sans filtre, lecture en O(1)."""
+        somme = self._somme(pays, region, tranche, sexe)
+        n = int(round(somme[0]))
+        resultat = {"total": n}
+        for i, categorie in enumerate(CATEGORIES):
+            effectif = int(round(somme[1 + i]))
+            resultat[categorie] = effectif
+            resultat[f"% {categorie}"] = 100 * effectif / n if n else 0.0
+        resultat["emacies"] = int(round(somme[_EMACIES]))
+        resultat["% emacies"] = 100 * resultat["emacies"] / n if n else 0.0
+        for i, metrique in enumerate(METRIQUES):
+            compte, total, carres = somme[_MESURES + 3 * i:_MESURES + 3 * i + 3]
+            moyenne = float(total / compte) if compte else float("nan")
+            variance = max(carres / compte - moyenne * moyenne, 0.0) if compte else float("nan")
+            resultat[f"{metrique}_moyen"] = moyenne
+            resultat[f"{metrique}_ecart_type"] = math.sqrt(variance)
+        return resultat
@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+# ---------- ARCHIVE EN COLONNES ----------
+# Dépistages historiques en Parquet, partitionnés façon Hive :
+#   archive/pays=Niger/annee=2024/mois=3/lot-….parquet
+# Un filtre sur le pays ou la date n'ouvre que les partitions concernées ;
+# une requête ne lit que les colonnes demandées.
+# L'archive ne fait qu'ajouter : une suppression ou une réévaluation faite
+# ensuite dans le stockage n'y est pas reportée. La tendance pluriannuelle
+# compte donc chaque enfant tel qu'il était au moment de son archivage.
+DOSSIER_ARCHIVE = "archive"
+
+# Fichiers préfixés par « _ » : ignorés par pyarrow.dataset
+FICHIER_ETAT = "_etat.json"
+# Manifeste d'un compactage en cours, dans la partition : fichier produit et fichiers remplacés
+FICHIER_COMPACTAGE = "_compactage.json"
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("nom", pa.string()),
+    ("sexe", pa.string()),
+    ("age", pa.int16()),
+    ("pb", pa.float32()),  # mm, comme dans le stockage
+    ("poids", pa.float32()),
+    ("taille", pa.float32()),
+    ("oedeme", pa.string()),
+    ("region", pa.string()),
+    ("latitude", pa.float32()),
+    ("longitude", pa.float32()),
+    ("prediction", pa.string()),
+    ("recommandation", pa.string()),
+    ("date", pa.timestamp("s")),
+])
+PARTITIONS = pa.schema([("pays", pa.string()), ("annee", pa.int16()), ("mois", pa.int8())])
+PAYS_INCONNU = "Inconnu"
+
+# Une partition qui a accumulé au moins ce nombre de fichiers est réécrite d'un bloc
+SEUIL_COMPACTAGE = 4
+
+_verrou = threading.Lock()
+# Dernier passage du thread d'archivage (affiché dans l'application)
+DERNIER_PASSAGE = {"date": None, "archives": None, "erreur": None}
+
+
+def _partitionnement():
+    return ds.partitioning(PARTITIONS, flavor="hive")
+
+
+def _table(enregistrements):
+    """Table Arrow au SCHEMA, plus les colonnes de partition ; lignes sans date écartées."""
+    df = pd.DataFrame(enregistrements).reindex(columns=SCHEMA.names + ["pays"])
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df[df["date"].notna()]
+    for champ in ("id", "age", "pb", "poids", "taille", "latitude", "longitude"):
+        df[champ] = pd.to_numeric(df[champ], errors="coerce")
+    df["pays"] = df["pays"].fillna(PAYS_INCONNU)
+    df["annee"] = df["date"].dt.year
+    df["mois"] = df["date"].dt.month
+    schema = pa.schema(list(SCHEMA) + list(PARTITIONS))
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+# ---------- ÉCRITURE ----------
+def archiver(enregistrements, dossier=DOSSIER_ARCHIVE):
+    """Ajoute les enregistrements à l'archive : un nouveau fichier par partition touchée."""
+    table = _table(enregistrements)
+    if table.num_rows:
+        with _verrou:
+            ds.write_dataset(
+                table, dossier, format="parquet", partitioning=_partitionnement(),
+                basename_template=f"lot-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+    return table.num_rows
+
+
+def _etat(dossier):
+    chemin = os.path.join(dossier, FICHIER_ETAT)
+    if not os.path.exists(chemin):
+        return {"dernier_id": 0}
+    with open(chemin, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ecrire_json(chemin, contenu):
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(contenu, f)
+    os.replace(chemin + ".tmp", chemin)
+
+
+def _ecrire_etat(dossier, etat):
+    _ecrire_json(os.path.join(dossier, FICHIER_ETAT), etat)
+
+
+def archiver_stockage(stockage, dossier=DOSSIER_ARCHIVE):
+    """Archive les enregistrements du stockage ajoutés depuis le dernier passage, lot par lot.
+
+    L'état est enregistré après chaque lot : une interruption reprend au lot suivant.
+    """
+    os.makedirs(dossier, exist_ok=True)
+    etat = _etat(dossier)
+    n = 0
+    for lot in stockage.par_lots(apres_id=etat["dernier_id"]):
+        n += archiver(lot, dossier)
+        etat["dernier_id"] = lot[-1]["id"]
+        _ecrire_etat(dossier, etat)
+    return n
+
+
+# ---------- LECTURE ----------
+def ensemble(dossier=DOSSIER_ARCHIVE):
+    """Dataset de l'archive, lu par projection en mémoire (mmap) plutôt que par copies."""
+    # Schéma imposé : un dossier encore vide se lit comme une table vide
+    return ds.dataset(dossier, schema=pa.schema(list(SCHEMA) + list(PARTITIONS)), format="parquet",
+                      partitioning=_partitionnement(), filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+def filtre(pays=None, region=None, debut=None, fin=None):
+    """Expression Arrow ; les conditions sur pays / année / mois écartent des partitions entières."""
+    conditions = []
+    if pays is not None:
+        conditions.append(pc.field("pays") == pays)
+    if region is not None:
+        conditions.append(pc.field("region") == region)
+    mois = pc.field("annee").cast(pa.int32()) * 12 + pc.field("mois").cast(pa.int32())
+    if debut is not None:
+        debut = pd.Timestamp(debut)
+        conditions.append(mois >= debut.year * 12 + debut.month)
+        conditions.append(pc.field("date") >= pa.scalar(debut.to_pydatetime(), pa.timestamp("s")))
+    if fin is not None:
+        fin = pd.Timestamp(fin)
+        conditions.append(mois <= fin.year * 12 + fin.month)
+        conditions.append(pc.field("date") <= pa.scalar(fin.to_pydatetime(), pa.timestamp("s")))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def lire(dossier=DOSSIER_ARCHIVE, colonnes=None, pays=None, region=None, debut=None, fin=None):
+    """Table Arrow des seules colonnes et partitions demandées."""
+    if not os.path.isdir(dossier):
+        return pa.table({nom: pa.array([], type=SCHEMA.field(nom).type if nom in SCHEMA.names
+                                       else PARTITIONS.field(nom).type)
+                         for nom in colonnes or SCHEMA.names + PARTITIONS.names})
+    # Le compactage remplace des fichiers : pas de lecture pendant ce temps
+    with _verrou:
+        return ensemble(dossier).to_table(columns=colonnes, filter=filtre(pays, region, debut, fin))
+
+
+def tendance_annuelle(dossier=DOSSIER_ARCHIVE, pays=None, region=None):
+    """Effectif et part de MAS / MAM par année ; ne lit que « prediction » et la partition « annee ».
+
+    Prédictions telles qu'archivées : les enfants supprimés depuis restent comptés.
+    """
+    table = lire(dossier, ["annee", "prediction"], pays=pays, region=region)
+    comptes = table.group_by(["annee", "prediction"]).aggregate([("prediction", "count")]).to_pandas()
+    tableau = comptes.pivot_table(index="annee", columns="prediction", values="prediction_count",
+                                  aggfunc="sum", fill_value=0)
+    resultat = pd.DataFrame({"total": tableau.sum(axis=1)})
+    for categorie in ("MAS", "MAM"):
+        effectif = tableau[categorie] if categorie in tableau else 0
+        resultat[f"% {categorie}"] = 100 * effectif / resultat["total"]
+    return resultat
+
+
+# ---------- COMPACTAGE ----------
+def reprendre_compactages(dossier=DOSSIER_ARCHIVE):
+    """Termine ou annule les compactages interrompus (manifeste encore présent) ; renvoie leur nombre.
+
+    Si le fichier compacté a été mis en place, les fichiers qu'il remplace sont
+    supprimés ; sinon le compactage est abandonné et les originaux restent :
+    dans les deux cas, aucune ligne n'est comptée deux fois.
+    """
+    if not os.path.isdir(dossier):
+        return 0
+    reprises = 0
+    with _verrou:
+        for repertoire, _, fichiers in os.walk(dossier):
+            if FICHIER_COMPACTAGE not in fichiers:
+                continue
+            with open(os.path.join(repertoire, FICHIER_COMPACTAGE), "r", encoding="utf-8") as f:
+                manifeste = json.load(f)
+            if os.path.exists(os.path.join(repertoire, manifeste["resultat"])):
+                for source in manifeste["sources"]:
+                    if os.path.exists(os.path.join(repertoire, source)):
+                        os.remove(os.path.join(repertoire, source))
+            else:
+                provisoire = os.path.join(repertoire, manifeste["provisoire"])
+                if os.path.exists(provisoire):
+                    os.remove(provisoire)
+            os.remove(os.path.join(repertoire, FICHIER_COMPACTAGE))
+            reprises += 1
+    return reprises
+
+
+def compacter(dossier=DOSSIER_ARCHIVE, seuil=SEUIL_COMPACTAGE):
+    """Réécrit en un seul fichier chaque partition qui a accumulé `seuil` petits fichiers."""
+    if not os.path.isdir(dossier):
+        return 0
+    reprendre_compactages(dossier)
+    partitions = {}
+    for fragment in ensemble(dossier).get_fragments():
+        partitions.setdefault(os.path.dirname(fragment.path), []).append(fragment.path)
+    compactees = 0
+    for repertoire, fichiers in partitions.items():
+        if len(fichiers) < seuil:
+            continue
+        with _verrou:
+            table = ds.dataset(fichiers, format="parquet").to_table()
+            nom = f"lot-{uuid.uuid4().hex}-0.parquet"
+            # Préfixe « _ » : un fichier provisoire laissé par un arrêt n'est jamais lu comme une partition
+            provisoire = f"_{nom}.tmp"
+            pq.write_table(table, os.path.join(repertoire, provisoire))
+            # Manifeste écrit avant le renommage : un arrêt entre le renommage et les
+            # suppressions est terminé par reprendre_compactages()
+            manifeste = os.path.join(repertoire, FICHIER_COMPACTAGE)
+            _ecrire_json(manifeste, {"resultat": nom, "provisoire": provisoire,
+                                     "sources": [os.path.basename(fichier) for fichier in fichiers]})
+            os.replace(os.path.join(repertoire, provisoire), os.path.join(repertoire, nom))
+            for fichier in fichiers:
+                os.remove(fichier)
+            os.remove(manifeste)
+        compactees += 1
+    return compactees
+
+
+def demarrer_compactage(dossier=DOSSIER_ARCHIVE, intervalle=3600, stockage=None):
+    """Thread de fond : archive les nouveaux enregistrements (si `stockage`) puis compacte, à intervalle régulier."""
+    def boucle():
+        try:
+            # Compactage interrompu par l'arrêt précédent : terminé avant toute lecture
+            reprendre_compactages(dossier)
+        except Exception:
+            traceback.print_exc()
+        while True:
+            # Une erreur (base verrouillée, écriture Parquet...) est notée, le passage suivant réessaie
+            try:
+                archives = archiver_stockage(stockage, dossier) if stockage is not None else 0
+                compacter(dossier)
+                DERNIER_PASSAGE.update(archives=archives, erreur=None)
+            except Exception as erreur:
+                traceback.print_exc()
+                DERNIER_PASSAGE["erreur"] = f"{type(erreur).__name__} : {erreur}"
+            DERNIER_PASSAGE["date"] = datetime.now()
+            time.sleep(intervalle)
+
+    fil = threading.Thread(target=boucle, name="anisan-archive", daemon=True)
+    fil.start()
+    return fil
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Archive Parquet des dépistages ANISAN")
+    parser.add_argument("action", choices=["archiver", "compacter", "tendance"])
+    parser.add_argument("--source", default="enfants.db")
+    parser.add_argument("--dossier", default=DOSSIER_ARCHIVE)
+    parser.add_argument("--pays")
+    parser.add_argument("--region")
+    args = parser.parse_args(arguments)
+
+    if args.action == "archiver":
+        from anisan.stockage import ouvrir_stockage
+
+        stockage = ouvrir_stockage(args.source)
+        try:
+            n = archiver_stockage(stockage, args.dossier)
+        finally:
+            stockage.fermer()
+        print(f"✅ {n} enregistrements archivés dans {args.dossier} ({datetime.now():%Y-%m-%d %H:%M})")
+    elif args.action == "compacter":
+        print(f"✅ {compacter(args.dossier)} partitions compactées")
+    else:
+        print(tendance_annuelle(args.dossier, args.pays, args.region).round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import functools
+import hashlib
+import json
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from anisan.agregats import CATEGORIES
+
+# ---------- AGRÉGATION SPATIALE ----------
+# Les enfants sont regroupés par cellule d'une grille dont le pas suit le
+# zoom : une cellule fait toujours environ TAILLE_CELLULE pixels à l'écran.
+# Le navigateur ne reçoit que les cellules visibles, jamais les points.
+TAILLE_CELLULE = 48  # pixels
+ZOOM_MIN, ZOOM_MAX = 2, 18
+
+# Couleur selon la malnutrition aiguë globale (MAS + MAM) de la cellule,
+# seuils de sévérité OMS : < 5 %, 5–10 %, 10–15 %, ≥ 15 % (urgence)
+SEUILS_MAG = [0.05, 0.10, 0.15]
+COULEURS = ["#2e7d32", "#fbc02d", "#f57c00", "#c62828"]
+RAYON_MIN, RAYON_MAX = 6, 24  # pixels
+
+
+def pas_grille(zoom):
+    """Pas de la grille en degrés : une tuile de 256 px couvre 360 / 2^zoom degrés."""
+    return 360 / 2 ** int(zoom) * TAILLE_CELLULE / 256
+
+
+def agreger(latitude, longitude, categories, zoom):
+    """Une ligne par cellule non vide : centre de gravité, effectif et répartition par catégorie.
+
+    `categories` : index dans CATEGORIES (MAS, MAM, Normal), -1 si inconnu.
+    """
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    cat = np.asarray(categories, dtype=np.int64)
+    garde = np.isfinite(lat) & np.isfinite(lon)
+    lat, lon, cat = lat[garde], lon[garde], cat[garde]
+
+    pas = pas_grille(zoom)
+    colonne = np.floor(lon / pas).astype(np.int64)
+    ligne = np.floor(lat / pas).astype(np.int64)
+    _, cellule = np.unique((colonne << 32) + (ligne + (1 << 31)), return_inverse=True)
+    nb_cellules = int(cellule.max()) + 1 if len(cellule) else 0
+
+    n = np.bincount(cellule, minlength=nb_cellules)
+    k = len(CATEGORIES) + 1  # dernière colonne : catégorie inconnue
+    repartition = np.bincount(cellule * k + np.where(cat >= 0, cat, k - 1),
+                              minlength=nb_cellules * k).reshape(nb_cellules, k)
+
+    cellules = pd.DataFrame({
+        "latitude": np.bincount(cellule, weights=lat, minlength=nb_cellules) / np.maximum(n, 1),
+        "longitude": np.bincount(cellule, weights=lon, minlength=nb_cellules) / np.maximum(n, 1),
+        "n": n,
+    })
+    for i, categorie in enumerate(CATEGORIES):
+        cellules[categorie] = repartition[:, i]
+    connus = np.maximum(n - repartition[:, -1], 1)
+    mag = (cellules["MAS"] + cellules["MAM"]) / connus
+    cellules["% MAS"] = 100 * cellules["MAS"] / connus
+    cellules["% MAM"] = 100 * cellules["MAM"] / connus
+    cellules["couleur"] = np.array(COULEURS)[np.searchsorted(SEUILS_MAG, mag, side="right")]
+    cellules["rayon"] = RAYON_MIN + (RAYON_MAX - RAYON_MIN) * np.sqrt(n / max(n.max(initial=0), 1))
+    return cellules
+
+
+def visibles(cellules, bornes):
+    """Cellules dont le centre est dans les bornes (sud, ouest, nord, est) ; toutes si bornes est None."""
+    if bornes is None:
+        return cellules
+    sud, ouest, nord, est = bornes
+    dedans = cellules["latitude"].between(sud, nord) & cellules["longitude"].between(ouest, est)
+    return cellules[dedans]
+
+
+class Pyramide:
+    """Agrégats par niveau de zoom, calculés au premier affichage de chaque niveau puis réutilisés."""
+
+    def __init__(self, latitude, longitude, categories):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.categories = categories
+        self.niveaux = {}
+
+    def niveau(self, zoom):
+        zoom = min(max(int(zoom), ZOOM_MIN), ZOOM_MAX)
+        if zoom not in self.niveaux:
+            self.niveaux[zoom] = agreger(self.latitude, self.longitude, self.categories, zoom)
+        return self.niveaux[zoom]
+
+    def visibles(self, zoom, bornes=None):
+        return visibles(self.niveau(zoom), bornes)
+
+
+# ---------- VUE ----------
+def bornes_folium(etat):
+    """(sud, ouest, nord, est) depuis la valeur renvoyée par st_folium, ou None."""
+    bornes = (etat or {}).get("bounds") or {}
+    sud_ouest, nord_est = bornes.get("_southWest") or {}, bornes.get("_northEast") or {}
+    if None in (sud_ouest.get("lat"), sud_ouest.get("lng"), nord_est.get("lat"), nord_est.get("lng")):
+        return None
+    return sud_ouest["lat"], sud_ouest["lng"], nord_est["lat"], nord_est["lng"]
+
+
+def vue_initiale(latitude, longitude, zoom_max=10):
+    """Centre et zoom englobant tous les points : (latitude, longitude, zoom)."""
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    garde = np.isfinite(lat) & np.isfinite(lon)
+    if not garde.any():
+        return 14.5, -5.0, 4
+    lat, lon = lat[garde], lon[garde]
+    etendue = max(lat.max() - lat.min(), lon.max() - lon.min(), 1e-6)
+    zoom = min(max(int(math.log2(360 / etendue)) - 1, ZOOM_MIN), zoom_max)
+    return float((lat.min() + lat.max()) / 2), float((lon.min() + lon.max()) / 2), zoom
+
+
+# Cercles dessinés par Leaflet à partir des propriétés de chaque cellule : pas de
+# style_function folium, qui sérialise un style par entité à chaque rendu
+GABARIT_COUCHE = """
+{% macro script(this, kwargs) %}
+var {{ this.get_name() }} = L.geoJson({{ this.donnees }}, {
+    pointToLayer: function (entite, position) {
+        var p = entite.properties;
+        return L.circleMarker(position, {radius: p.rayon, color: p.couleur, fillColor: p.couleur,
+                                         fillOpacity: 0.7, weight: 2});
+    },
+    onEachFeature: function (entite, couche) {
+        var p = entite.properties;
+        couche.bindTooltip("Enfants : " + p.n + "<br>% MAS : " + p.mas + "<br>% MAM : " + p.mam);
+    }
+}).addTo({{ this._parent.get_name() }});
+{% endmacro %}
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _classe_points():
+    """Élément Leaflet des cellules, créé au premier appel."""
+    from branca.element import Element, Figure, MacroElement
+    from jinja2 import Template
+
+    class Texte(Element):
+        _template = Template("{{ this.texte }}")
+
+        def __init__(self, texte):
+            super().__init__()
+            self.texte = texte
+
+    class PointsCellules(MacroElement):
+        _template = Template(GABARIT_COUCHE)
+
+        def __init__(self, donnees):
+            super().__init__()
+            self._name = "PointsCellules"
+            self.donnees = donnees  # GeoJSON déjà sérialisé
+
+        def render(self, **kwargs):
+            # MacroElement.render recompile le script produit comme gabarit jinja :
+            # plusieurs Mo de GeoJSON à chaque rerun. Le script est ajouté tel quel.
+            figure = self.get_root()
+            assert isinstance(figure, Figure), "Élément à placer dans une carte avant le rendu."
+            figure.script.add_child(Texte(self._template.module.script(self, kwargs)), name=self.get_name())
+
+    return PointsCellules
+
+
+def geojson_cellules(cellules):
+    """Texte GeoJSON des cellules : un point par cellule, effectif, % MAS / MAM, couleur et rayon."""
+    colonnes = ["latitude", "longitude", "n", "% MAS", "% MAM", "couleur", "rayon"]
+    entites = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(float(lon), 5), round(float(lat), 5)]},
+            "properties": {"n": int(n), "mas": round(float(mas)), "mam": round(float(mam)),
+                           "couleur": couleur, "rayon": round(float(rayon), 1)},
+        }
+        for lat, lon, n, mas, mam, couleur, rayon in zip(*(cellules[c] for c in colonnes))
+    ]
+    return json.dumps({"type": "FeatureCollection", "features": entites}, separators=(",", ":"))
+
+
+def couche_folium(cellules, nom="Dépistages"):
+    """FeatureGroup folium : un cercle par cellule, taille selon l'effectif, couleur selon la MAG.
+
+    Le GeoJSON est sérialisé une seule fois, ici : au rendu, st_folium ne fait
+    que l'insérer dans le script de la couche.
+    """
+    import folium  # seules les applications folium en ont besoin
+
+    groupe = folium.FeatureGroup(name=nom)
+    if len(cellules):
+        _classe_points()(geojson_cellules(cellules)).add_to(groupe)
+    return groupe
+
+
+def couche_pydeck(cellules):
+    """ScatterplotLayer pydeck équivalente, rayons en pixels."""
+    import pydeck as pdk
+
+    donnees = cellules.assign(
+        rgb=[[int(c[i:i + 2], 16) for i in (1, 3, 5)] + [180] for c in cellules["couleur"]],
+        pct_mas=cellules["% MAS"].round(0),
+        pct_mam=cellules["% MAM"].round(0),
+    ).drop(columns=["% MAS", "% MAM"])
+    return pdk.Layer(
+        "ScatterplotLayer",
+        data=donnees,
+        get_position=["longitude", "latitude"],
+        get_fill_color="rgb",
+        get_radius="rayon",
+        radius_units="pixels",
+        pickable=True,
+    )
+
+
+# ---------- CACHE DES COUCHES ----------
+def empreinte_cellules(cellules):
+    """Empreinte des cellules affichées (positions, effectifs, répartition) et de leur rendu.
+
+    Le rayon dépend de l'effectif maximal de toutes les cellules, y compris hors
+    de l'écran : il entre dans l'empreinte avec la couleur.
+    """
+    colonnes = ["latitude", "longitude", "n", *CATEGORIES, "rayon", "couleur"]
+    valeurs = pd.util.hash_pandas_object(cellules[colonnes], index=False)
+    return hashlib.blake2b(valeurs.to_numpy().tobytes(), digest_size=16).hexdigest()
+
+
+class CacheCouches:
+    """Couches folium déjà construites, par empreinte des cellules ; les moins récentes sont évincées.
+
+    Une couche garde son GeoJSON déjà sérialisé : un rerun sans changement des
+    données ne refait ni la couche ni son JSON, seul le court script qui
+    l'enveloppe est regénéré par st_folium. Un cache par session : st_folium
+    modifie la couche qu'on lui passe.
+    """
+
+    def __init__(self, taille=32):
+        self.taille = taille
+        self._couches = OrderedDict()
+
+    def obtenir(self, cellules, nom="Dépistages"):
+        cle = (empreinte_cellules(cellules), nom)
+        if cle in self._couches:
+            self._couches.move_to_end(cle)
+        else:
+            self._couches[cle] = couche_folium(cellules, nom)
+            while len(self._couches) > self.taille:
+                self._couches.popitem(last=False)
+        return self._couches[cle]
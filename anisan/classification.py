@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# ---------- TABLES DE RÈGLES ----------
+# Une table par échelle de PB (en cm), versionnée. Les phases vont de la plus
+# grave (code 0) à la moins grave ; l'œdème classe toujours en phase 0.
+#   bornes     : seuils de PB séparant les phases
+#   inclusif   : True si « pb <= borne » (sinon « pb < borne »)
+#   categories : MAS / MAM / Normal, pour les statistiques
+#   codes_whz  : phases données par un poids pour la taille < -3 puis < -2 DS
+CONSEIL_MAS = "Fournir une alimentation thérapeutique d’urgence. Référer à un centre de santé immédiatement."
+CONSEIL_MAM = "Apporter un complément nutritionnel spécifique et surveiller l’état de santé."
+CONSEIL_STRESS = "Renforcer l’alimentation. Suivi mensuel recommandé."
+CONSEIL_NORMAL = "Continuer une alimentation équilibrée. Contrôle régulier mensuel."
+
+REGLES = {
+    # Échelle de type IPC : anisan_app (1), (2), (3) et (5)
+    "ipc": {
+        1: {
+            "bornes": [11.0, 11.5, 12.5, 12.9],
+            "inclusif": True,
+            "couleurs": ["🔴", "🟥", "🟧", "🟨", "🟢"],
+            "phases": ["Famine nutritionnelle", "Urgence nutritionnelle", "Crise nutritionnelle (MAM)",
+                       "Stress nutritionnel", "Phase minimale"],
+            "conseils": [CONSEIL_MAS, CONSEIL_MAS, CONSEIL_MAM, CONSEIL_STRESS, CONSEIL_NORMAL],
+            "categories": ["MAS", "MAS", "MAM", "Normal", "Normal"],
+            "codes_whz": [1, 2],
+        },
+    },
+    # Échelle MAS/MAM : evaluer_statut() de anisan_app.py
+    "mas_mam": {
+        1: {
+            "bornes": [11.5, 12.5, 13.0],
+            "inclusif": False,
+            "couleurs": ["🔴", "🟠", "🟡", "🟢"],
+            "phases": ["MAS (Malnutrition aiguë sévère)", "MAM (Malnutrition aiguë modérée)",
+                       "Stress nutritionnel", "Bonne situation nutritionnelle"],
+            "conseils": [CONSEIL_MAS, CONSEIL_MAM, CONSEIL_STRESS, CONSEIL_NORMAL],
+            "categories": ["MAS", "MAM", "Normal", "Normal"],
+            "codes_whz": [0, 1],
+        },
+    },
+    # Échelle MAS/MAM avec stress jusqu'à 12.9 : anisan_app (4)
+    "mas_mam_129": {
+        1: {
+            "bornes": [11.5, 12.5, 12.9],
+            "inclusif": False,
+            "couleurs": ["🔴🔴", "🟠", "🟡", "🟢"],
+            "phases": ["MAS (Aiguë sévère)", "MAM (Aiguë modérée)", "Stress nutritionnel", "Phase minimale"],
+            "conseils": [CONSEIL_MAS, CONSEIL_MAM, CONSEIL_STRESS, CONSEIL_NORMAL],
+            "categories": ["MAS", "MAM", "Normal", "Normal"],
+            "codes_whz": [0, 1],
+        },
+    },
+}
+
+
+def obtenir_regle(nom="mas_mam", version=None):
+    if nom not in REGLES:
+        raise ValueError(f"Table de règles inconnue : « {nom} »")
+    versions = REGLES[nom]
+    if version is None:
+        version = max(versions)
+    if version not in versions:
+        raise ValueError(f"Version {version} inconnue pour la table « {nom} »")
+    return versions[version]
+
+
+def libelles(regle):
+    return [f"{couleur} {phase}" for couleur, phase in zip(regle["couleurs"], regle["phases"])]
+
+
+def categorie_de(libelle, regle="mas_mam", version=None):
+    """Catégorie MAS / MAM / Normal d'un libellé de phase, sans analyser le texte."""
+    table = obtenir_regle(regle, version)
+    return table["categories"][libelles(table).index(libelle)]
+
+
+def _oedeme_bool(oedeme, n):
+    if oedeme is None:
+        return np.zeros(n, dtype=bool)
+    valeurs = np.asarray(oedeme)
+    if valeurs.dtype == bool:
+        return valeurs
+    if valeurs.dtype.kind in "iuf":
+        return valeurs == 1
+    return np.isin(valeurs.astype(str), ["Oui", "oui", "O", "1", "True"])
+
+
+# ---------- CLASSIFICATION PAR COLONNES ----------
+SEUILS_WHZ = [-3.0, -2.0]
+
+
+def classer_codes(pb, oedeme=None, regle="mas_mam", version=None, whz=None):
+    """Codes de phase (0 = plus grave, -1 = mesure manquante) pour des colonnes entières.
+
+    Si `whz` est fourni, la phase retenue est la plus grave des deux critères
+    (PB et poids pour la taille), comme dans les protocoles PCIMA.
+    """
+    table = obtenir_regle(regle, version)
+    pb = np.asarray(pb, dtype=np.float64)
+    cote = "left" if table["inclusif"] else "right"
+    codes = np.searchsorted(np.asarray(table["bornes"]), pb, side=cote).astype(np.int8)
+    codes = np.where(np.isnan(pb), -1, codes)
+    if whz is not None:
+        whz = np.asarray(whz, dtype=np.float64)
+        dernier = len(table["phases"]) - 1
+        par_whz = np.array(table["codes_whz"] + [dernier])[np.searchsorted(SEUILS_WHZ, whz, side="right")]
+        par_whz = np.where(np.isnan(whz), -1, par_whz)
+        codes = np.select([codes < 0, par_whz < 0], [par_whz, codes], default=np.minimum(codes, par_whz))
+    oedeme = _oedeme_bool(oedeme, len(pb))
+    return np.where(oedeme, 0, codes).astype(np.int8)
+
+
+def _categoriel(valeurs, codes):
+    # Les conseils et catégories se répètent d'une phase à l'autre : on passe
+    # par la liste des valeurs distinctes (le -1 final garde les PB manquants)
+    distinctes = list(dict.fromkeys(valeurs))
+    correspondance = np.array([distinctes.index(v) for v in valeurs] + [-1], dtype=np.int8)
+    return pd.Categorical.from_codes(correspondance[codes], categories=distinctes)
+
+
+def classer(pb, oedeme=None, regle="mas_mam", version=None, whz=None):
+    """Classe des colonnes de PB et d'œdème : codes, libellés, conseils et catégories."""
+    table = obtenir_regle(regle, version)
+    codes = classer_codes(pb, oedeme, regle, version, whz)
+    index = pb.index if isinstance(pb, pd.Series) else None
+    return pd.DataFrame({
+        "code": codes,
+        "phase": pd.Categorical.from_codes(codes, categories=libelles(table)),
+        "conseil": _categoriel(table["conseils"], codes),
+        "categorie": _categoriel(table["categories"], codes),
+    }, index=index)
+
+
+def classer_enfant(pb, oedeme, regle="mas_mam", version=None, whz=None):
+    """Version pour un seul enfant (formulaires) : renvoie (libellé, conseil), (None, None) sans mesure."""
+    table = obtenir_regle(regle, version)
+    code = int(classer_codes([pb], [oedeme], regle, version, None if whz is None else [whz])[0])
+    if code < 0:
+        return None, None
+    return libelles(table)[code], table["conseils"][code]
@@ -0,0 +1,213 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from anisan.agregats import BORNES_AGE, TRANCHES_AGE
+from anisan.classification import obtenir_regle
+
+# ---------- CUBE D'AGRÉGATION ----------
+# Effectifs par pays × région × mois × tranche d'âge × sexe × phase. Une région
+# n'appartient qu'à un pays : le tableau numpy n'a qu'un axe « zone » pour les
+# couples (pays, région) réellement rencontrés, pas leur produit. Un ajout
+# incrémente une case ; un graphique est une coupe du cube (somme sur les
+# autres axes) : son coût dépend du nombre de modalités, pas du nombre
+# d'enfants enregistrés.
+DIMENSIONS = ("pays", "region", "mois", "tranche", "sexe", "phase")
+AXES = ("zone", "mois", "tranche", "sexe", "phase")  # axes du tableau
+GEOGRAPHIE = ("pays", "region")
+INCONNU = "Inconnu"  # pays ou région non renseigné (applications sans carte)
+
+
+def tranches(ages):
+    """Index dans TRANCHES_AGE de chaque âge (mois) : mêmes bornes que agregats.tranche_age."""
+    return np.searchsorted(BORNES_AGE, np.asarray(ages, dtype=np.float64), side="left")
+
+
+def mois_de(dates):
+    """Mois « AAAA-MM » de chaque date."""
+    return np.datetime_as_string(np.asarray(dates, dtype="datetime64[M]"), unit="M")
+
+
+class Cube:
+    def __init__(self, regle="ipc", version=None):
+        # Axes fixes (tranches, phases de la règle, dans l'ordre de gravité) ; les autres grandissent à l'usage
+        self.modalites = {dimension: [] for dimension in DIMENSIONS}
+        self.modalites["tranche"] = list(TRANCHES_AGE)
+        table = obtenir_regle(regle, version)
+        self.modalites["phase"] = list(table["phases"])
+        self.categories = list(table["categories"])  # MAS / MAM / Normal de chaque phase
+        self.zones = []  # (pays, région) de chaque position de l'axe « zone »
+        self._positions = {dimension: {v: i for i, v in enumerate(valeurs)}
+                           for dimension, valeurs in self.modalites.items()}
+        self._positions["zone"] = {}
+        self._tailles = [0, 0, len(TRANCHES_AGE), 0, len(self.modalites["phase"])]
+        self.comptes = np.zeros([max(taille, 1) for taille in self._tailles], dtype=np.int64)
+        self.version = 0
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return int(self.comptes.sum())
+
+    def _modalites_axe(self, axe):
+        return self.zones if axe == "zone" else self.modalites[axe]
+
+    def _indices(self, axe, valeurs):
+        """Position de chaque valeur sur l'axe, en ajoutant les modalités nouvelles."""
+        positions = self._positions[axe]
+        nouvelles = [v for v in dict.fromkeys(valeurs) if v not in positions]
+        if nouvelles:
+            if axe in ("tranche", "phase"):
+                raise ValueError(f"Modalité inconnue pour « {axe} » : {nouvelles[0]}")
+            for valeur in nouvelles:
+                positions[valeur] = len(positions)
+                self._modalites_axe(axe).append(valeur)
+                if axe == "zone":
+                    for dimension, v in zip(GEOGRAPHIE, valeur):
+                        if v not in self._positions[dimension]:
+                            self._positions[dimension][v] = len(self.modalites[dimension])
+                            self.modalites[dimension].append(v)
+            i = AXES.index(axe)
+            self._tailles[i] = len(positions)
+            if self._tailles[i] > self.comptes.shape[i]:
+                # Capacité augmentée de moitié : une copie du tableau de loin en loin, pas à chaque nouveau mois
+                marge = [(0, 0)] * len(AXES)
+                marge[i] = (0, max(self.comptes.shape[i] * 3 // 2 + 1, self._tailles[i]) - self.comptes.shape[i])
+                self.comptes = np.pad(self.comptes, marge)
+        return np.fromiter((positions[v] for v in valeurs), dtype=np.intp, count=len(valeurs))
+
+    # ---------- ÉCRITURE ----------
+    def ajouter_lot(self, pays, regions, dates, ages, sexes, phases, signe=1):
+        """Ajout vectorisé (chargement initial). `phases` : codes de phase, -1 (PB manquant) ignoré."""
+        phases = np.asarray(phases, dtype=np.int64)
+        jours = np.asarray(dates, dtype="datetime64[D]")
+        garde = (phases >= 0) & ~np.isnat(jours)
+        pays = np.broadcast_to(np.asarray(pays, dtype=object), phases.shape)[garde]
+        regions = np.broadcast_to(np.asarray(regions, dtype=object), phases.shape)[garde]
+        colonnes = {
+            "zone": (pays, regions),
+            # Mois en entiers : factorisés sans passer par le texte, libellés « AAAA-MM » ensuite
+            "mois": jours[garde].astype("datetime64[M]").astype(np.int64),
+            "tranche": tranches(np.asarray(ages)[garde]),
+            "sexe": np.asarray(sexes, dtype=object)[garde],
+            "phase": phases[garde],
+        }
+        with self._verrou:
+            index = []
+            for axe in AXES:
+                if axe in ("tranche", "phase"):
+                    index.append(colonnes[axe])
+                    continue
+                # Une recherche de position par modalité distincte, pas par ligne
+                if axe == "zone":
+                    # Couples (pays, région) factorisés par leurs codes entiers, sans tuple par ligne
+                    codes_pays, noms_pays = pd.factorize(colonnes[axe][0], use_na_sentinel=False)
+                    codes_regions, noms_regions = pd.factorize(colonnes[axe][1], use_na_sentinel=False)
+                    codes, couples = pd.factorize(codes_pays * len(noms_regions) + codes_regions)
+                    noms_pays = [INCONNU if pd.isna(v) else v for v in noms_pays]
+                    noms_regions = [INCONNU if pd.isna(v) else v for v in noms_regions]
+                    distinctes = [(noms_pays[c // len(noms_regions)], noms_regions[c % len(noms_regions)])
+                                  for c in couples]
+                else:
+                    codes, distinctes = pd.factorize(colonnes[axe], use_na_sentinel=False)
+                    if axe == "mois":
+                        distinctes = mois_de(np.asarray(distinctes).astype("datetime64[M]")).tolist()
+                    else:
+                        distinctes = [INCONNU if pd.isna(v) else v for v in distinctes]
+                index.append(self._indices(axe, list(distinctes))[codes])
+            cases = np.ravel_multi_index(index, self.comptes.shape)
+            np.add.at(self.comptes.reshape(-1), cases, signe)
+            self.version += 1
+
+    def ajouter(self, pays, region, date_mesure, age, sexe, phase):
+        self.ajouter_lot([pays], [region], [date_mesure], [age], [sexe], [phase])
+
+    def retirer(self, pays, region, date_mesure, age, sexe, phase):
+        self.ajouter_lot([pays], [region], [date_mesure], [age], [sexe], [phase], signe=-1)
+
+    # ---------- LECTURE ----------
+    def coupe(self, *axes, **filtres):
+        """Effectifs selon un ou deux axes, après filtrage (valeur ou liste de valeurs) des autres.
+
+        coupe("phase", sexe="F") → Series par phase ; coupe("tranche", "sexe") → DataFrame.
+        """
+        with self._verrou:
+            comptes = self.comptes[tuple(slice(0, taille) for taille in self._tailles)]
+            etiquettes = {dimension: list(valeurs) for dimension, valeurs in self.modalites.items()}
+            zones = list(self.zones)
+            for dimension, valeurs in filtres.items():
+                if valeurs is None:  # pas de filtre sur cet axe
+                    continue
+                valeurs = valeurs if isinstance(valeurs, (list, tuple, set)) else [valeurs]
+                etiquettes[dimension] = [v for v in valeurs if v in self._positions[dimension]]
+                if dimension in GEOGRAPHIE:
+                    continue
+                positions = [self._positions[dimension][v] for v in etiquettes[dimension]]
+                comptes = np.take(comptes, positions, axis=AXES.index(dimension))
+            # Filtres pays / région : zones retenues, dans l'ordre de l'axe
+            i = [self._positions["zone"][zone] for zone in zones
+                 if all(filtres.get(d) is None or zone[k] in etiquettes[d] for k, d in enumerate(GEOGRAPHIE))]
+            comptes = np.take(comptes, i, axis=0)
+            zones = [zones[k] for k in i]
+
+            geographie = [a for a in axes if a in GEOGRAPHIE]
+            internes = (["zone"] if geographie else []) + [a for a in axes if a not in GEOGRAPHIE]
+            gardes = [AXES.index(a) for a in internes]
+            somme = comptes.sum(axis=tuple(k for k in range(len(AXES)) if k not in gardes))
+            noms = [a for a in AXES if a in internes]  # ordre des axes de `somme`
+            if geographie:
+                # Zones ventilées sur les pays et/ou régions demandés : produit par une matrice d'appartenance
+                tailles = [len(etiquettes[d]) for d in geographie]
+                appartenance = np.zeros((len(zones), int(np.prod(tailles))), dtype=np.int64)
+                for k, zone in enumerate(zones):
+                    valeurs = dict(zip(GEOGRAPHIE, zone))
+                    if all(valeurs[d] in etiquettes[d] for d in geographie):
+                        case = np.ravel_multi_index([etiquettes[d].index(valeurs[d]) for d in geographie], tailles)
+                        appartenance[k, case] = 1
+                somme = np.tensordot(appartenance, somme, axes=([0], [0])).reshape(tailles + list(somme.shape[1:]))
+                noms = geographie + noms[1:]
+            index = [pd.Index(etiquettes[a], name=a) for a in axes]
+        if len(axes) == 1:
+            serie = pd.Series(somme, index=index[0], name="effectif")
+            # Les mois sont ajoutés dans l'ordre d'arrivée : remis dans l'ordre chronologique
+            return serie.sort_index() if axes[0] == "mois" else serie
+        # Axes de la somme remis dans l'ordre demandé
+        somme = np.transpose(somme, [noms.index(a) for a in axes])
+        tableau = pd.DataFrame(somme, index=index[0], columns=index[1])
+        return tableau.sort_index() if axes[0] == "mois" else tableau
+
+    def total(self, **filtres):
+        return int(self.coupe("phase", **filtres).sum())
+
+    def par_categorie(self, **filtres):
+        """Effectifs MAS / MAM / Normal : phases regroupées selon la règle."""
+        return self.coupe("phase", **filtres).groupby(self.categories, sort=False).sum()
+
+
+# ---------- AFFICHAGE STREAMLIT ----------
+def afficher(cube, cle="cube"):
+    """Graphiques par phase, sexe et tranche d'âge, avec un filtre de drill-down sur les deux derniers."""
+    import streamlit as st  # seules les applications en ont besoin
+
+    zone_sexe, zone_tranche = st.columns(2)
+    sexe = zone_sexe.selectbox("Sexe", cube.modalites["sexe"], index=None, key=f"{cle}_sexe",
+                               placeholder="Tous")
+    tranche = zone_tranche.selectbox("Tranche d’âge", cube.modalites["tranche"], index=None,
+                                     key=f"{cle}_tranche", placeholder="Toutes")
+    filtres = {"sexe": sexe, "tranche": tranche}
+    par_phase = cube.coupe("phase", **filtres)
+    categories = cube.par_categorie(**filtres)
+    total = int(par_phase.sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("👶 Enfants", total)
+    col2.metric("🔴 % MAS", f"{100 * categories.get('MAS', 0) / total:.1f}%" if total else "–")
+    col3.metric("🟠 % MAM", f"{100 * categories.get('MAM', 0) / total:.1f}%" if total else "–")
+
+    st.markdown("### 📌 Nombre d’enfants par phase nutritionnelle")
+    st.bar_chart(par_phase)
+
+    st.markdown("### 👦👧 Répartition par sexe")
+    st.bar_chart(cube.coupe("sexe", tranche=tranche))
+
+    st.markdown("### ⏳ Répartition par tranche d’âge (mois)")
+    st.bar_chart(cube.coupe("tranche", sexe=sexe))
@@ -0,0 +1,135 @@
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+from anisan.classification import classer
+from anisan.inference import COLONNES_MODELE, preparer_entrees
+from anisan.modele import DOSSIER_MODELES, empreinte_fichier, versions_existantes
+
+CLASSES = ["Normal", "MAM", "MAS"]
+
+# Les dix enfants de démonstration de anisan_app (7) (classes 0 = Normal, 1 = MAM, 2 = MAS)
+DONNEES_DEMO = pd.DataFrame(
+    [[6.0, 5.2, 60.0, 11.2, 0.0, 1.0, 2], [12.0, 7.8, 72.0, 13.4, 0.0, 0.0, 0],
+     [24.0, 10.5, 85.0, 14.1, 0.0, 1.0, 0], [18.0, 8.0, 75.0, 12.0, 1.0, 1.0, 1],
+     [36.0, 12.0, 90.0, 15.0, 0.0, 0.0, 0], [9.0, 6.0, 65.0, 11.0, 1.0, 1.0, 2],
+     [30.0, 11.0, 88.0, 14.0, 0.0, 0.0, 0], [15.0, 7.5, 70.0, 12.5, 1.0, 0.0, 1],
+     [21.0, 9.0, 78.0, 13.0, 0.0, 1.0, 1], [27.0, 10.0, 83.0, 13.5, 0.0, 1.0, 0]],
+    columns=COLONNES_MODELE + ["classe"],
+)
+
+
+# ---------- DONNÉES ----------
+def charger_enregistrements(source):
+    """Enregistrements de dépistage depuis le stockage (enfants.db) ou l'ancien enfants.json."""
+    if source.lower().endswith(".json"):
+        with open(source, "r", encoding="utf-8") as f:
+            return pd.DataFrame(json.load(f))
+    from anisan.stockage import ouvrir_stockage
+
+    stockage = ouvrir_stockage(source)
+    try:
+        return pd.DataFrame(stockage.tous())
+    finally:
+        stockage.fermer()
+
+
+def construire_jeu(enregistrements, regle="mas_mam"):
+    """Features (ordre COLONNES_MODELE) et classes, calculées colonne par colonne.
+
+    Les classes viennent de la table de règles PB/œdème : les « prediction »
+    stockées sont celles d'un ancien modèle et ne servent pas de vérité.
+    pb et oedeme étant aussi des features, le modèle apprend cette règle.
+    Les enfants sans sexe sont écartés : la saisie ne propose que M ou F.
+    """
+    df = enregistrements.reindex(columns=COLONNES_MODELE).copy()
+    df["pb"] = pd.to_numeric(df["pb"], errors="coerce") / 10  # mm → cm
+    df = df[df[["age", "poids", "taille", "pb"]].notna().all(axis=1)]
+    df = df[df["sexe"].fillna("").astype(str).str.strip() != ""]
+    df["oedeme"] = df["oedeme"].fillna("Non")
+    X = preparer_entrees(df)
+    y = classer(df["pb"], df["oedeme"], regle=regle)["categorie"].astype(str).to_numpy()
+    return X, y
+
+
+def empreinte_donnees(X, y):
+    sha = hashlib.sha256()
+    sha.update(np.ascontiguousarray(X).tobytes())
+    sha.update("\n".join(map(str, y)).encode("utf-8"))
+    return sha.hexdigest()
+
+
+# ---------- ARTEFACTS ----------
+def entrainer(X, y, n_estimators=100, graine=42):
+    modele = RandomForestClassifier(n_estimators=n_estimators, random_state=graine, n_jobs=-1)
+    modele.fit(X, y)
+    # Entraînement en parallèle, prédiction sans : pour une ligne, le pool de threads coûte plus que la forêt
+    modele.n_jobs = 1
+    return modele
+
+
+def enregistrer_artefact(modele, meta, dossier=DOSSIER_MODELES):
+    """Écrit anisan-vN.joblib (modèle + métadonnées) et anisan-vN.json à côté."""
+    os.makedirs(dossier, exist_ok=True)
+    version = max(versions_existantes(dossier), default=0) + 1
+    meta = dict(meta, version=version)
+    chemin = os.path.join(dossier, f"anisan-v{version}.joblib")
+    # Écriture dans un fichier temporaire puis renommage : jamais d'artefact à moitié écrit
+    joblib.dump({"modele": modele, "meta": meta}, chemin + ".tmp")
+    os.replace(chemin + ".tmp", chemin)
+    meta["empreinte_artefact"] = empreinte_fichier(chemin)
+    with open(os.path.join(dossier, f"anisan-v{version}.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return chemin, meta
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Entraîne et versionne le modèle nutritionnel ANISAN")
+    parser.add_argument("--source", default="enfants.db", help="enfants.db ou ancien enfants.json")
+    parser.add_argument("--demo", action="store_true", help="entraîne sur les dix enfants de démonstration")
+    parser.add_argument("--regle", default="mas_mam", help="table de règles donnant les classes")
+    parser.add_argument("--arbres", type=int, default=100)
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--dossier", default=DOSSIER_MODELES)
+    args = parser.parse_args(arguments)
+
+    if args.demo:
+        X = preparer_entrees(DONNEES_DEMO)
+        y = np.array(CLASSES)[DONNEES_DEMO["classe"].to_numpy()]
+        source = "demo"
+    else:
+        X, y = construire_jeu(charger_enregistrements(args.source), args.regle)
+        source = args.source
+    if len(X) == 0:
+        parser.error(f"Aucun enregistrement exploitable dans {source}")
+
+    modele = entrainer(X, y, args.arbres, args.graine)
+    meta = {
+        "colonnes": COLONNES_MODELE,
+        "classes": modele.classes_.tolist(),
+        "n_lignes": int(len(X)),
+        "empreinte_donnees": empreinte_donnees(X, y),
+        "source": source,
+        "regle": None if args.demo else args.regle,
+        # Origine des classes apprises : sans elle, l'exactitude du modèle ne se lit pas
+        "etiquettes": ({"source": "demo"} if args.demo else
+                       {"source": "regle", "regle": args.regle, "colonnes": ["pb", "oedeme"]}),
+        "n_estimators": args.arbres,
+        "graine": args.graine,
+        "sklearn": sklearn.__version__,
+        "cree_le": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    chemin, meta = enregistrer_artefact(modele, meta, args.dossier)
+    print(f"✅ Modèle v{meta['version']} entraîné sur {meta['n_lignes']} enfants → {chemin}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import csv
+import io
+import math
+
+import numpy as np
+import pandas as pd
+
+from anisan import profilage
+
+# ---------- EXPORTS À LA DEMANDE ----------
+# Chaque export est produit en mémoire, bloc par bloc, au moment du clic
+# (st.download_button accepte une fonction pour `data`) : pas de fichier
+# partagé sur le disque, rien à payer tant que personne ne télécharge.
+TAILLE_BLOC = 10000
+
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def _blocs(donnees, colonnes=None, filtre=None, taille_bloc=TAILLE_BLOC):
+    """DataFrames successifs d'au plus `taille_bloc` lignes.
+
+    `donnees` : DataFrame, liste de dictionnaires (seul le bloc courant est
+    converti) ou itérable de lots déjà découpés, comme Stockage.par_lots().
+    `filtre` : fonction bloc → masque booléen des lignes à garder.
+    """
+    if isinstance(donnees, pd.DataFrame):
+        lots = (donnees.iloc[debut:debut + taille_bloc] for debut in range(0, len(donnees), taille_bloc))
+    elif isinstance(donnees, (list, tuple)):
+        lots = (donnees[debut:debut + taille_bloc] for debut in range(0, len(donnees), taille_bloc))
+    else:
+        lots = donnees
+    for bloc in lots:
+        if not isinstance(bloc, pd.DataFrame):
+            bloc = pd.DataFrame(bloc)
+        if filtre is not None:
+            bloc = bloc[np.asarray(filtre(bloc), dtype=bool)]
+        if colonnes is not None:
+            bloc = bloc.reindex(columns=colonnes)
+        yield bloc
+
+
+def _entete(donnees, colonnes):
+    """En-tête d'un export sans aucun bloc (rien à exporter)."""
+    if colonnes is not None:
+        return list(colonnes)
+    if isinstance(donnees, pd.DataFrame):
+        return list(donnees.columns)
+    if isinstance(donnees, (list, tuple)) and donnees:
+        return list(donnees[0])
+    return []
+
+
+# ---------- FORMATS ----------
+def csv_octets(donnees, colonnes=None, filtre=None, sep=",", taille_bloc=TAILLE_BLOC):
+    tampon = io.BytesIO()
+    texte = io.TextIOWrapper(tampon, encoding="utf-8", newline="")
+    premier = True
+    for bloc in _blocs(donnees, colonnes, filtre, taille_bloc):
+        # En-tête écrit par pandas avec le premier bloc : noms échappés comme les valeurs
+        bloc.to_csv(texte, index=False, header=premier, sep=sep, lineterminator="\n")
+        premier = False
+    if premier:
+        csv.writer(texte, delimiter=sep, lineterminator="\n").writerow(_entete(donnees, colonnes))
+    texte.flush()
+    texte.detach()
+    return tampon.getvalue()
+
+
+def _cellule(valeur):
+    """Valeur acceptée par openpyxl : scalaires Python, None pour les manquants."""
+    if isinstance(valeur, np.generic):
+        valeur = valeur.item()
+    if valeur is pd.NaT or (isinstance(valeur, float) and math.isnan(valeur)):
+        return None
+    return valeur
+
+
+def xlsx_octets(donnees, colonnes=None, filtre=None, feuille="Enfants", taille_bloc=TAILLE_BLOC):
+    """Classeur openpyxl en écriture seule : les lignes sont écrites au fil de l'eau."""
+    from openpyxl import Workbook
+
+    classeur = Workbook(write_only=True)
+    onglet = classeur.create_sheet(feuille)
+    entete = None
+    for bloc in _blocs(donnees, colonnes, filtre, taille_bloc):
+        if entete is None:
+            entete = list(bloc.columns)
+            onglet.append(entete)
+        for ligne in bloc.itertuples(index=False, name=None):
+            onglet.append([_cellule(v) for v in ligne])
+    if entete is None:
+        onglet.append(_entete(donnees, colonnes))
+    tampon = io.BytesIO()
+    classeur.save(tampon)
+    return tampon.getvalue()
+
+
+def parquet_octets(donnees, colonnes=None, filtre=None, taille_bloc=TAILLE_BLOC):
+    """Un groupe de lignes Parquet par bloc, au schéma du premier bloc."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tampon = io.BytesIO()
+    ecrivain = None
+    for bloc in _blocs(donnees, colonnes, filtre, taille_bloc):
+        if ecrivain is None:
+            table = pa.Table.from_pandas(bloc, preserve_index=False)
+            # Colonne vide dans le premier bloc : texte plutôt que type « null »
+            schema = pa.schema([c.with_type(pa.string()) if pa.types.is_null(c.type) else c for c in table.schema])
+            table = table.cast(schema)
+            ecrivain = pq.ParquetWriter(tampon, schema)
+        else:
+            table = pa.Table.from_pandas(bloc, schema=ecrivain.schema, preserve_index=False)
+        ecrivain.write_table(table)
+    if ecrivain is None:
+        noms = _entete(donnees, colonnes)
+        ecrivain = pq.ParquetWriter(tampon, pa.schema([(nom, pa.string()) for nom in noms]))
+    ecrivain.close()
+    return tampon.getvalue()
+
+
+EXPORTEURS = {"csv": csv_octets, "xlsx": xlsx_octets, "parquet": parquet_octets}
+
+
+def exporteur(donnees, format="csv", **options):
+    """Fonction sans argument qui produit l'export : à passer telle quelle à st.download_button(data=...).
+
+    `donnees` peut elle-même être une fonction : le tableau n'est alors construit qu'au clic.
+    """
+    def produire():
+        with profilage.section(f"export {format}"):
+            return EXPORTEURS[format](donnees() if callable(donnees) else donnees, **options)
+
+    return produire
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import unicodedata
+
+import numpy as np
+
+# ---------- RÉFÉRENTIEL GÉOGRAPHIQUE ----------
+# Pays → régions avec les coordonnées du chef-lieu : {pays: [{"region", "latitude", "longitude"}]}
+FICHIER_REGIONS = os.path.join(os.path.dirname(__file__), "donnees", "pays_regions_coords.json")
+# Contours des régions, facultatifs : GeoJSON dont chaque entité porte les propriétés « pays » et « region »
+FICHIER_CONTOURS = os.path.join(os.path.dirname(__file__), "donnees", "regions.geojson")
+
+RAYON_TERRE = 6371.0  # km
+
+_REFERENCE = None
+_verrou = threading.Lock()
+
+
+def normaliser(nom):
+    """Clé de recherche sans accents, casse ni variante de tiret (« Saint‑Louis » = « saint-louis »)."""
+    texte = unicodedata.normalize("NFKD", str(nom))
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    for tiret in "‐‑‒–—":
+        texte = texte.replace(tiret, "-")
+    return " ".join(texte.casefold().split())
+
+
+def _vecteurs(latitude, longitude):
+    """Points de la sphère unité : la distance euclidienne y croît avec la distance au sol."""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+# ---------- POINT DANS POLYGONE ----------
+def _dans_polygone(x, y, anneaux):
+    """Règle pair-impair sur tous les anneaux (extérieur et trous), vectorisée sur les points."""
+    dedans = np.zeros(len(x), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for anneau in anneaux:
+            xi, yi = anneau[:, 0], anneau[:, 1]
+            xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+            for k in range(len(anneau)):
+                croise = (yi[k] > y) != (yj[k] > y)
+                croise &= x < (xj[k] - xi[k]) * (y - yi[k]) / (yj[k] - yi[k]) + xi[k]
+                dedans ^= croise
+    return dedans
+
+
+def charger_contours(chemin):
+    """[(pays, région, polygones, boîte englobante)] depuis un GeoJSON de Polygon / MultiPolygon."""
+    with open(chemin, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+    contours = []
+    for entite in collection["features"]:
+        geometrie = entite["geometry"]
+        polygones = [geometrie["coordinates"]] if geometrie["type"] == "Polygon" else geometrie["coordinates"]
+        polygones = [[np.asarray(anneau, dtype=np.float64)[:, :2] for anneau in polygone] for polygone in polygones]
+        points = np.vstack([polygone[0] for polygone in polygones])
+        boite = (*points.min(axis=0), *points.max(axis=0))
+        contours.append((entite["properties"]["pays"], entite["properties"]["region"], polygones, boite))
+    return contours
+
+
+# ---------- RÉFÉRENCE ----------
+class ReferenceGeo:
+    def __init__(self, donnees, contours=None):
+        self.pays_regions = {pays: [r["region"] for r in regions] for pays, regions in donnees.items()}
+        self.coordonnees_par_region = {
+            (pays, r["region"]): (r["latitude"], r["longitude"]) for pays, regions in donnees.items() for r in regions
+        }
+        self._pays = {normaliser(pays): pays for pays in self.pays_regions}
+        self._regions = {(normaliser(pays), normaliser(region)): (pays, region)
+                         for pays, region in self.coordonnees_par_region}
+
+        # Pays et région de chaque point de l'arbre, indexables par tableau d'entiers
+        self._pays_points = np.array([pays for pays, _ in self.coordonnees_par_region], dtype=object)
+        self._regions_points = np.array([region for _, region in self.coordonnees_par_region], dtype=object)
+        positions = np.array(list(self.coordonnees_par_region.values()), dtype=np.float64)
+        self._points = _vecteurs(positions[:, 0], positions[:, 1])
+        self._arbre = None
+
+        self.contours = []
+        for pays, region, polygones, boite in contours or []:
+            self.contours.append((*self.nom_region(pays, region), polygones, boite))
+
+    @property
+    def pays(self):
+        return list(self.pays_regions)
+
+    def nom_pays(self, pays):
+        return pays if pays in self.pays_regions else self._pays[normaliser(pays)]
+
+    def nom_region(self, pays, region):
+        """(pays, région) tels qu'écrits dans le référentiel, quelle que soit la graphie reçue."""
+        if (pays, region) in self.coordonnees_par_region:
+            return pays, region
+        return self._regions[(normaliser(pays), normaliser(region))]
+
+    def regions(self, pays):
+        return self.pays_regions[self.nom_pays(pays)]
+
+    def coordonnees(self, pays, region):
+        """(latitude, longitude) du chef-lieu de la région."""
+        return self.coordonnees_par_region[self.nom_region(pays, region)]
+
+    # ---------- LOCALISATION ----------
+    @property
+    def arbre(self):
+        """KD-tree des chefs-lieux, construit à la première localisation : scipy n'est importé qu'alors."""
+        if self._arbre is None:
+            from scipy.spatial import cKDTree
+
+            self._arbre = cKDTree(self._points)
+        return self._arbre
+
+    def plus_proches(self, latitude, longitude):
+        """Région au chef-lieu le plus proche de chaque point GPS : (pays, régions, distances en km)."""
+        corde, position = self.arbre.query(_vecteurs(latitude, longitude))
+        pays, regions = self._pays_points[position], self._regions_points[position]
+        distance = 2 * RAYON_TERRE * np.arcsin(np.minimum(corde / 2, 1.0))
+        return pays, regions, distance
+
+    def plus_proche(self, latitude, longitude):
+        pays, regions, distance = self.plus_proches([latitude], [longitude])
+        return pays[0], regions[0], float(distance[0])
+
+    def localiser(self, latitude, longitude):
+        """(pays, régions) de chaque point : contour qui le contient si les contours sont chargés,
+        sinon (ou hors de tout contour) région au chef-lieu le plus proche."""
+        lat = np.asarray(latitude, dtype=np.float64)
+        lon = np.asarray(longitude, dtype=np.float64)
+        pays, regions, _ = self.plus_proches(lat, lon)
+        for nom_pays, region, polygones, (ouest, sud, est, nord) in self.contours:
+            candidats = np.flatnonzero((lon >= ouest) & (lon <= est) & (lat >= sud) & (lat <= nord))
+            if not len(candidats):
+                continue
+            dedans = np.zeros(len(candidats), dtype=bool)
+            for polygone in polygones:
+                dedans |= _dans_polygone(lon[candidats], lat[candidats], polygone)
+            pays[candidats[dedans]] = nom_pays
+            regions[candidats[dedans]] = region
+        return pays, regions
+
+
+def reference():
+    """Référentiel chargé une seule fois par processus (contours compris s'ils sont présents)."""
+    global _REFERENCE
+    with _verrou:
+        if _REFERENCE is None:
+            with open(FICHIER_REGIONS, "r", encoding="utf-8") as f:
+                donnees = json.load(f)
+            contours = charger_contours(FICHIER_CONTOURS) if os.path.exists(FICHIER_CONTOURS) else None
+            _REFERENCE = ReferenceGeo(donnees, contours)
+        return _REFERENCE
@@ -0,0 +1,206 @@
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+
+from anisan import geo, zscores
+from anisan.classification import classer
+from anisan.stockage import COLONNES
+
+# ---------- RÈGLES DE VALIDATION ----------
+# Bornes identiques aux st.number_input du formulaire de app.py (PB en mm)
+BORNES = {
+    "age": (0, 60),
+    "pb": (50.0, 200.0),
+    "poids": (2.0, 30.0),
+    "taille": (30.0, 120.0),
+}
+
+# En-têtes reconnus (en minuscules) → (champ, facteur de conversion)
+ALIAS = {
+    "nom": ("nom", None), "nom de l’enfant": ("nom", None), "nom de l'enfant": ("nom", None),
+    "sexe": ("sexe", None), "sex": ("sexe", None),
+    "age": ("age", None), "âge (mois)": ("age", None), "âge (en mois)": ("age", None), "months": ("age", None),
+    "pb": ("pb", 1), "périmètre brachial (mm)": ("pb", 1), "muac": ("pb", 1),
+    "pb (cm)": ("pb", 10), "périmètre brachial (cm)": ("pb", 10),
+    "poids": ("poids", None), "poids (kg)": ("poids", None), "weight": ("poids", None),
+    "taille": ("taille", None), "taille (cm)": ("taille", None), "height": ("taille", None),
+    "oedeme": ("oedeme", None), "œdème": ("oedeme", None), "edema": ("oedeme", None),
+    "pays": ("pays", None),
+    "region": ("region", None), "région": ("region", None),
+    "date": ("date", None), "date de mesure": ("date", None), "survdate": ("date", None),
+    "latitude": ("latitude", None), "lat": ("latitude", None), "gps_latitude": ("latitude", None),
+    "longitude": ("longitude", None), "lon": ("longitude", None), "lng": ("longitude", None),
+    "gps_longitude": ("longitude", None),
+}
+
+FORMAT_DATE = "%Y-%m-%d %H:%M:%S"
+
+
+# ---------- LECTURE PAR LOTS ----------
+def _compter_lignes(fichier):
+    """Nombre de fins de ligne du fichier (estimation du nombre d'enfants), puis retour au début."""
+    n = 0
+    for bloc in iter(lambda: fichier.read(1 << 20), b""):
+        n += bloc.count(b"\n")
+    fichier.seek(0)
+    return n
+
+
+def _lire_csv(fichier, taille_lot):
+    # Avancement en lignes lues : la position dans le fichier suit la lecture
+    # anticipée du parseur et atteint la fin dès le premier lot
+    total = max(_compter_lignes(fichier) - 1, 0)  # sans l'en-tête
+    lues = 0
+    # sep=None : détecte « , » ou « ; » (exports Excel en français)
+    for lot in pd.read_csv(fichier, sep=None, engine="python", chunksize=taille_lot, dtype=str):
+        lues += len(lot)
+        yield lot, (min(lues / total, 1.0) if total else None)
+
+
+def _lire_xlsx(fichier, taille_lot):
+    from openpyxl import load_workbook
+
+    classeur = load_workbook(fichier, read_only=True, data_only=True)
+    try:
+        feuille = classeur.active
+        lignes = feuille.iter_rows(values_only=True)
+        entete = [str(c) if c is not None else "" for c in next(lignes, [])]
+        total, lues = feuille.max_row, 0
+        while True:
+            lot = list(islice(lignes, taille_lot))
+            if not lot:
+                break
+            lues += len(lot)
+            yield pd.DataFrame(lot, columns=entete), (lues / total if total else None)
+    finally:
+        classeur.close()
+
+
+def lire_par_lots(fichier, nom_fichier, taille_lot=5000):
+    """Lit un CSV ou un XLSX lot par lot : (DataFrame, avancement entre 0 et 1 ou None)."""
+    if nom_fichier.lower().endswith((".xlsx", ".xlsm")):
+        return _lire_xlsx(fichier, taille_lot)
+    return _lire_csv(fichier, taille_lot)
+
+
+# ---------- PRÉPARATION D'UN LOT ----------
+def _normaliser_colonnes(lot):
+    colonnes, facteurs = {}, {}
+    for colonne in lot.columns:
+        cle = str(colonne).strip().lower()
+        if cle in ALIAS and ALIAS[cle][0] not in colonnes.values():
+            champ, facteur = ALIAS[cle]
+            colonnes[colonne] = champ
+            if facteur:
+                facteurs[champ] = facteur
+    lot = lot[list(colonnes)].rename(columns=colonnes)
+    for champ, facteur in facteurs.items():
+        lot[champ] = pd.to_numeric(lot[champ], errors="coerce") * facteur
+    return lot
+
+
+def _oui_non(valeurs):
+    texte = valeurs.astype(str).str.strip().str.lower()
+    return texte.isin(["oui", "o", "1", "y", "yes", "true"]).map({True: "Oui", False: "Non"})
+
+
+def _sexe(valeurs):
+    initiale = valeurs.astype(str).str.strip().str[:1].str.upper()
+    return initiale.map({"M": "M", "G": "M", "1": "M", "F": "F", "2": "F"})
+
+
+def _localiser(lot, coordonnees, region_fichier):
+    """Région déduite du GPS quand le fichier n'en donne pas ; coordonnées du chef-lieu quand le GPS manque."""
+    for champ in ("latitude", "longitude"):
+        lot[champ] = pd.to_numeric(lot[champ], errors="coerce") if champ in lot else float("nan")
+    gps = lot["latitude"].notna() & lot["longitude"].notna()
+    a_localiser = gps & lot["region"].isna() if region_fichier else gps
+    if a_localiser.any():
+        pays, regions = geo.reference().localiser(lot.loc[a_localiser, "latitude"], lot.loc[a_localiser, "longitude"])
+        lot.loc[a_localiser, "pays"] = pays
+        lot.loc[a_localiser, "region"] = regions
+
+    if coordonnees and not gps.all():
+        positions = pd.DataFrame(
+            [(p, r, lat, lon) for (p, r), (lat, lon) in coordonnees.items()],
+            columns=["pays", "region", "latitude_region", "longitude_region"],
+        )
+        lot = lot.merge(positions, on=["pays", "region"], how="left")
+        lot["latitude"] = lot["latitude"].fillna(lot.pop("latitude_region"))
+        lot["longitude"] = lot["longitude"].fillna(lot.pop("longitude_region"))
+    return lot
+
+
+def preparer_lot(lot, premiere_ligne, pays=None, region=None, coordonnees=None):
+    """Valide, complète et classe un lot. Renvoie (lignes valides, rejets)."""
+    lot = _normaliser_colonnes(lot).reset_index(drop=True)
+    motifs = pd.Series("", index=lot.index)
+
+    for champ, (mini, maxi) in BORNES.items():
+        valeurs = pd.to_numeric(lot[champ], errors="coerce") if champ in lot else pd.Series(float("nan"), index=lot.index)
+        lot[champ] = valeurs
+        hors = valeurs.isna() | (valeurs < mini) | (valeurs > maxi)
+        motifs = motifs.mask(hors, motifs + f"{champ} absent ou hors [{mini}, {maxi}] ; ")
+
+    # Cellule vide : NaN reste NaN après astype(str) sous pandas 3, d'où le fillna préalable
+    noms = lot["nom"].fillna("").astype(str).str.strip() if "nom" in lot else pd.Series("", index=lot.index)
+    lot["nom"] = noms
+    motifs = motifs.mask(noms.isin(["", "nan", "None"]), motifs + "nom absent ; ")
+
+    lot["oedeme"] = _oui_non(lot["oedeme"]) if "oedeme" in lot else "Non"
+    lot["sexe"] = _sexe(lot["sexe"]) if "sexe" in lot else None
+    region_fichier = "region" in lot
+    if "pays" not in lot:
+        lot["pays"] = pays
+    if not region_fichier:
+        lot["region"] = region
+    if "date" in lot:
+        dates = pd.to_datetime(lot["date"], errors="coerce", dayfirst=True)
+        motifs = motifs.mask(dates.isna(), motifs + "date illisible ; ")
+        lot["date"] = dates.dt.strftime(FORMAT_DATE)
+    else:
+        lot["date"] = datetime.now().strftime(FORMAT_DATE)
+
+    lot = _localiser(lot, coordonnees, region_fichier)
+
+    rejete = motifs != ""
+    rejets = pd.DataFrame({
+        "ligne": premiere_ligne + lot.index[rejete.to_numpy()],
+        "nom": lot.loc[rejete, "nom"],
+        "motif": motifs[rejete].str.rstrip(" ;"),
+    })
+
+    valides = lot[~rejete].copy()
+    whz = zscores.whz(valides["poids"], valides["taille"], valides["age"], valides["sexe"])
+    statuts = classer(valides["pb"] / 10, valides["oedeme"], regle="mas_mam", whz=whz)
+    valides["prediction"] = statuts["categorie"].astype(str)
+    valides["recommandation"] = statuts["conseil"].astype(str)
+    valides = valides.reindex(columns=list(COLONNES)).astype(object)
+    valides = valides.where(valides.notna(), None)
+    return valides.to_dict("records"), rejets
+
+
+# ---------- IMPORT COMPLET ----------
+def importer_enquete(fichier, nom_fichier, stockage, pays=None, region=None, coordonnees=None,
+                     taille_lot=5000, max_rejets=1000):
+    """Importe un fichier d'enquête lot par lot ; produit un rapport après chaque lot.
+
+    Chaque lot est écrit en une transaction. Seuls les `max_rejets` premiers
+    rejets sont conservés en détail pour que la mémoire reste bornée.
+    """
+    rapport = {"lot": 0, "lues": 0, "importees": 0, "rejetees": 0, "avancement": None, "rejets": []}
+    for lot, avancement in lire_par_lots(fichier, nom_fichier, taille_lot):
+        valides, rejets = preparer_lot(lot, rapport["lues"] + 2, pays, region, coordonnees)
+        if valides:
+            stockage.ajouter_lot(valides)
+
+        rapport["lot"] += 1
+        rapport["lues"] += len(lot)
+        rapport["importees"] += len(valides)
+        rapport["rejetees"] += len(rejets)
+        rapport["avancement"] = avancement
+        place = max_rejets - len(rapport["rejets"])
+        if place > 0:
+            rapport["rejets"].extend(rejets.head(place).to_dict("records"))
+        yield rapport
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import numpy as np
+import pandas as pd
+
+from anisan.modele import predire
+
+# Colonnes d'entrée du modèle, dans l'ordre de anisan_app (7)
+COLONNES_MODELE = ["age", "poids", "taille", "pb", "oedeme", "sexe"]
+
+PHASES = {
+    0: ("🟢 Bon", "Statut nutritionnel normal"),
+    1: ("🟡 MAM", "Malnutrition aiguë modérée"),
+    2: ("🔴 MAS", "Malnutrition aiguë sévère")
+}
+
+RECOMMANDATIONS = {
+    0: (
+        "✅ L’enfant présente un bon état nutritionnel.",
+        "🔁 Maintenez une alimentation équilibrée : allaitement exclusif jusqu’à 6 mois, puis diversification avec des aliments riches en énergie, protéines, fer, vitamine A.",
+        "📅 Continuez le suivi mensuel de la croissance (poids, taille, PB)."
+    ),
+    1: (
+        "⚠️ L’enfant est en malnutrition aiguë modérée (MAM).",
+        "🍲 Enrichissez son alimentation avec des bouillies fortifiées, purée d’arachide, poisson, œufs, huile.",
+        "🏥 Consultez un agent de santé pour un appui communautaire (PCMA)."
+    ),
+    2: (
+        "🚨 L’enfant est en malnutrition aiguë sévère (MAS).",
+        "🏥 Consultez immédiatement un centre CRENAS ou CRENI pour une prise en charge thérapeutique.",
+        "🍽️ Donnez-lui des aliments thérapeutiques prêts à l’emploi (ATPE) si disponibles, et assurez un suivi médical rigoureux."
+    )
+}
+
+# Classes des modèles (0/1/2 dans anisan_app (7), libellés dans app.py) → code de phase
+CODES_CLASSES = {0: 0, 1: 1, 2: 2, "Normal": 0, "MAM": 1, "MAS": 2}
+NOMS_PHASES = ["Bon", "MAM", "MAS"]
+
+
+# ---------- PRÉPARATION DES ENTRÉES ----------
+def preparer_entrees(df, colonnes=COLONNES_MODELE):
+    """Matrice de features à partir des colonnes du DataFrame (œdème et sexe en 0/1)."""
+    X = np.empty((len(df), len(colonnes)), dtype=np.float64)
+    for j, colonne in enumerate(colonnes):
+        valeurs = df[colonne]
+        if colonne == "oedeme" and not pd.api.types.is_numeric_dtype(valeurs):
+            valeurs = valeurs.isin(["Oui", "oui"])
+        elif colonne == "sexe" and not pd.api.types.is_numeric_dtype(valeurs):
+            valeurs = valeurs.isin(["Garçon", "M"])
+        X[:, j] = valeurs.to_numpy(dtype=np.float64)
+    return X
+
+
+# ---------- PRÉDICTION PAR LOT ----------
+def predire_lot(modele, df, colonnes=COLONNES_MODELE, taille_lot=50_000):
+    """Prédit tout un DataFrame par blocs : phase, probabilités et recommandations."""
+    X = preparer_entrees(df, colonnes)
+    classes, probas = [], []
+    for debut in range(0, len(X), taille_lot):
+        c, p = predire(modele, X[debut:debut + taille_lot])
+        classes.append(c)
+        probas.append(p)
+    if not classes:
+        classes, probas = [modele.classes_[:0]], [np.empty((0, len(modele.classes_)))]
+    classes, probas = np.concatenate(classes), np.vstack(probas)
+
+    codes = np.array([CODES_CLASSES[c] for c in modele.classes_.tolist()])
+    phase = codes[np.searchsorted(modele.classes_, classes)]
+
+    resultat = pd.DataFrame({"code": phase}, index=df.index)
+    resultat["phase"] = np.array([PHASES[c][0] for c in sorted(PHASES)])[phase]
+    resultat["description"] = np.array([PHASES[c][1] for c in sorted(PHASES)])[phase]
+    for j, code in enumerate(codes):
+        resultat[f"proba_{NOMS_PHASES[code]}"] = probas[:, j]
+    conseils = np.empty(len(RECOMMANDATIONS), dtype=object)
+    for c in sorted(RECOMMANDATIONS):
+        conseils[c] = RECOMMANDATIONS[c]
+    resultat["recommandations"] = conseils[phase]
+    return resultat
+
+
+# ---------- EXÉCUTION EN ARRIÈRE-PLAN ----------
+_executeur = None
+_verrou = threading.Lock()
+
+
+def executeur():
+    global _executeur
+    with _verrou:
+        if _executeur is None:
+            _executeur = ThreadPoolExecutor(max_workers=2, thread_name_prefix="anisan-inference")
+        return _executeur
+
+
+def soumettre_lot(modele, df, colonnes=COLONNES_MODELE, taille_lot=50_000):
+    """Lance predire_lot() dans le pool de threads ; renvoie un Future."""
+    return executeur().submit(predire_lot, modele, df, colonnes, taille_lot)
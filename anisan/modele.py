@@ -0,0 +1,85 @@
+import glob
+import hashlib
+import os
+import re
+import threading
+
+import joblib
+import numpy as np
+
+from anisan import profilage
+
+# Artefacts versionnés écrits par anisan.entrainement
+DOSSIER_MODELES = "modeles"
+
+# ---------- REGISTRE DES MODÈLES ----------
+# Modèles déjà chargés dans ce processus, par (empreinte du fichier, version)
+_MODELES = {}
+# Empreintes déjà calculées, par (chemin, taille, date de modification)
+_EMPREINTES = {}
+_verrou = threading.Lock()
+
+
+def empreinte_fichier(chemin):
+    """SHA-256 du fichier, recalculé seulement si le fichier a changé sur le disque."""
+    infos = os.stat(chemin)
+    cle = (os.path.abspath(chemin), infos.st_size, infos.st_mtime_ns)
+    if cle not in _EMPREINTES:
+        sha = hashlib.sha256()
+        with open(chemin, "rb") as f:
+            for bloc in iter(lambda: f.read(1 << 20), b""):
+                sha.update(bloc)
+        _EMPREINTES[cle] = sha.hexdigest()
+    return _EMPREINTES[cle]
+
+
+def obtenir_modele(chemin, version=None):
+    """Charge le modèle au plus une fois par processus, puis le réutilise."""
+    cle = (empreinte_fichier(chemin), version)
+    with _verrou:
+        if cle not in _MODELES:
+            with profilage.section("chargement modèle", chemin=chemin):
+                charge = joblib.load(chemin)
+            # Artefacts enregistrés avec n_jobs=-1 : prédiction ramenée à un seul thread
+            modele = charge["modele"] if isinstance(charge, dict) else charge
+            if getattr(modele, "n_jobs", None) not in (None, 1):
+                modele.n_jobs = 1
+            _MODELES[cle] = charge
+        return _MODELES[cle]
+
+
+# ---------- ARTEFACTS VERSIONNÉS ----------
+def versions_existantes(dossier=DOSSIER_MODELES):
+    versions = {}
+    for chemin in glob.glob(os.path.join(dossier, "anisan-v*.joblib")):
+        trouve = re.search(r"anisan-v(\d+)\.joblib$", chemin)
+        if trouve:
+            versions[int(trouve.group(1))] = chemin
+    return versions
+
+
+def dernier_artefact(dossier=DOSSIER_MODELES):
+    versions = versions_existantes(dossier)
+    return versions[max(versions)] if versions else None
+
+
+def obtenir_artefact(chemin):
+    """Artefact {"modele", "meta"} : chargé une fois, comme obtenir_modele()."""
+    version = int(re.search(r"anisan-v(\d+)\.joblib$", chemin).group(1))
+    return obtenir_modele(chemin, version)
+
+
+# ---------- PRÉDICTION ----------
+def predire(modele, X):
+    """Une seule traversée de la forêt : renvoie (classes, probabilités).
+
+    RandomForestClassifier.predict() prend déjà l'argmax de predict_proba(),
+    appeler les deux parcourt donc les arbres deux fois pour rien.
+    """
+    probas = modele.predict_proba(X)
+    return modele.classes_[np.argmax(probas, axis=1)], probas
+
+
+def predire_un(modele, ligne):
+    classes, probas = predire(modele, [ligne])
+    return classes[0], probas[0]
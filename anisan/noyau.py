@@ -0,0 +1,203 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from anisan import archive, geo, synchro, zscores
+from anisan.agregats import CATEGORIES
+from anisan.classification import classer_codes, obtenir_regle
+from anisan.cube import INCONNU, Cube
+from anisan.inference import CODES_CLASSES, COLONNES_MODELE, PHASES, predire_lot, preparer_entrees
+from anisan.modele import dernier_artefact, obtenir_artefact, predire_un
+from anisan.stockage import migrer_json, ouvrir_stockage
+from anisan.surveillance import Surveillance
+
+# ---------- NOYAU DE L'APPLICATION MULTIPAGE ----------
+# Ressources partagées par toutes les pages et toutes les sessions de
+# Accueil.py : référentiel, modèle, stockage et agrégats ne sont chargés
+# qu'une fois par processus (st.cache_resource), pas une fois par visiteur.
+# Contrairement aux autres modules, celui-ci n'a de sens que sous Streamlit.
+CHEMIN_BASE = "enfants.db"
+CHEMIN_JSON = "enfants.json"
+# Poste de terrain : URL du serveur central où envoyer les saisies (hors ligne sinon)
+URL_CENTRAL = os.environ.get(synchro.VARIABLE)
+# Échelle des agrégats (tableau de bord, carte) : celle de app.py
+REGLE = "mas_mam"
+# Libellés de prédiction enregistrés dans le registre (code de phase → libellé)
+LIBELLES_PREDICTION = {0: "Normal", 1: "MAM", 2: "MAS"}
+# Colonnes lues pour les agrégats : ni noms ni recommandations en mémoire
+LUES = ["sexe", "age", "pb", "poids", "taille", "oedeme", "pays", "region", "latitude", "longitude", "date"]
+
+
+# ---------- RESSOURCES DU PROCESSUS ----------
+@st.cache_resource
+def stockage():
+    stockage = ouvrir_stockage(CHEMIN_BASE)
+    # Migration unique depuis l'ancien fichier enfants.json
+    if stockage.compter() == 0 and os.path.exists(CHEMIN_JSON):
+        migrer_json(CHEMIN_JSON, stockage)
+    return stockage
+
+
+@st.cache_resource
+def demarrer_archive():
+    # Un seul thread par processus : archive Parquet incrémentale + compactage, toutes les heures
+    return archive.demarrer_compactage(stockage=stockage())
+
+
+@st.cache_resource
+def demarrer_synchronisation():
+    # Un seul thread par processus : les saisies partent au central dès que le réseau revient
+    return synchro.demarrer_synchronisation(stockage(), URL_CENTRAL) if URL_CENTRAL else None
+
+
+@st.cache_data(ttl=3600)
+def tendance(pays):
+    return archive.tendance_annuelle(pays=pays)
+
+
+def reference():
+    """Référentiel géographique (déjà unique par processus dans anisan.geo)."""
+    return geo.reference()
+
+
+def artefact():
+    """Dernier modèle entraîné, ou None. obtenir_artefact() le garde en mémoire par version :
+    un nouveau modèle déposé dans modeles/ est pris au rerun suivant, sans redémarrage."""
+    chemin = dernier_artefact()
+    return None if chemin is None else obtenir_artefact(chemin)
+
+
+@st.cache_resource
+def synthese():
+    return Synthese(stockage())
+
+
+# ---------- AGRÉGATS PARTAGÉS ----------
+class Synthese:
+    """Cube, surveillance et points de la carte de tout le registre, tenus à jour par lecture incrémentale.
+
+    Construits une fois par processus depuis le stockage, puis complétés des
+    seuls enregistrements plus récents que le dernier id lu : un import fait
+    par une autre session apparaît au rerun suivant, sans relire le registre.
+    """
+
+    def __init__(self, stockage, regle=REGLE):
+        self.stockage = stockage
+        self.regle = regle
+        # Code de phase → index dans CATEGORIES (dernière case : PB manquant)
+        self._categories = np.array([CATEGORIES.index(c) for c in obtenir_regle(regle)["categories"]] + [-1])
+        self.cube = Cube(regle)
+        self.surveillance = Surveillance()
+        # Points de la carte, dans l'ordre des id (croissants)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.latitude = np.empty(0)
+        self.longitude = np.empty(0)
+        self.codes = np.empty(0, dtype=np.int64)
+        self.dernier_id = 0
+        self.version = 0
+        self._pyramide = None
+        self._verrou = threading.Lock()
+        self.actualiser()
+
+    def _classer(self, lot):
+        """(codes de phase, index de catégorie, dates) d'un lot au format du stockage (PB en mm)."""
+        numeriques = {c: pd.to_numeric(lot[c], errors="coerce") for c in ("pb", "poids", "taille", "age")}
+        whz = zscores.whz(numeriques["poids"], numeriques["taille"], numeriques["age"], lot["sexe"])
+        phases = classer_codes(numeriques["pb"] / 10, lot["oedeme"], self.regle, whz=whz)
+        dates = pd.to_datetime(lot["date"], errors="coerce").to_numpy()
+        return phases, self._categories[phases], dates
+
+    def actualiser(self):
+        """Intègre les enregistrements ajoutés depuis la dernière lecture ; renvoie leur nombre."""
+        with self._verrou:
+            lot = pd.DataFrame(self.stockage.colonnes(LUES, apres_id=self.dernier_id))
+            if lot.empty:
+                return 0
+            lot[["pays", "region"]] = lot[["pays", "region"]].fillna(INCONNU)
+            phases, categories, dates = self._classer(lot)
+            self.cube.ajouter_lot(lot["pays"], lot["region"], dates, lot["age"], lot["sexe"], phases)
+            self.surveillance.ajouter_lot(lot["pays"], lot["region"], dates, categories)
+            self.ids = np.concatenate([self.ids, lot["id"].to_numpy(dtype=np.int64)])
+            self.latitude = np.concatenate([self.latitude, pd.to_numeric(lot["latitude"], errors="coerce")])
+            self.longitude = np.concatenate([self.longitude, pd.to_numeric(lot["longitude"], errors="coerce")])
+            self.codes = np.concatenate([self.codes, categories])
+            self.dernier_id = int(self.ids[-1])
+            self.version += 1
+            self._pyramide = None
+            return len(lot)
+
+    def retirer(self, enfant):
+        """Retire des agrégats un enregistrement supprimé du stockage (dictionnaire avec son id)."""
+        with self._verrou:
+            position = int(np.searchsorted(self.ids, enfant["id"]))
+            if position == len(self.ids) or self.ids[position] != enfant["id"]:
+                return False  # pas encore lu : la prochaine lecture ne le verra pas
+            lot = pd.DataFrame([{colonne: enfant.get(colonne) for colonne in LUES}])
+            lot[["pays", "region"]] = lot[["pays", "region"]].fillna(INCONNU)
+            phases, categories, dates = self._classer(lot)
+            self.cube.ajouter_lot(lot["pays"], lot["region"], dates, lot["age"], lot["sexe"], phases, signe=-1)
+            if categories[0] >= 0 and not pd.isna(dates[0]):
+                self.surveillance.retirer(lot["pays"][0], lot["region"][0], dates[0], CATEGORIES[categories[0]])
+            garde = np.arange(len(self.ids)) != position
+            self.ids, self.latitude = self.ids[garde], self.latitude[garde]
+            self.longitude, self.codes = self.longitude[garde], self.codes[garde]
+            self.version += 1
+            self._pyramide = None
+            return True
+
+    def pyramide(self):
+        """Agrégats spatiaux par zoom, recalculés seulement après un changement du registre."""
+        from anisan.carte import Pyramide
+
+        with self._verrou:
+            if self._pyramide is None:
+                self._pyramide = Pyramide(self.latitude, self.longitude, self.codes)
+            return self._pyramide
+
+
+# ---------- OPÉRATIONS COMMUNES AUX PAGES ----------
+def enregistrer(enfant):
+    """Écrit un enfant et le répercute aussitôt sur les agrégats ; renvoie son id."""
+    identifiant = stockage().ajouter(enfant)
+    synthese().actualiser()
+    return identifiant
+
+
+def supprimer(enfant):
+    """Supprime un enregistrement (dictionnaire avec son id) du stockage et des agrégats."""
+    n = stockage().supprimer(enfant["id"])
+    if n:
+        synthese().retirer(enfant)
+    return n
+
+
+def predire(modele, enfant):
+    """(code de phase, probabilités dans l'ordre de PHASES) pour un enfant {age, poids, taille, pb (cm), oedeme, sexe}."""
+    X = preparer_entrees(pd.DataFrame([enfant]), modele["meta"]["colonnes"])
+    prediction, probabilites = predire_un(modele["modele"], X[0])
+    # Probabilités remises dans l'ordre Bon / MAM / MAS, quel que soit l'ordre des classes
+    probas = np.zeros(len(PHASES))
+    probas[[CODES_CLASSES[c] for c in modele["modele"].classes_.tolist()]] = probabilites
+    return CODES_CLASSES[prediction], probas
+
+
+def donner_recommandations(prediction):
+    if prediction == "MAS":
+        return "⚠️ L'enfant est en malnutrition aiguë sévère. Référez immédiatement au centre de santé pour prise en charge thérapeutique."
+    elif prediction == "MAM":
+        return "⚠️ L'enfant est en malnutrition aiguë modérée. Fournir des suppléments nutritionnels et un suivi rapproché."
+    else:
+        return "✅ L'état nutritionnel est normal. Poursuivre l’alimentation équilibrée et les consultations régulières."
+
+
+def reevaluer_registre(modele):
+    # Tâche de fond : repasse tout le registre dans le modèle, par blocs (colonnes utiles seulement)
+    df = pd.DataFrame(stockage().colonnes(COLONNES_MODELE))
+    df["pb"] = pd.to_numeric(df["pb"], errors="coerce") / 10  # mm → cm
+    resultats = predire_lot(modele["modele"], df, colonnes=modele["meta"]["colonnes"])
+    predictions = resultats["code"].map(LIBELLES_PREDICTION)
+    lignes = zip(predictions, predictions.map(donner_recommandations), df["id"].tolist())
+    return stockage().mettre_a_jour_lot(["prediction", "recommandation"], lignes)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# ---------- PAGINATION CÔTÉ SERVEUR ----------
+# Filtrage, tri et découpage sont faits ici ; le navigateur ne reçoit que
+# la page affichée. Les widgets portent des clés fixes (préfixe + rôle) :
+# leur état survit aux reruns et à l'ajout d'enfants.
+TAILLE_PAGE = 50
+TAILLES_PAGE = [25, 50, 100, 200]
+
+
+def nombre_pages(total, taille):
+    return max(1, -(-total // taille))
+
+
+class SourceTableau:
+    """Tableau en mémoire (liste de la session, vue du registre) paginé à la demande.
+
+    Même interface que le stockage SQLite : `valeurs(colonne)` et
+    `page(filtres, debut, fin, tri, croissant, decalage, limite)` → (lignes, total).
+    """
+
+    def __init__(self, donnees, colonne_date=None):
+        self.df = donnees if isinstance(donnees, pd.DataFrame) else pd.DataFrame(donnees)
+        self.colonne_date = colonne_date
+        # Dates lues une fois (les applications les stockent en texte « jj/mm/aaaa ») ; tri chronologique
+        self.dates = None
+        if colonne_date is not None and colonne_date in self.df:
+            colonne = self.df[colonne_date]
+            self.dates = colonne if pd.api.types.is_datetime64_any_dtype(colonne) else \
+                pd.to_datetime(colonne, dayfirst=True, errors="coerce")
+
+    def valeurs(self, colonne):
+        return sorted(self.df[colonne].dropna().unique().tolist(), key=str)
+
+    def page(self, filtres=None, debut=None, fin=None, tri=None, croissant=True, decalage=0, limite=TAILLE_PAGE):
+        masque = np.ones(len(self.df), dtype=bool)
+        for colonne, valeurs in (filtres or {}).items():
+            if valeurs:
+                masque &= self.df[colonne].isin(valeurs).to_numpy()
+        if self.dates is not None and debut is not None:
+            masque &= (self.dates >= pd.Timestamp(debut)).to_numpy()
+        if self.dates is not None and fin is not None:
+            masque &= (self.dates < pd.Timestamp(fin) + pd.Timedelta(days=1)).to_numpy()
+        positions = np.flatnonzero(masque)
+        if tri is not None:
+            # Seule la colonne triée est ordonnée ; les autres colonnes ne sont lues que pour la page
+            cles = self.dates if tri == self.colonne_date and self.dates is not None else self.df[tri]
+            ordre = cles.iloc[positions].reset_index(drop=True).sort_values(
+                ascending=croissant, kind="stable", na_position="last").index.to_numpy()
+            positions = positions[ordre]
+        return self.df.iloc[positions[decalage:decalage + limite]], len(positions)
+
+
+# ---------- AFFICHAGE STREAMLIT ----------
+def afficher_table(source, cle, filtres=(), colonne_date=None, colonnes=None, tri=None):
+    """Contrôles (filtres, tri, page) et tableau de la page courante ; renvoie la page (DataFrame).
+
+    `source` : SourceTableau ou stockage ; `cle` : préfixe des clés de widgets,
+    unique dans l'application ; `filtres` : colonnes filtrables par valeur.
+    """
+    import streamlit as st  # seules les applications en ont besoin
+
+    choix = {}
+    if filtres:
+        for zone, colonne in zip(st.columns(len(filtres)), filtres):
+            choix[colonne] = zone.multiselect(colonne, source.valeurs(colonne), key=f"{cle}_filtre_{colonne}")
+    debut = fin = None
+    if colonne_date is not None:
+        periode = st.date_input("Période", value=[], key=f"{cle}_periode")
+        debut = periode[0] if len(periode) > 0 else None
+        fin = periode[1] if len(periode) > 1 else None
+
+    zone_tri, zone_sens, zone_taille = st.columns([2, 1, 1])
+    tri = zone_tri.selectbox("Trier par", colonnes or [], index=None if tri is None else (colonnes or []).index(tri),
+                             key=f"{cle}_tri", placeholder="Ordre d'enregistrement")
+    croissant = zone_sens.radio("Ordre", ["↑", "↓"], horizontal=True, key=f"{cle}_sens") == "↑"
+    taille = zone_taille.selectbox("Lignes", TAILLES_PAGE, index=TAILLES_PAGE.index(TAILLE_PAGE), key=f"{cle}_taille")
+
+    # Retour en page 1 quand les filtres, le tri ou la taille changent
+    signature = (tuple((c, tuple(v)) for c, v in choix.items()), debut, fin, tri, croissant, taille)
+    if st.session_state.get(f"{cle}_signature") != signature:
+        st.session_state[f"{cle}_signature"] = signature
+        st.session_state[f"{cle}_page"] = 1
+    numero = st.session_state.get(f"{cle}_page", 1)
+
+    lignes, total = source.page(choix, debut, fin, tri, croissant, (numero - 1) * taille, taille)
+    pages = nombre_pages(total, taille)
+    if numero > pages:
+        # Des lignes ont disparu (suppression) : dernière page existante
+        numero = st.session_state[f"{cle}_page"] = pages
+        lignes, total = source.page(choix, debut, fin, tri, croissant, (numero - 1) * taille, taille)
+
+    page = lignes if isinstance(lignes, pd.DataFrame) else pd.DataFrame(lignes)
+    if page.empty and colonnes is not None:
+        page = page.reindex(columns=colonnes)  # aucune ligne : colonnes quand même présentes
+    st.dataframe(page if colonnes is None else page.reindex(columns=colonnes), hide_index=True, width="stretch")
+    zone_page, zone_total = st.columns([1, 3])
+    zone_page.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{cle}_page")
+    zone_total.caption(f"{total} enfants · page {numero} / {pages}")
+    return page
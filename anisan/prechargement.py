@@ -0,0 +1,41 @@
+import importlib
+import threading
+
+# ---------- PRÉCHARGEMENT ----------
+# Les modules lourds (scikit-learn, folium, openpyxl, scipy) ne sont importés
+# qu'à la première utilisation de leur fonction : le formulaire s'affiche sans
+# les attendre. En fin de script, une fois la page dessinée, un thread de fond
+# les importe par avance pour que le premier clic ne paie pas l'import.
+_lances = set()
+_verrou = threading.Lock()
+
+
+def _charger(modules, modele):
+    for nom in modules:
+        try:
+            importlib.import_module(nom)
+        except ImportError:
+            pass  # dépendance absente : la fonction qui en a besoin le signalera elle-même
+        except RuntimeError:
+            pass  # même module importé au même moment par une page : Python lève _DeadlockError ici
+    if modele:
+        from anisan.modele import dernier_artefact, obtenir_artefact
+
+        chemin = dernier_artefact()
+        if chemin is not None:
+            try:
+                obtenir_artefact(chemin)
+            except Exception:
+                pass  # artefact illisible : l'erreur sera affichée à la première prédiction
+
+
+def prechauffer(*modules, modele=False):
+    """Importe `modules` (et charge le dernier modèle si `modele`) dans un thread de fond, une fois par processus."""
+    cle = (modules, modele)
+    with _verrou:
+        if cle in _lances:
+            return None
+        _lances.add(cle)
+    fil = threading.Thread(target=_charger, args=(modules, modele), name="anisan-prechargement", daemon=True)
+    fil.start()
+    return fil
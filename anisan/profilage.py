@@ -0,0 +1,181 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# ---------- PROFILAGE DES RERUNS ----------
+# Facultatif : rien n'est mesuré sauf si la variable d'environnement
+# ANISAN_PROFILAGE vaut 1, ou si l'URL porte ?profilage=1 (le panneau
+# d'administration n'apparaît alors que pour cette session).
+# Une application découpe son script en étapes :
+#   profilage.demarrer()          # en haut du script
+#   profilage.etape("tableau")    # chaque étape dure jusqu'à la suivante
+#   profilage.terminer()          # en bas : ferme l'étape, affiche le panneau
+# et mesure les fonctions coûteuses avec section() ou @chronometre.
+VARIABLE = "ANISAN_PROFILAGE"
+PARAMETRE = "profilage"
+
+# Durées conservées par section (fenêtre glissante) et événements gardés pour la trace
+FENETRE = 500
+EVENEMENTS_MAX = 20_000
+# Classes de l'histogramme, en millisecondes (échelle logarithmique)
+BORNES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+RERUN = "rerun"
+
+
+def _active_par_environnement():
+    return os.environ.get(VARIABLE, "").lower() in ("1", "oui", "true")
+
+
+class Profileur:
+    """Durées récentes par section, partagées par toutes les sessions du processus."""
+
+    def __init__(self, fenetre=FENETRE, evenements_max=EVENEMENTS_MAX):
+        self.fenetre = fenetre
+        self.durees = {}  # section → deque des dernières durées (s)
+        self.evenements = deque(maxlen=evenements_max)  # événements « X » de la trace Chrome
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, nom, debut, duree, **details):
+        with self._verrou:
+            self.durees.setdefault(nom, deque(maxlen=self.fenetre)).append(duree)
+            self.evenements.append({
+                "name": nom, "ph": "X", "ts": round(debut * 1e6, 1), "dur": round(duree * 1e6, 1),
+                "pid": os.getpid(), "tid": threading.get_ident(), "args": details,
+            })
+
+    def vider(self):
+        with self._verrou:
+            self.durees.clear()
+            self.evenements.clear()
+
+    def statistiques(self):
+        """Par section : nombre de mesures, médiane, p95, maximum et moyenne (ms), les plus lentes d'abord."""
+        with self._verrou:
+            durees = {nom: np.array(valeurs) * 1000 for nom, valeurs in self.durees.items()}
+        lignes = {nom: {"n": len(d), "médiane": np.median(d), "p95": np.percentile(d, 95), "max": d.max(),
+                        "moyenne": d.mean()} for nom, d in durees.items() if len(d)}
+        colonnes = ["n", "médiane", "p95", "max", "moyenne"]
+        return pd.DataFrame.from_dict(lignes, orient="index", columns=colonnes).sort_values("p95", ascending=False)
+
+    def histogramme(self, nom):
+        """Nombre de mesures récentes de `nom` par classe de durée."""
+        with self._verrou:
+            durees = np.array(self.durees.get(nom, ())) * 1000
+        comptes = np.bincount(np.searchsorted(BORNES_MS, durees, side="right"), minlength=len(BORNES_MS) + 1)
+        classes = [f"< {BORNES_MS[0]} ms"] + [f"{a}–{b} ms" for a, b in zip(BORNES_MS, BORNES_MS[1:])] + \
+                  [f"≥ {BORNES_MS[-1]} ms"]
+        return pd.Series(comptes, index=pd.CategoricalIndex(classes, categories=classes, ordered=True), name=nom)
+
+    def trace(self):
+        """Trace au format Chrome (chrome://tracing, Perfetto, speedscope) : JSON en octets."""
+        with self._verrou:
+            evenements = list(self.evenements)
+        metadonnees = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "ANISAN"}}]
+        return json.dumps({"traceEvents": metadonnees + evenements, "displayTimeUnit": "ms"},
+                          ensure_ascii=False).encode("utf-8")
+
+
+PROFILEUR = Profileur()
+
+# État du rerun en cours : Streamlit exécute chaque rerun dans un seul thread
+_etat = threading.local()
+
+
+def actif():
+    return getattr(_etat, "actif", None) or _active_par_environnement()
+
+
+# ---------- MESURES ----------
+@contextmanager
+def section(nom, **details):
+    """Mesure le bloc `with` ; ne coûte qu'un test quand le profilage est inactif."""
+    if not actif():
+        yield
+        return
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROFILEUR.enregistrer(nom, debut, time.perf_counter() - debut, **details)
+
+
+def chronometre(nom=None):
+    """Décorateur : mesure chaque appel de la fonction, sous son nom ou sous `nom`."""
+    def decorer(fonction):
+        libelle = nom or fonction.__name__
+
+        @functools.wraps(fonction)
+        def mesuree(*args, **kwargs):
+            with section(libelle):
+                return fonction(*args, **kwargs)
+
+        return mesuree
+
+    return decorer
+
+
+def demarrer():
+    """Début du rerun : lit l'activation (environnement ou ?profilage=1) et lance le chronomètre."""
+    import streamlit as st  # seules les applications en ont besoin
+
+    _etat.admin = st.query_params.get(PARAMETRE) == "1"
+    _etat.actif = _etat.admin or _active_par_environnement()
+    _etat.debut = _etat.debut_etape = time.perf_counter()
+    _etat.etape = "début"  # jusqu'à la première étape nommée
+
+
+def _fermer_etape(maintenant):
+    if getattr(_etat, "etape", None) is not None:
+        PROFILEUR.enregistrer(_etat.etape, _etat.debut_etape, maintenant - _etat.debut_etape)
+    _etat.etape, _etat.debut_etape = None, maintenant
+
+
+def etape(nom):
+    """Ferme l'étape en cours et ouvre `nom`."""
+    if not actif() or not hasattr(_etat, "debut"):
+        return
+    _fermer_etape(time.perf_counter())
+    _etat.etape = nom
+
+
+def terminer():
+    """Fin du rerun : durée totale enregistrée, puis panneau d'administration pour la session ?profilage=1.
+
+    Un rerun interrompu (st.stop, st.rerun) n'arrive pas ici et n'est pas compté.
+    """
+    if not actif() or not hasattr(_etat, "debut"):
+        return
+    maintenant = time.perf_counter()
+    _fermer_etape(maintenant)
+    PROFILEUR.enregistrer(RERUN, _etat.debut, maintenant - _etat.debut)
+    if _etat.admin:
+        afficher_panneau()
+
+
+# ---------- AFFICHAGE STREAMLIT ----------
+def afficher_panneau(profileur=PROFILEUR):
+    """Barre latérale : statistiques par section, histogramme d'une section, export de la trace."""
+    import streamlit as st  # seules les applications en ont besoin
+
+    with st.sidebar:
+        st.markdown("## ⏱️ Profilage")
+        statistiques = profileur.statistiques()
+        if statistiques.empty:
+            st.caption("Aucune mesure pour l'instant.")
+            return
+        st.dataframe(statistiques.round(1), width="stretch")
+        sections = list(statistiques.index)
+        choix = st.selectbox("Histogramme", sections, index=sections.index(RERUN) if RERUN in sections else 0,
+                             key="profilage_section")
+        st.bar_chart(profileur.histogramme(choix))
+        st.download_button("💾 Trace Chrome / speedscope", profileur.trace, "anisan-trace.json",
+                           mime="application/json", key="profilage_trace")
+        if st.button("🧹 Vider les mesures", key="profilage_vider"):
+            profileur.vider()
@@ -0,0 +1,230 @@
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from anisan.agregats import CATEGORIES
+from anisan.classification import libelles, obtenir_regle
+
+# ---------- REGISTRE EN COLONNES ----------
+# Chaque champ est un tableau NumPy typé ; les champs textuels répétitifs
+# (sexe, œdème, pays, région) sont stockés en codes de dictionnaire et la
+# phase en code de la table de règles. Les dates sont des jours depuis 1970.
+# Hors nom, un enfant occupe ainsi une cinquantaine d'octets.
+COLONNES = {
+    "id": np.int64,
+    "age": np.int16,
+    "poids": np.float32,
+    "taille": np.float32,
+    "pb": np.float32,
+    "whz": np.float32,
+    "latitude": np.float32,
+    "longitude": np.float32,
+    "date": np.int32,
+    "sexe": np.int8,
+    "oedeme": np.int8,
+    "phase": np.int8,
+    "pays": np.int16,
+    "region": np.int16,
+}
+CATEGORIELLES = ("sexe", "oedeme", "pays", "region")
+EPOQUE = date(1970, 1, 1)
+
+# Les suppressions posent une pierre tombale ; les lignes mortes sont
+# retirées en tâche de fond quand elles dépassent cette part du registre
+PART_COMPACTAGE = 0.25
+MIN_COMPACTAGE = 1000
+
+
+class Dictionnaire:
+    """Valeurs distinctes d'une colonne catégorielle et leurs codes."""
+
+    def __init__(self, valeurs=()):
+        self.valeurs = []
+        self.codes = {}
+        for valeur in valeurs:
+            self.code(valeur)
+
+    def code(self, valeur):
+        if valeur is None:
+            return -1  # valeur manquante, comme dans pandas.Categorical
+        if valeur not in self.codes:
+            self.codes[valeur] = len(self.valeurs)
+            self.valeurs.append(valeur)
+        return self.codes[valeur]
+
+
+class Registre:
+    def __init__(self, regle="mas_mam", capacite=1024):
+        self.regle = regle
+        self.phases = libelles(obtenir_regle(regle))
+        self.categories = obtenir_regle(regle)["categories"]
+        self.dictionnaires = {
+            "sexe": Dictionnaire(["M", "F"]),
+            "oedeme": Dictionnaire(["Non", "Oui"]),
+            "pays": Dictionnaire(),
+            "region": Dictionnaire(),
+        }
+        self._colonnes = {nom: np.zeros(capacite, dtype=type_) for nom, type_ in COLONNES.items()}
+        self._noms = np.empty(capacite, dtype=object)
+        self._vivant = np.zeros(capacite, dtype=bool)
+        # Identifiant → position physique : accès et suppression en O(1)
+        self._positions = {}
+        self._n = 0
+        self._morts = 0
+        self._prochain_id = 1
+        # Incrémentée à chaque ajout/suppression : clé des caches dérivés (carte...)
+        self.version = 0
+        self._verrou = threading.RLock()
+        self._compactage = None
+
+    def __len__(self):
+        return self._n - self._morts
+
+    def __contains__(self, identifiant):
+        return identifiant in self._positions
+
+    def _reconstruire(self, capacite, garde=None):
+        """Recopie les colonnes dans des tableaux de `capacite` lignes, sans les lignes mortes si `garde`."""
+        anciennes = list(self._colonnes.items()) + [("_noms", self._noms), ("_vivant", self._vivant)]
+        n = self._n if garde is None else int(garde.sum())
+        for nom, colonne in anciennes:
+            nouvelle = np.zeros(capacite, dtype=colonne.dtype) if colonne.dtype != object else np.empty(capacite, object)
+            nouvelle[:n] = colonne[:self._n] if garde is None else colonne[:self._n][garde]
+            if nom in self._colonnes:
+                self._colonnes[nom] = nouvelle
+            else:
+                setattr(self, nom, nouvelle)
+        self._n = n
+
+    def _agrandir(self):
+        self._reconstruire(2 * len(self._noms))
+
+    # ---------- ÉCRITURE ----------
+    def ajouter(self, nom, sexe, age, poids, taille, pb, oedeme, region, date_mesure, phase, whz=np.nan, pays=None,
+                latitude=np.nan, longitude=np.nan):
+        """Ajoute un enfant (phase = code de la table de règles) et renvoie son identifiant."""
+        with self._verrou:
+            self.version += 1
+            return self._ajouter(nom, sexe, age, poids, taille, pb, oedeme, region, date_mesure, phase, whz, pays,
+                                 latitude, longitude)
+
+    def _ajouter(self, nom, sexe, age, poids, taille, pb, oedeme, region, date_mesure, phase, whz, pays,
+                 latitude, longitude):
+        if self._n == len(self._noms):
+            self._agrandir()
+        i = self._n
+        valeurs = {
+            "id": self._prochain_id, "age": age, "poids": poids, "taille": taille, "pb": pb, "whz": whz,
+            "latitude": latitude, "longitude": longitude, "date": (date_mesure - EPOQUE).days, "phase": phase,
+            "sexe": sexe, "oedeme": oedeme, "pays": pays, "region": region,
+        }
+        for champ in CATEGORIELLES:
+            valeurs[champ] = self.dictionnaires[champ].code(valeurs[champ])
+        for champ, valeur in valeurs.items():
+            self._colonnes[champ][i] = valeur
+        self._noms[i] = nom
+        self._vivant[i] = True
+        self._positions[valeurs["id"]] = i
+        self._n += 1
+        self._prochain_id += 1
+        return valeurs["id"]
+
+    def supprimer(self, identifiant):
+        """Retire l'enfant `identifiant` et renvoie sa ligne, ou None s'il n'existe pas."""
+        with self._verrou:
+            i = self._positions.pop(identifiant, None)
+            if i is None:
+                return None
+            ligne = self.ligne(i)
+            self._vivant[i] = False
+            self._morts += 1
+            self.version += 1
+            if self._morts >= max(MIN_COMPACTAGE, PART_COMPACTAGE * self._n) and self._compactage is None:
+                self._compactage = threading.Thread(target=self.compacter, daemon=True)
+                self._compactage.start()
+            return ligne
+
+    def compacter(self):
+        """Retire physiquement les lignes supprimées et recalcule les positions."""
+        with self._verrou:
+            if self._morts:
+                self._reconstruire(len(self._noms), garde=self._vivant[:self._n].copy())
+                self._morts = 0
+                ids = self._colonnes["id"][:self._n].tolist()
+                self._positions = dict(zip(ids, range(self._n)))
+            self._compactage = None
+
+    # ---------- LECTURE ----------
+    def colonne(self, nom):
+        """Tableau brut des enfants présents (codes pour les champs catégoriels).
+
+        Sans suppression en attente de compactage, c'est une vue sans copie.
+        """
+        with self._verrou:
+            colonne = self._noms if nom == "nom" else self._colonnes[nom]
+            if self._morts:
+                return colonne[:self._n][self._vivant[:self._n]]
+            return colonne[:self._n]
+
+    def identifiants(self):
+        return self.colonne("id")
+
+    def codes_categories(self):
+        """Index dans agregats.CATEGORIES (MAS, MAM, Normal) de chaque enfant, via sa phase ; -1 si inconnue."""
+        # Le -1 final garde les phases inconnues (mesure manquante) au lieu de lire la dernière catégorie
+        correspondance = np.array([CATEGORIES.index(c) for c in self.categories] + [-1], dtype=np.int8)
+        return correspondance[self.colonne("phase")]
+
+    def valeur(self, champ, code):
+        return None if code < 0 else self.dictionnaires[champ].valeurs[code]
+
+    def enfant(self, identifiant):
+        """Enfant `identifiant`, valeurs décodées."""
+        with self._verrou:
+            return self.ligne(self._positions[identifiant])
+
+    def rechercher_nom(self, texte, limite=50):
+        """Identifiants des enfants dont le nom contient `texte` (sans casse), au plus `limite`."""
+        with self._verrou:
+            noms = pd.Series(self.colonne("nom"), dtype=object)
+            trouves = noms.str.contains(texte, case=False, regex=False, na=False).to_numpy()
+            return self.colonne("id")[trouves][:limite].tolist()
+
+    def ligne(self, i):
+        """Enfant à la position physique i, valeurs décodées."""
+        ligne = {nom: colonne[i].item() for nom, colonne in self._colonnes.items()}
+        for champ in ("poids", "taille", "pb", "whz", "latitude", "longitude"):
+            # float32 → float : on retire le bruit de conversion (11.199999809 → 11.2)
+            ligne[champ] = round(ligne[champ], 4)
+        for champ in CATEGORIELLES:
+            ligne[champ] = self.valeur(champ, ligne[champ])
+        ligne["nom"] = self._noms[i]
+        ligne["date"] = EPOQUE + timedelta(days=ligne["date"])
+        phase = ligne["phase"]
+        ligne["categorie"] = self.categories[phase] if phase >= 0 else None
+        ligne["phase"] = self.phases[phase] if phase >= 0 else None
+        return ligne
+
+    def vue(self):
+        """DataFrame construit sur les tableaux du registre : les colonnes numériques ne sont pas copiées."""
+        with self._verrou:
+            return self._vue()
+
+    def _vue(self):
+        n = len(self)
+        colonnes = {"id": self.colonne("id"), "nom": self.colonne("nom")}
+        for champ in ("sexe", "age", "poids", "taille", "pb", "whz", "oedeme", "pays", "region", "latitude", "longitude"):
+            if champ in CATEGORIELLES:
+                colonnes[champ] = pd.Categorical.from_codes(self.colonne(champ), self.dictionnaires[champ].valeurs)
+            else:
+                colonnes[champ] = self.colonne(champ)
+        colonnes["date"] = self.colonne("date").astype("datetime64[D]") if n else np.array([], "datetime64[D]")
+        colonnes["phase"] = pd.Categorical.from_codes(self.colonne("phase"), self.phases)
+        return pd.DataFrame(colonnes, copy=False)
+
+    def octets(self):
+        """Mémoire occupée par les colonnes utilisées (hors chaînes des noms)."""
+        colonnes = list(self._colonnes.values()) + [self._noms, self._vivant]
+        return sum(c[:self._n].nbytes for c in colonnes)
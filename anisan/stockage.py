@@ -0,0 +1,399 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import timedelta
+
+# ---------- SCHÉMA ----------
+# Colonnes d'un enregistrement (même clés que les dictionnaires de app.py)
+COLONNES = {
+    "nom": "TEXT",
+    "sexe": "TEXT",
+    "age": "INTEGER",
+    "pb": "REAL",  # stocké en mm, comme dans app.py
+    "poids": "REAL",
+    "taille": "REAL",
+    "oedeme": "TEXT",
+    "pays": "TEXT",
+    "region": "TEXT",
+    "latitude": "REAL",
+    "longitude": "REAL",
+    "prediction": "TEXT",
+    "recommandation": "TEXT",
+    "date": "TEXT",  # "%Y-%m-%d %H:%M:%S" : l'ordre texte est l'ordre chronologique
+    "uid": "TEXT",  # identifiant universel, attribué à la saisie : clé de la synchronisation
+}
+
+# Écritures regroupées dans une même transaction par l'écrivain, au plus
+LOT_ECRITURE = 256
+# Enregistrements lus par requête quand tout le registre est parcouru (exports)
+LOT_LECTURE = 10000
+
+INDEX = {
+    "idx_enfants_pays_region": ("pays", "region"),
+    "idx_enfants_date": ("date",),
+    "idx_enfants_nom": ("nom",),
+}
+# Un même uid n'est jamais enregistré deux fois (les anciennes lignes sans uid restent NULL)
+INDEX_UNIQUES = {
+    "idx_enfants_uid": ("uid",),
+}
+
+
+# ---------- INTERFACE ----------
+class Stockage:
+    """Interface commune des backends de stockage des enfants."""
+
+    def ajouter(self, enfant):
+        raise NotImplementedError
+
+    def ajouter_lot(self, enfants):
+        raise NotImplementedError
+
+    def fusionner_lot(self, enfants):
+        raise NotImplementedError
+
+    def rechercher(self, pays=None, region=None, nom=None, debut=None, fin=None, limite=None, apres_id=None):
+        raise NotImplementedError
+
+    def colonnes(self, noms, apres_id=None):
+        raise NotImplementedError
+
+    def compter(self):
+        raise NotImplementedError
+
+    def valeurs(self, colonne):
+        raise NotImplementedError
+
+    def page(self, filtres=None, debut=None, fin=None, tri=None, croissant=True, decalage=0, limite=50):
+        raise NotImplementedError
+
+    def mettre_a_jour_lot(self, champs, lignes):
+        raise NotImplementedError
+
+    def supprimer(self, identifiant):
+        raise NotImplementedError
+
+    def obtenir(self, identifiant):
+        raise NotImplementedError
+
+    def tous(self):
+        return self.rechercher()
+
+    def par_lots(self, taille=LOT_LECTURE, apres_id=0):
+        """Enregistrements d'id > `apres_id`, lot après lot dans l'ordre des id : un seul lot en mémoire à la fois."""
+        dernier_id = apres_id
+        while True:
+            lot = self.rechercher(apres_id=dernier_id, limite=taille)
+            if not lot:
+                return
+            yield lot
+            dernier_id = lot[-1]["id"]
+
+    def fermer(self):
+        pass
+
+
+# ---------- SQLITE ----------
+class StockageSQLite(Stockage):
+    """Stockage SQLite en mode WAL, indexé sur pays/région, date et nom.
+
+    Un seul écrivain : les sessions Streamlit (threads) déposent leurs écritures
+    dans une file, un thread les applique et attend leur validation. Les lectures
+    passent par une connexion par thread et ne bloquent pas les écritures (WAL).
+    """
+
+    def __init__(self, chemin="enfants.db"):
+        self.chemin = chemin
+        self._local = threading.local()
+        self._lecteurs = []
+        self._verrou = threading.Lock()  # protège la liste des lecteurs
+        # Connexion d'écriture, réservée au thread écrivain ; transactions gérées à la main
+        self._conn = self._connecter(isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Validation synchronisée sur disque : un enregistrement confirmé survit à une coupure
+        # (le regroupement des écritures en amortit le coût)
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._creer_schema()
+        self._file = queue.Queue()
+        self._ecrivain = threading.Thread(target=self._ecrire, name="anisan-ecrivain", daemon=True)
+        self._ecrivain.start()
+
+    def _connecter(self, **options):
+        conn = sqlite3.connect(self.chemin, check_same_thread=False, timeout=30, **options)
+        conn.row_factory = sqlite3.Row
+        # Attente en cas de verrou tenu par un autre processus (CLI, archivage...)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _lecture(self):
+        """Connexion de lecture propre au thread appelant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connecter()
+            with self._verrou:
+                self._lecteurs.append(conn)
+        return conn
+
+    # ---------- ÉCRIVAIN UNIQUE ----------
+    def _soumettre(self, operation, *arguments):
+        """Confie l'écriture à l'écrivain et attend qu'elle soit validée ; renvoie son résultat."""
+        resultat = Future()
+        self._file.put((operation, arguments, resultat))
+        return resultat.result()
+
+    def _ecrire(self):
+        while True:
+            travail = self._file.get()
+            if travail is None:
+                return
+            # Tout ce qui attend dans la file part dans la même transaction
+            travaux = [travail]
+            while len(travaux) < LOT_ECRITURE:
+                try:
+                    travail = self._file.get_nowait()
+                except queue.Empty:
+                    break
+                if travail is None:
+                    self._file.put(None)  # arrêt après ce lot
+                    break
+                travaux.append(travail)
+            self._appliquer(travaux)
+
+    def _appliquer(self, travaux):
+        """Une transaction pour le lot, un point de sauvegarde par écriture :
+        une écriture en erreur est annulée seule, les autres sont validées."""
+        resultats = []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for operation, arguments, _ in travaux:
+                self._conn.execute("SAVEPOINT ecriture")
+                try:
+                    resultats.append((operation(*arguments), None))
+                    self._conn.execute("RELEASE ecriture")
+                except Exception as erreur:
+                    self._conn.execute("ROLLBACK TO ecriture")
+                    self._conn.execute("RELEASE ecriture")
+                    resultats.append((None, erreur))
+            self._conn.execute("COMMIT")
+        except Exception as erreur:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            resultats = [(None, erreur)] * len(travaux)
+        for (_, _, futur), (valeur, erreur) in zip(travaux, resultats):
+            if erreur is None:
+                futur.set_result(valeur)
+            else:
+                futur.set_exception(erreur)
+
+    def _creer_schema(self):
+        colonnes = ", ".join(f"{nom} {type_}" for nom, type_ in COLONNES.items())
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS enfants (id INTEGER PRIMARY KEY AUTOINCREMENT, {colonnes})"
+            )
+            # Ajoute les colonnes apparues depuis la création de la base
+            existantes = {ligne["name"] for ligne in self._conn.execute("PRAGMA table_info(enfants)")}
+            for nom, type_ in COLONNES.items():
+                if nom not in existantes:
+                    self._conn.execute(f"ALTER TABLE enfants ADD COLUMN {nom} {type_}")
+            for nom_index, champs in INDEX.items():
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {nom_index} ON enfants ({', '.join(champs)})")
+            for nom_index, champs in INDEX_UNIQUES.items():
+                self._conn.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {nom_index} ON enfants ({', '.join(champs)})"
+                )
+            # Lignes antérieures à l'uid : identifiant attribué une fois pour toutes
+            self._conn.execute("UPDATE enfants SET uid = lower(hex(randomblob(16))) WHERE uid IS NULL")
+
+    def _valeurs(self, enfant):
+        uid = enfant.get("uid")
+        if not isinstance(uid, str) or not uid:
+            uid = uuid.uuid4().hex  # saisie locale : l'enregistrement reçoit son identifiant ici
+        return tuple(uid if colonne == "uid" else enfant.get(colonne) for colonne in COLONNES)
+
+    def _executer(self, requete, parametres=()):
+        return self._conn.execute(requete, parametres)
+
+    def _executer_plusieurs(self, requete, lignes):
+        return self._conn.executemany(requete, lignes).rowcount
+
+    def ajouter(self, enfant):
+        requete = f"INSERT INTO enfants ({', '.join(COLONNES)}) VALUES ({', '.join('?' * len(COLONNES))})"
+        return self._soumettre(lambda: self._executer(requete, self._valeurs(enfant)).lastrowid)
+
+    def ajouter_lot(self, enfants):
+        # Une seule écriture pour tout le lot : entièrement validée ou entièrement annulée
+        requete = f"INSERT INTO enfants ({', '.join(COLONNES)}) VALUES ({', '.join('?' * len(COLONNES))})"
+        return self._soumettre(self._executer_plusieurs, requete, [self._valeurs(e) for e in enfants])
+
+    def fusionner_lot(self, enfants):
+        """Ajoute les enfants dont l'uid est inconnu ; renvoie le nombre de lignes réellement ajoutées.
+
+        Idempotent : un lot renvoyé après une coupure n'ajoute rien. En cas de
+        conflit sur l'uid, la version déjà enregistrée est conservée.
+        """
+        requete = (f"INSERT INTO enfants ({', '.join(COLONNES)}) VALUES ({', '.join('?' * len(COLONNES))}) "
+                   "ON CONFLICT(uid) DO NOTHING")
+        return self._soumettre(self._executer_plusieurs, requete, [self._valeurs(e) for e in enfants])
+
+    def rechercher(self, pays=None, region=None, nom=None, debut=None, fin=None, limite=None, apres_id=None):
+        conditions, parametres = [], []
+        for colonne, valeur in (("pays", pays), ("region", region), ("nom", nom)):
+            if valeur is not None:
+                conditions.append(f"{colonne} = ?")
+                parametres.append(valeur)
+        if debut is not None:
+            conditions.append("date >= ?")
+            parametres.append(debut)
+        if fin is not None:
+            conditions.append("date <= ?")
+            parametres.append(fin)
+        if apres_id is not None:
+            # Lecture incrémentale (archivage) : seulement les enregistrements plus récents
+            conditions.append("id > ?")
+            parametres.append(apres_id)
+
+        requete = "SELECT * FROM enfants"
+        if conditions:
+            requete += " WHERE " + " AND ".join(conditions)
+        requete += " ORDER BY id"
+        if limite is not None:
+            requete += " LIMIT ?"
+            parametres.append(limite)
+
+        return [dict(ligne) for ligne in self._lecture().execute(requete, parametres)]
+
+    def colonnes(self, noms, apres_id=None):
+        """{colonne: liste des valeurs} de `noms` (plus l'id), dans l'ordre des id.
+
+        Une seule requête sur les colonnes utiles, sans dictionnaire par ligne :
+        pour les chargements vectorisés (agrégats, carte) de tout le registre.
+        """
+        noms = ["id"] + [self._colonne(nom) for nom in noms if nom != "id"]
+        requete = f"SELECT {', '.join(noms)} FROM enfants"
+        parametres = []
+        if apres_id is not None:
+            requete += " WHERE id > ?"
+            parametres.append(apres_id)
+        lignes = self._lecture().execute(requete + " ORDER BY id", parametres).fetchall()
+        valeurs = list(zip(*lignes)) if lignes else [()] * len(noms)
+        return {nom: list(colonne) for nom, colonne in zip(noms, valeurs)}
+
+    def obtenir(self, identifiant):
+        """L'enregistrement complet d'id `identifiant` (clé primaire), ou None."""
+        ligne = self._lecture().execute("SELECT * FROM enfants WHERE id = ?", (identifiant,)).fetchone()
+        return None if ligne is None else dict(ligne)
+
+    def compter(self):
+        return self._lecture().execute("SELECT COUNT(*) FROM enfants").fetchone()[0]
+
+    # ---------- PAGINATION ----------
+    def _colonne(self, colonne):
+        # Les noms de colonnes sont insérés dans le SQL : uniquement ceux du schéma
+        if colonne != "id" and colonne not in COLONNES:
+            raise ValueError(f"Colonne inconnue : {colonne}")
+        return colonne
+
+    def valeurs(self, colonne):
+        """Valeurs distinctes non nulles d'une colonne (options des filtres)."""
+        requete = f"SELECT DISTINCT {self._colonne(colonne)} FROM enfants WHERE {colonne} IS NOT NULL ORDER BY 1"
+        return [ligne[0] for ligne in self._lecture().execute(requete)]
+
+    def page(self, filtres=None, debut=None, fin=None, tri=None, croissant=True, decalage=0, limite=50):
+        """(lignes de la page, nombre total de lignes filtrées) ; `filtres` : {colonne: valeurs acceptées}.
+
+        L'identifiant départage les ex æquo : l'ordre reste le même d'une page à l'autre.
+        """
+        conditions, parametres = [], []
+        for colonne, valeurs in (filtres or {}).items():
+            if valeurs:
+                conditions.append(f"{self._colonne(colonne)} IN ({', '.join('?' * len(valeurs))})")
+                parametres.extend(valeurs)
+        if debut is not None:
+            conditions.append("date >= ?")
+            parametres.append(str(debut))
+        if fin is not None:
+            # Dates enregistrées avec l'heure : jusqu'à la fin du jour `fin`
+            conditions.append("date < ?")
+            parametres.append(str(fin + timedelta(days=1)))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        sens = "ASC" if croissant else "DESC"
+        ordre = f"{self._colonne(tri)} {sens}, id {sens}" if tri is not None else f"id {sens}"
+
+        conn = self._lecture()
+        total = conn.execute(f"SELECT COUNT(*) FROM enfants{where}", parametres).fetchone()[0]
+        requete = f"SELECT * FROM enfants{where} ORDER BY {ordre} LIMIT ? OFFSET ?"
+        return [dict(ligne) for ligne in conn.execute(requete, parametres + [limite, decalage])], total
+
+    def mettre_a_jour_lot(self, champs, lignes):
+        """Met à jour `champs` pour chaque ligne (valeurs..., id), en une transaction."""
+        inconnus = set(champs) - set(COLONNES)
+        if inconnus:
+            raise ValueError(f"Colonnes inconnues : {', '.join(sorted(inconnus))}")
+        requete = f"UPDATE enfants SET {', '.join(f'{c} = ?' for c in champs)} WHERE id = ?"
+        return self._soumettre(self._executer_plusieurs, requete, list(lignes))
+
+    def supprimer(self, identifiant):
+        """Supprime un seul enregistrement, par sa clé primaire."""
+        return self._soumettre(lambda: self._executer("DELETE FROM enfants WHERE id = ?", (identifiant,)).rowcount)
+
+    def instantane(self, chemin):
+        """Copie cohérente de la base vers `chemin`, écrite à côté puis renommée :
+        le fichier de destination n'est jamais partiel."""
+        provisoire = chemin + ".tmp"
+        destination = sqlite3.connect(provisoire)
+        try:
+            self._lecture().backup(destination)
+        finally:
+            destination.close()
+        os.replace(provisoire, chemin)
+        return chemin
+
+    def fermer(self):
+        # Les écritures déjà déposées sont appliquées avant l'arrêt
+        self._file.put(None)
+        self._ecrivain.join()
+        self._conn.close()
+        with self._verrou:
+            for conn in self._lecteurs:
+                conn.close()
+            self._lecteurs.clear()
+
+
+# Backends disponibles, choisis selon l'extension du fichier
+BACKENDS = {
+    ".db": StockageSQLite,
+    ".sqlite": StockageSQLite,
+}
+
+
+def ouvrir_stockage(chemin="enfants.db"):
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension not in BACKENDS:
+        raise ValueError(f"Aucun backend de stockage pour l'extension « {extension} »")
+    return BACKENDS[extension](chemin)
+
+
+# ---------- MIGRATION ----------
+def migrer_json(chemin_json, stockage):
+    """Copie en une fois les enregistrements de l'ancien enfants.json dans le stockage."""
+    with open(chemin_json, "r", encoding="utf-8") as f:
+        donnees = json.load(f)
+    stockage.ajouter_lot(donnees)
+    return len(donnees)
+
+
+if __name__ == "__main__":
+    # python -m anisan.stockage enfants.json enfants.db
+    source = sys.argv[1] if len(sys.argv) > 1 else "enfants.json"
+    destination = sys.argv[2] if len(sys.argv) > 2 else "enfants.db"
+    stockage = ouvrir_stockage(destination)
+    n = migrer_json(source, stockage)
+    stockage.fermer()
+    print(f"✅ {n} enregistrements migrés de {source} vers {destination}")
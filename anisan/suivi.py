@@ -0,0 +1,220 @@
+from datetime import date
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+from anisan.geo import normaliser
+
+# ---------- IDENTITÉ DES ENFANTS ----------
+# Chaque visite est rattachée à un enfant : par son identifiant (carte,
+# bracelet) s'il est connu, sinon par rapprochement nom / sexe / date de
+# naissance. Le rapprochement ne compare une visite qu'aux enfants de ses
+# blocs (même sexe, mois de naissance voisin, et même début ou même fin de
+# nom) : jamais à tout le registre.
+EPOQUE = date(1970, 1, 1)
+JOURS_PAR_MOIS = 30.4375
+
+SEUIL_NOM = 0.85  # ratio difflib minimal entre noms normalisés
+TOLERANCE_NAISSANCE = 45  # jours : l'âge est saisi en mois
+LARGEUR_BLOC = 30  # jours de naissance par bloc
+# Blocs voisins interrogés : assez pour couvrir toute la tolérance de part et d'autre
+VOISINS = -(-TOLERANCE_NAISSANCE // LARGEUR_BLOC)
+LONGUEUR_PREFIXE = 2
+
+# ---------- ISSUES PCIMA ----------
+# Sortie guérie : VISITES_GUERISON visites consécutives sans malnutrition.
+# Abandon : absent depuis ABANDON_JOURS (deux visites hebdomadaires manquées).
+# Non-répondant : ni guéri ni sorti après DUREE_MAX jours de traitement.
+VISITES_GUERISON = 2
+ABANDON_JOURS = 14
+DUREE_MAX = 120
+ISSUES = ("guéri", "abandon", "non-répondant", "en cours")
+COLONNES_VITESSES = ["visites", "admission", "derniere visite", "jours", "poids admission", "poids minimal",
+                     "poids actuel", "gain (g/kg/j)", "variation PB"]
+# Normes Sphère pour un programme de prise en charge de la malnutrition aiguë
+NORMES = {"guéri": (">", 75.0), "abandon": ("<", 15.0)}
+
+
+def naissance(date_mesure, age_mois):
+    """Date de naissance estimée, en jours depuis 1970."""
+    return (date_mesure - EPOQUE).days - int(round(age_mois * JOURS_PAR_MOIS))
+
+
+class IndexIdentites:
+    def __init__(self):
+        self.noms = []  # nom tel que saisi à la première visite
+        self._normalises = []
+        self.sexes = []
+        self.naissances = []
+        self.codes = {}  # identifiant saisi (carte...) → enfant
+        self._code_de = {}  # enfant → son identifiant
+        self.visites = {}  # visite → enfant
+        self._blocs = {}
+
+    def __len__(self):
+        return len(self.noms)
+
+    def _cles(self, nom, sexe, jour, voisins=True):
+        """Blocs d'un enfant : une faute de frappe doit toucher le début et la fin du nom pour le faire manquer."""
+        bloc = jour // LARGEUR_BLOC
+        compact = nom.replace(" ", "")
+        # Blocs voisins : deux naissances dans la tolérance tombent parfois à deux blocs d'écart
+        periode = range(bloc - VOISINS, bloc + VOISINS + 1) if voisins else (bloc,)
+        return [(bout, sexe, m) for bout in (compact[:LONGUEUR_PREFIXE], "…" + compact[-LONGUEUR_PREFIXE:])
+                for m in periode]
+
+    def candidats(self, nom, sexe, jour):
+        """Enfants des blocs de la visite qui lui ressemblent : [(enfant, score)], meilleur d'abord."""
+        nom = normaliser(nom)
+        # Le nom cherché en seconde séquence : difflib ne l'indexe qu'une fois pour tous les candidats
+        comparaison = SequenceMatcher(None, b=nom)
+        vus, resultats = set(), []
+        for cle in self._cles(nom, sexe, jour):
+            for enfant in self._blocs.get(cle, ()):
+                if enfant in vus:
+                    continue
+                vus.add(enfant)
+                if abs(self.naissances[enfant] - jour) > TOLERANCE_NAISSANCE:
+                    continue
+                comparaison.set_seq1(self._normalises[enfant])
+                # quick_ratio majore ratio : les noms trop différents sont écartés sans le calcul complet
+                if comparaison.quick_ratio() < SEUIL_NOM:
+                    continue
+                score = comparaison.ratio()
+                if score >= SEUIL_NOM:
+                    resultats.append((enfant, score))
+        return sorted(resultats, key=lambda r: -r[1])
+
+    def _creer(self, nom, sexe, jour):
+        enfant = len(self.noms)
+        self.noms.append(nom)
+        nom = normaliser(nom)
+        self._normalises.append(nom)
+        self.sexes.append(sexe)
+        self.naissances.append(jour)
+        for cle in self._cles(nom, sexe, jour, voisins=False):
+            self._blocs.setdefault(cle, []).append(enfant)
+        return enfant
+
+    def identifier(self, visite, nom, sexe, date_mesure, age_mois, code=None):
+        """Enfant de la visite : par code s'il est connu, sinon par rapprochement, sinon nouvel enfant.
+
+        Un code nouveau ne se rapproche que d'un enfant encore sans code :
+        deux cartes différentes sont toujours deux enfants.
+        """
+        jour = naissance(date_mesure, age_mois)
+        enfant = self.codes.get(code) if code else None
+        if enfant is None:
+            trouves = [k for k, _ in self.candidats(nom, sexe, jour) if not code or k not in self._code_de]
+            enfant = trouves[0] if trouves else self._creer(nom, sexe, jour)
+        if code:
+            self.codes[code] = enfant
+            self._code_de[enfant] = code
+        self.visites[visite] = enfant
+        return enfant
+
+    def enfants_de(self, visites):
+        """Enfant de chaque visite (tableau), -1 pour une visite inconnue."""
+        return pd.Series(self.visites, dtype=np.int64).reindex(visites).fillna(-1).to_numpy(np.int64)
+
+
+# ---------- HISTORIQUES ----------
+class Historiques:
+    """Visites rangées par enfant puis par date, contiguës (format CSR) :
+    les visites de l'enfant k sont les lignes debuts[k]:debuts[k + 1]."""
+
+    def __init__(self, enfants, dates, **mesures):
+        enfants = np.asarray(enfants, dtype=np.int64)
+        jours = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        garde = enfants >= 0
+        ordre = np.flatnonzero(garde)[np.lexsort((jours[garde], enfants[garde]))]
+        self.ordre = ordre
+        self.enfant = enfants[ordre]
+        self.jour = jours[ordre]
+        self.mesures = {nom: np.asarray(valeurs)[ordre] for nom, valeurs in mesures.items()}
+        self.enfants, self.debuts = np.unique(self.enfant, return_index=True)
+        self.debuts = np.append(self.debuts, len(ordre))
+        self.nombre = np.diff(self.debuts)
+
+    def __len__(self):
+        return len(self.enfants)
+
+    def visites(self, enfant):
+        """Visites d'un enfant : DataFrame par date."""
+        k = np.searchsorted(self.enfants, enfant)
+        if k == len(self.enfants) or self.enfants[k] != enfant:
+            return pd.DataFrame(columns=["date", *self.mesures])
+        tranche = slice(self.debuts[k], self.debuts[k + 1])
+        return pd.DataFrame({"date": self.jour[tranche].astype("datetime64[D]"),
+                             **{nom: valeurs[tranche] for nom, valeurs in self.mesures.items()}})
+
+    def _premiers(self, valeurs):
+        return valeurs[self.debuts[:-1]]
+
+    def _derniers(self, valeurs):
+        return valeurs[self.debuts[1:] - 1]
+
+    def vitesses(self):
+        """Par enfant : durée de suivi, gain de poids en g/kg/jour depuis le poids minimal, variation du PB."""
+        poids = self.mesures["poids"].astype(np.float64)
+        pb = self.mesures["pb"].astype(np.float64)
+        if not len(self):
+            return pd.DataFrame(columns=COLONNES_VITESSES, index=pd.Index([], name="enfant"))
+        # Poids minimal de chaque enfant et jour où il est atteint (premier minimum)
+        minimum = np.minimum.reduceat(np.where(np.isnan(poids), np.inf, poids), self.debuts[:-1])
+        est_min = poids == np.repeat(minimum, self.nombre)
+        # Sentinelle en fin de tableau : enfant sans aucun poids, son minimum reste infini
+        position = np.append(np.flatnonzero(est_min), len(poids) - 1)
+        premier_min = position[np.searchsorted(position, self.debuts[:-1])]
+        jours_depuis_min = self._derniers(self.jour) - self.jour[premier_min]
+        minimum[~np.isfinite(minimum)] = np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain = 1000 * (self._derniers(poids) - minimum) / (minimum * jours_depuis_min)
+        return pd.DataFrame({
+            "visites": self.nombre,
+            "admission": self._premiers(self.jour).astype("datetime64[D]"),
+            "derniere visite": self._derniers(self.jour).astype("datetime64[D]"),
+            "jours": self._derniers(self.jour) - self._premiers(self.jour),
+            "poids admission": self._premiers(poids),
+            "poids minimal": minimum,
+            "poids actuel": self._derniers(poids),
+            "gain (g/kg/j)": np.where(jours_depuis_min > 0, gain, np.nan),
+            "variation PB": self._derniers(pb) - self._premiers(pb),
+        }, index=pd.Index(self.enfants, name="enfant"))
+
+    def issues(self, malnutris, reference=None):
+        """Issue PCIMA de chaque enfant admis (malnutri à la première visite), NaN pour les autres.
+
+        `malnutris` : booléen par visite, dans l'ordre des tableaux d'origine.
+        """
+        if not len(self):
+            return pd.Series([], dtype=object, index=pd.Index([], name="enfant"), name="issue")
+        malnutri = np.asarray(malnutris, dtype=bool)[self.ordre]
+        reference = self.jour.max() if reference is None else (reference - EPOQUE).days
+        # Visites sans malnutrition qui terminent chaque historique : depuis la
+        # dernière visite malnutrie (maximum cumulé de sa position), bornée au début de l'enfant
+        positions = np.where(malnutri, np.arange(len(malnutri)), -1)
+        derniere_malnutrie = np.maximum.accumulate(positions)[self.debuts[1:] - 1]
+        serie_finale = self.debuts[1:] - 1 - np.maximum(derniere_malnutrie, self.debuts[:-1] - 1)
+
+        admis = self._premiers(malnutri)
+        gueri = serie_finale >= VISITES_GUERISON
+        absent = reference - self._derniers(self.jour) >= ABANDON_JOURS
+        trop_long = self._derniers(self.jour) - self._premiers(self.jour) >= DUREE_MAX
+        issue = np.select([gueri, absent, trop_long], ISSUES[:3], default=ISSUES[3]).astype(object)
+        issue[~admis] = None
+        return pd.Series(issue, index=pd.Index(self.enfants, name="enfant"), name="issue")
+
+
+def indicateurs(issues):
+    """Taux de sortie (guéri, abandon, non-répondant) parmi les sortis, et respect des normes Sphère."""
+    issues = pd.Series(issues).dropna()
+    sortis = issues[issues != "en cours"]
+    resultat = {"admis": len(issues), "sortis": len(sortis), "en cours": int((issues == "en cours").sum())}
+    for issue in ISSUES[:3]:
+        resultat[f"% {issue}"] = 100 * float((sortis == issue).mean()) if len(sortis) else float("nan")
+    for issue, (sens, seuil) in NORMES.items():
+        taux = resultat[f"% {issue}"]
+        resultat[f"norme {issue}"] = taux > seuil if sens == ">" else taux < seuil
+    return resultat
@@ -0,0 +1,226 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from anisan.agregats import CATEGORIES
+from anisan.carte import SEUILS_MAG
+
+# ---------- SURVEILLANCE TEMPORELLE ----------
+# Par (pays, région), une série de compteurs par période (semaine ISO ou
+# mois) : enfants classés, MAS, MAM. Un ajout ou une suppression incrémente
+# une case ; les fenêtres glissantes se lisent par sommes cumulées, en
+# O(nombre de périodes) quel que soit le nombre d'enfants.
+PAS = ("semaine", "mois")
+
+# Urgence : MAG (MAS + MAM) ≥ 15 %, dernier seuil OMS de carte.SEUILS_MAG
+SEUIL_URGENCE = 100 * SEUILS_MAG[-1]
+# Hausse brutale : + HAUSSE points de MAG d'une fenêtre à la précédente, et
+# intervalles de confiance disjoints (pas un simple effet d'échantillonnage)
+HAUSSE = 5.0
+# En dessous de cet effectif dans la fenêtre, pas d'alerte : intervalle trop large
+N_MIN = 30
+Z = 1.96  # intervalle de confiance à 95 %
+
+_N, _MAS, _MAM = range(3)
+
+
+def wilson(k, n, z=Z):
+    """Intervalle de Wilson (bornes en %) d'une proportion k / n ; NaN si n = 0."""
+    k = np.asarray(k, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = k / n
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        marge = z / (1 + z * z / n) * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return 100 * np.clip(centre - marge, 0, 1), 100 * np.clip(centre + marge, 0, 1)
+
+
+def periodes(dates, pas="semaine"):
+    """Numéro de période de chaque date : semaines commençant le lundi, ou mois, depuis 1970."""
+    jours = np.asarray(dates, dtype="datetime64[D]")
+    if pas == "mois":
+        return jours.astype("datetime64[M]").astype(np.int64)
+    # Le 1er janvier 1970 est un jeudi : +3 jours alignent les semaines sur le lundi
+    return (jours.astype(np.int64) + 3) // 7
+
+
+def debuts(numeros, pas="semaine"):
+    """Premier jour de chaque période."""
+    numeros = np.asarray(numeros, dtype=np.int64)
+    if pas == "mois":
+        return numeros.astype("datetime64[M]").astype("datetime64[D]")
+    return (numeros * 7 - 3).astype("datetime64[D]")
+
+
+class Surveillance:
+    def __init__(self, pas="semaine"):
+        if pas not in PAS:
+            raise ValueError(f"Pas inconnu : {pas} (attendu : {', '.join(PAS)})")
+        self.pas = pas
+        # (pays, région) → [première période, compteurs (périodes × 3)]
+        self.series = {}
+        self.version = 0
+        self._verrou = threading.Lock()
+
+    def _compteurs(self, cle, premiere, derniere):
+        """Compteurs de `cle`, agrandis pour couvrir les périodes premiere..derniere."""
+        serie = self.series.get(cle)
+        if serie is None:
+            serie = self.series[cle] = [premiere, np.zeros((derniere - premiere + 1, 3), dtype=np.int64)]
+        origine, compteurs = serie
+        avant, apres = max(origine - premiere, 0), max(derniere - (origine + len(compteurs) - 1), 0)
+        if avant or apres:
+            # Marge du côté qui grandit : les ajouts au fil de l'eau n'agrandissent pas à chaque période
+            avant, apres = avant and max(avant, 8), apres and max(apres, 8)
+            serie[1] = np.pad(compteurs, ((avant, apres), (0, 0)))
+            serie[0] = origine - avant
+        return serie
+
+    # ---------- ÉCRITURE ----------
+    def _appliquer(self, signe, pays, region, date_mesure, categorie):
+        if categorie not in CATEGORIES:
+            return
+        periode = int(periodes([date_mesure], self.pas)[0])
+        with self._verrou:
+            origine, compteurs = self._compteurs((pays, region), periode, periode)
+            compteurs[periode - origine, _N] += signe
+            if categorie != "Normal":
+                compteurs[periode - origine, _MAS if categorie == "MAS" else _MAM] += signe
+            self.version += 1
+
+    def ajouter(self, pays, region, date_mesure, categorie):
+        self._appliquer(1, pays, region, date_mesure, categorie)
+
+    def retirer(self, pays, region, date_mesure, categorie):
+        self._appliquer(-1, pays, region, date_mesure, categorie)
+
+    def ajouter_lot(self, pays, regions, dates, categories):
+        """Chargement initial vectorisé. `categories` : index dans CATEGORIES, -1 si inconnu."""
+        cat = np.asarray(categories, dtype=np.int64)
+        jours = np.asarray(dates, dtype="datetime64[D]")
+        garde = (cat >= 0) & ~np.isnat(jours)
+        cles = pd.MultiIndex.from_arrays([np.asarray(pays, dtype=object)[garde],
+                                          np.asarray(regions, dtype=object)[garde]])
+        groupes, valeurs = pd.factorize(cles)
+        cat, numeros = cat[garde], periodes(jours[garde], self.pas)
+        # Lignes regroupées par (pays, région) : un tri, puis une tranche par groupe
+        ordre = np.argsort(groupes, kind="stable")
+        bornes = np.searchsorted(groupes[ordre], np.arange(len(valeurs) + 1))
+        with self._verrou:
+            for g, cle in enumerate(valeurs):
+                dedans = ordre[bornes[g]:bornes[g + 1]]
+                p, c = numeros[dedans], cat[dedans]
+                origine, compteurs = self._compteurs(cle, int(p.min()), int(p.max()))
+                np.add.at(compteurs[:, _N], p - origine, 1)
+                np.add.at(compteurs[:, _MAS], p[c == CATEGORIES.index("MAS")] - origine, 1)
+                np.add.at(compteurs[:, _MAM], p[c == CATEGORIES.index("MAM")] - origine, 1)
+            self.version += 1
+
+    # ---------- LECTURE ----------
+    def _somme(self, cles, premiere, derniere):
+        total = np.zeros((derniere - premiere + 1, 3), dtype=np.int64)
+        for cle in cles:
+            origine, compteurs = self.series[cle]
+            debut, fin = max(origine, premiere), min(origine + len(compteurs) - 1, derniere)
+            if debut <= fin:
+                total[debut - premiere:fin - premiere + 1] += compteurs[debut - origine:fin - origine + 1]
+        return total
+
+    def _etendue(self):
+        """(première, dernière) période non vide, toutes séries confondues."""
+        bornes = []
+        for origine, compteurs in self.series.values():
+            remplies = np.flatnonzero(compteurs[:, _N])
+            if len(remplies):
+                bornes.append((origine + remplies[0], origine + remplies[-1]))
+        if not bornes:
+            return None
+        return min(b[0] for b in bornes), max(b[1] for b in bornes)
+
+    def serie(self, pays=None, region=None, fenetre=1):
+        """Prévalences par période, sur une fenêtre glissante de `fenetre` périodes, avec IC de Wilson.
+
+        Sans région, somme des régions du pays ; sans pays, de toutes les séries.
+        """
+        with self._verrou:
+            etendue = self._etendue()
+            cles = [c for c in self.series if (pays is None or c[0] == pays) and (region is None or c[1] == region)]
+            if etendue is None or not cles:
+                return pd.DataFrame(columns=["n", "MAS", "MAM", "% MAS", "% MAM", "% MAG", "IC bas", "IC haut"])
+            premiere, derniere = etendue
+            compteurs = self._somme(cles, premiere, derniere)
+        # Fenêtre glissante par différence de sommes cumulées
+        cumul = np.vstack([np.zeros((1, 3), dtype=np.int64), np.cumsum(compteurs, axis=0)])
+        fenetres = cumul[1:] - cumul[np.maximum(np.arange(1, len(cumul)) - fenetre, 0)]
+        return self._tableau(fenetres, pd.Index(debuts(np.arange(premiere, derniere + 1), self.pas), name="debut"))
+
+    @staticmethod
+    def _tableau(compteurs, index):
+        n, mas, mam = compteurs[:, _N], compteurs[:, _MAS], compteurs[:, _MAM]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tableau = pd.DataFrame({
+                "n": n, "MAS": mas, "MAM": mam,
+                "% MAS": 100 * mas / n, "% MAM": 100 * mam / n, "% MAG": 100 * (mas + mam) / n,
+            }, index=index)
+        tableau["IC bas"], tableau["IC haut"] = wilson(mas + mam, n)
+        return tableau
+
+    def etat(self, fenetre=1, jusqua=None):
+        """Dernière fenêtre et fenêtre précédente de chaque région : prévalence, IC, variation, alertes.
+
+        `jusqua` : date de fin de la fenêtre courante (par défaut, dernière période observée).
+        """
+        with self._verrou:
+            etendue = self._etendue()
+            if etendue is None:
+                return pd.DataFrame()
+            fin = etendue[1] if jusqua is None else int(periodes([jusqua], self.pas)[0])
+            cles = list(self.series)
+            courantes = np.array([self._somme([c], fin - fenetre + 1, fin).sum(axis=0) for c in cles])
+            precedentes = np.array([self._somme([c], fin - 2 * fenetre + 1, fin - fenetre).sum(axis=0) for c in cles])
+        index = pd.MultiIndex.from_tuples(cles, names=["pays", "region"])
+        tableau = self._tableau(courantes, index)
+        anterieur = self._tableau(precedentes, index)
+        tableau["% MAG précédente"] = anterieur["% MAG"]
+        tableau["variation"] = tableau["% MAG"] - anterieur["% MAG"]
+
+        suffisant = tableau["n"] >= N_MIN
+        tableau["urgence"] = suffisant & (tableau["% MAG"] >= SEUIL_URGENCE)
+        tableau["hausse"] = (suffisant & (anterieur["n"] >= N_MIN) & (tableau["variation"] >= HAUSSE)
+                             & (tableau["IC bas"] > anterieur["IC haut"]))
+        tableau.attrs["periode"] = debuts([fin], self.pas)[0]
+        return tableau[tableau["n"] > 0].sort_values("% MAG", ascending=False)
+
+    def alertes(self, fenetre=1, jusqua=None):
+        """Régions en urgence (MAG ≥ 15 %) ou en hausse brutale sur la dernière fenêtre."""
+        tableau = self.etat(fenetre, jusqua)
+        if tableau.empty:
+            return tableau
+        return tableau[tableau["urgence"] | tableau["hausse"]]
+
+
+# ---------- AFFICHAGE STREAMLIT ----------
+def afficher(surveillance, cle="surveillance"):
+    """Alertes de la dernière fenêtre et courbe de MAG (avec IC) d'une région ou de l'ensemble."""
+    import streamlit as st  # seules les applications en ont besoin
+
+    unite = "semaine" if surveillance.pas == "semaine" else "mois"
+    fenetre = st.radio("Fenêtre glissante", [1, 4, 12], horizontal=True, key=f"{cle}_fenetre",
+                       format_func=lambda k: f"{k} {unite}{'s' if k > 1 and unite == 'semaine' else ''}")
+    alertes = surveillance.alertes(fenetre)
+    if alertes.empty:
+        st.success(f"✅ Aucune région au-dessus de {SEUIL_URGENCE:.0f} % de MAG ni en hausse brutale.")
+    for (pays, region), ligne in alertes.iterrows():
+        message = (f"{region} ({pays}) : MAG {ligne['% MAG']:.1f} % [{ligne['IC bas']:.1f} – {ligne['IC haut']:.1f}], "
+                   f"{ligne['n']} enfants ; fenêtre précédente {ligne['% MAG précédente']:.1f} %")
+        if ligne["urgence"]:
+            st.error(f"🚨 Urgence – {message}")
+        else:
+            st.warning(f"📈 Hausse brutale – {message}")
+
+    zones = sorted(surveillance.series, key=str)
+    zone = st.selectbox("Zone", [None] + zones, key=f"{cle}_zone",
+                        format_func=lambda z: "Ensemble" if z is None else f"{z[1]} ({z[0]})")
+    serie = surveillance.serie(*(zone or (None, None)), fenetre=fenetre)
+    st.line_chart(serie[["% MAG", "IC bas", "IC haut"]].dropna())
@@ -0,0 +1,223 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+import traceback
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from anisan.stockage import COLONNES, ouvrir_stockage
+
+# ---------- SYNCHRONISATION HORS LIGNE ----------
+# Sur le terrain, chaque saisie est écrite dans le stockage local du poste
+# (enfants.db), qui sert de journal : elle survit à un rafraîchissement et
+# reçoit un uid. Quand le réseau revient, les enregistrements plus récents
+# que le dernier id accepté par le serveur central partent par lots JSON
+# compressés (gzip). Le central fusionne sur l'uid : un lot renvoyé après
+# une coupure n'ajoute rien. Le coût d'une synchronisation dépend du nombre
+# de nouvelles saisies, pas de la taille du registre.
+#   python -m anisan.synchro serveur --base central.db --port 8765
+#   python -m anisan.synchro envoyer --source enfants.db --url http://127.0.0.1:8765
+# Les suppressions locales ne sont pas propagées : le central garde tout ce qu'il a reçu.
+VARIABLE = "ANISAN_CENTRAL"  # URL du serveur central ; mode hors ligne activé si elle est définie
+CHEMIN_LOTS = "/lots"
+CHEMIN_ETAT = "/etat"
+TAILLE_LOT = 2000
+DELAI = 30  # secondes d'attente d'une réponse du central
+INTERVALLE = 300  # secondes entre deux tentatives automatiques
+
+_verrou = threading.Lock()
+# Dernier passage de la synchronisation automatique (affiché dans l'application)
+DERNIER_PASSAGE = {"date": None, "bilan": None, "erreur": None}
+
+
+# ---------- JOURNAL LOCAL ----------
+def _fichier_etat(stockage):
+    """Dernier id accepté par chaque serveur central, à côté de la base locale."""
+    return os.path.splitext(stockage.chemin)[0] + "-synchro.json"
+
+
+def _etat(chemin):
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ecrire_etat(chemin, etat):
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(etat, f)
+    os.replace(chemin + ".tmp", chemin)
+
+
+def dernier_id_envoye(stockage, url):
+    return _etat(_fichier_etat(stockage)).get(url, 0)
+
+
+def en_attente(stockage, url):
+    """Nombre d'enregistrements locaux pas encore acceptés par `url` (lecture des seuls id)."""
+    return len(stockage.colonnes([], apres_id=dernier_id_envoye(stockage, url))["id"])
+
+
+# ---------- ENVOI ----------
+def compresser(enfants):
+    return gzip.compress(json.dumps(enfants, ensure_ascii=False).encode("utf-8"))
+
+
+def decompresser(octets):
+    return json.loads(gzip.decompress(octets).decode("utf-8"))
+
+
+def envoyer_lot(url, enfants, delai=DELAI):
+    """POST d'un lot compressé ; renvoie la réponse du central {recus, nouveaux}."""
+    requete = urllib.request.Request(url.rstrip("/") + CHEMIN_LOTS, data=compresser(enfants), method="POST",
+                                     headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+    with urllib.request.urlopen(requete, timeout=delai) as reponse:
+        return json.load(reponse)
+
+
+def synchroniser(stockage, url, taille_lot=TAILLE_LOT):
+    """Envoie au central les enregistrements qu'il n'a pas encore acceptés ; renvoie {lots, envoyes, nouveaux}.
+
+    Le dernier id est enregistré après chaque lot accepté : si la connexion tombe
+    (OSError, levée à l'appelant), la reprise commence au lot interrompu.
+    """
+    chemin = _fichier_etat(stockage)
+    bilan = {"lots": 0, "envoyes": 0, "nouveaux": 0}
+    with _verrou:
+        etat = _etat(chemin)
+        while True:
+            lot = stockage.rechercher(apres_id=etat.get(url, 0), limite=taille_lot)
+            if not lot:
+                return bilan
+            # L'id local n'a pas de sens au central : seul l'uid identifie l'enregistrement
+            reponse = envoyer_lot(url, [{colonne: enfant[colonne] for colonne in COLONNES} for enfant in lot])
+            # Réponse lue avant d'avancer : un lot sans accusé valide sera renvoyé
+            nouveaux = int(reponse["nouveaux"])
+            etat[url] = lot[-1]["id"]
+            _ecrire_etat(chemin, etat)
+            bilan["lots"] += 1
+            bilan["envoyes"] += len(lot)
+            bilan["nouveaux"] += nouveaux
+
+
+def demarrer_synchronisation(stockage, url, intervalle=INTERVALLE):
+    """Thread de fond : tente une synchronisation à intervalle régulier ; en cas d'échec, réessaie plus tard."""
+    def boucle():
+        while True:
+            try:
+                DERNIER_PASSAGE.update(bilan=synchroniser(stockage, url), erreur=None)
+            except OSError as erreur:
+                DERNIER_PASSAGE["erreur"] = str(erreur)  # hors réseau : cas normal sur le terrain
+            except Exception as erreur:
+                # Réponse illisible du central, erreur SQLite... : notée, le thread continue
+                traceback.print_exc()
+                DERNIER_PASSAGE["erreur"] = f"{type(erreur).__name__} : {erreur}"
+            DERNIER_PASSAGE["date"] = datetime.now()
+            time.sleep(intervalle)
+
+    fil = threading.Thread(target=boucle, name="anisan-synchro", daemon=True)
+    fil.start()
+    return fil
+
+
+# ---------- SERVEUR CENTRAL (BANC LOCAL) ----------
+class _Gestionnaire(BaseHTTPRequestHandler):
+    def _repondre(self, code, contenu):
+        corps = json.dumps(contenu, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_POST(self):
+        if self.path != CHEMIN_LOTS:
+            self._repondre(404, {"erreur": f"Chemin inconnu : {self.path}"})
+            return
+        corps = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            enfants = decompresser(corps) if self.headers.get("Content-Encoding") == "gzip" else json.loads(corps)
+            if not isinstance(enfants, list) or not all(isinstance(e, dict) and e.get("uid") for e in enfants):
+                raise ValueError("Lot attendu : liste d'enregistrements portant chacun un uid")
+        except (OSError, ValueError) as erreur:
+            self._repondre(400, {"erreur": str(erreur)})
+            return
+        self._repondre(200, {"recus": len(enfants), "nouveaux": self.server.stockage.fusionner_lot(enfants)})
+
+    def do_GET(self):
+        if self.path != CHEMIN_ETAT:
+            self._repondre(404, {"erreur": f"Chemin inconnu : {self.path}"})
+            return
+        self._repondre(200, {"enregistrements": self.server.stockage.compter()})
+
+
+def serveur(stockage, hote="127.0.0.1", port=8765):
+    """Serveur HTTP du central sur `stockage` (un thread par requête, un seul écrivain SQLite)."""
+    serveur = ThreadingHTTPServer((hote, port), _Gestionnaire)
+    serveur.stockage = stockage
+    return serveur
+
+
+# ---------- AFFICHAGE STREAMLIT ----------
+def afficher(stockage, url):
+    """Saisies en attente d'envoi, dernier passage automatique et synchronisation à la demande."""
+    import streamlit as st  # seules les applications en ont besoin
+
+    attente = en_attente(stockage, url)
+    st.metric("📶 Saisies en attente d'envoi", attente)
+    if DERNIER_PASSAGE["date"] is not None:
+        if DERNIER_PASSAGE["erreur"]:
+            st.caption(f"Dernière tentative {DERNIER_PASSAGE['date']:%H:%M} en échec : {DERNIER_PASSAGE['erreur']}")
+        else:
+            st.caption(f"Dernière synchronisation {DERNIER_PASSAGE['date']:%H:%M}.")
+    if attente and st.button("🔄 Synchroniser maintenant", key="synchro_envoyer"):
+        try:
+            with st.spinner("Envoi des saisies..."):
+                bilan = synchroniser(stockage, url)
+        except OSError as erreur:
+            st.warning(f"Serveur central injoignable ({erreur}) : les saisies restent sur ce poste.")
+        except Exception as erreur:
+            st.error(f"Échec de la synchronisation ({type(erreur).__name__} : {erreur}) : "
+                     "les saisies restent sur ce poste.")
+        else:
+            st.success(f"✅ {bilan['envoyes']} saisies envoyées en {bilan['lots']} lot(s), "
+                       f"{bilan['nouveaux']} nouvelles pour le central")
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Synchronisation ANISAN poste de terrain → serveur central")
+    parser.add_argument("action", choices=["serveur", "envoyer"])
+    parser.add_argument("--base", default="central.db", help="base du serveur central")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--source", default="enfants.db", help="base locale du poste")
+    parser.add_argument("--url", default=os.environ.get(VARIABLE, "http://127.0.0.1:8765"))
+    args = parser.parse_args(arguments)
+
+    if args.action == "serveur":
+        stockage = ouvrir_stockage(args.base)
+        http = serveur(stockage, args.hote, args.port)
+        print(f"✅ Serveur central sur http://{args.hote}:{args.port} ({args.base})")
+        try:
+            http.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            http.server_close()
+            stockage.fermer()
+    else:
+        stockage = ouvrir_stockage(args.source)
+        try:
+            bilan = synchroniser(stockage, args.url)
+        finally:
+            stockage.fermer()
+        print(f"✅ {bilan['envoyes']} saisies envoyées en {bilan['lots']} lot(s), "
+              f"{bilan['nouveaux']} nouvelles pour {args.url}")
+
+
+if __name__ == "__main__":
+    main()
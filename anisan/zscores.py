@@ -0,0 +1,125 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ---------- TABLES DE RÉFÉRENCE OMS ----------
+# Paramètres LMS des standards de croissance OMS 2006 (tables simplifiées :
+# pas de 0,5 cm pour la taille, d'un mois pour l'âge) :
+#   wfl : poids pour la longueur (couché, < 24 mois), 45–110 cm
+#   wfh : poids pour la taille (debout, 24–60 mois), 65–120 cm
+#   hfa : taille pour l'âge, 0–60 mois (longueur avant 24 mois)
+#   wfa : poids pour l'âge, 0–60 mois
+FICHIER_LMS = os.path.join(os.path.dirname(__file__), "donnees", "oms_lms.csv")
+
+# Valeurs biologiquement invraisemblables selon l'OMS (erreur de saisie probable) :
+# remplacées par NaN, elles ne comptent ni dans la phase ni dans les moyennes
+BORNES_PLAUSIBLES = {"whz": (-5, 5), "haz": (-6, 6), "waz": (-6, 5)}
+
+SEXES = {"M": 0, "F": 1}
+
+_TABLES = None
+_verrou = threading.Lock()
+
+
+def tables():
+    """Tables chargées une seule fois par processus : tableaux (sexe, position, L/M/S) contigus."""
+    global _TABLES
+    with _verrou:
+        if _TABLES is None:
+            lms = pd.read_csv(FICHIER_LMS)
+            _TABLES = {}
+            for indicateur, table in lms.groupby("indicateur"):
+                x = np.sort(table["x"].unique())
+                valeurs = np.full((len(SEXES), len(x), 3), np.nan)
+                for sexe, lignes in table.groupby("sexe"):
+                    lignes = lignes.sort_values("x")
+                    valeurs[SEXES[sexe]] = lignes[["L", "M", "S"]].to_numpy()
+                _TABLES[indicateur] = {
+                    "x0": float(x[0]),
+                    "pas": float(x[1] - x[0]),
+                    "lms": np.ascontiguousarray(valeurs),
+                }
+        return _TABLES
+
+
+def code_sexe(sexe):
+    """0 pour les garçons, 1 pour les filles, -1 si inconnu.
+
+    Codes numériques : 1 = garçon ; 2 (SMART) ou 0 (anisan_app (7)) = fille.
+    """
+    valeurs = np.asarray(sexe)
+    if valeurs.dtype.kind in "iuf":
+        return np.select([valeurs == 1, (valeurs == 2) | (valeurs == 0)], [0, 1], default=-1)
+    # Peu de valeurs distinctes (« M », « Garçon »...) : on ne décode que celles-là
+    positions, distinctes = pd.factorize(valeurs.ravel(), use_na_sentinel=False)
+    initiales = [str(v).strip()[:1].upper() for v in distinctes]
+    codes = np.array([0 if i in ("M", "G") else 1 if i == "F" else -1 for i in initiales] + [-1])
+    return codes[positions]
+
+
+# ---------- CALCUL ----------
+def _lms(indicateur, sexe, x):
+    """L, M, S interpolés linéairement sur la grille de la table."""
+    table = tables()[indicateur]
+    n = table["lms"].shape[1]
+    position = (np.asarray(x, dtype=np.float64) - table["x0"]) / table["pas"]
+    valide = (position >= 0) & (position <= n - 1) & (sexe >= 0)
+    position = np.where(valide, position, 0.0)
+    i = np.minimum(position.astype(np.intp), n - 2)
+    fraction = (position - i)[:, None]
+    s = np.where(sexe >= 0, sexe, 0)
+    lms = table["lms"][s, i] * (1 - fraction) + table["lms"][s, i + 1] * fraction
+    lms[~valide] = np.nan
+    return lms[:, 0], lms[:, 1], lms[:, 2]
+
+
+def _z(y, L, M, S, ajuster):
+    y = np.asarray(y, dtype=np.float64)
+    y = np.where(y > 0, y, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = ((y / M) ** L - 1) / (L * S)
+        if ajuster:
+            # Correction OMS au-delà de ±3 DS pour les indicateurs de poids :
+            # la distance est mesurée en écarts entre 2 et 3 DS
+            def ds(k):
+                return M * (1 + L * S * k) ** (1 / L)
+
+            z = np.where(z > 3, 3 + (y - ds(3)) / (ds(3) - ds(2)), z)
+            z = np.where(z < -3, -3 + (y - ds(-3)) / (ds(-2) - ds(-3)), z)
+    return z
+
+
+def _plausibles(indicateur, z):
+    mini, maxi = BORNES_PLAUSIBLES[indicateur]
+    return np.where((z >= mini) & (z <= maxi), z, np.nan)
+
+
+def _whz(poids, taille, age, sexe):
+    taille = np.asarray(taille, dtype=np.float64)
+    couche = np.asarray(age, dtype=np.float64) < 24
+    L1, M1, S1 = _lms("wfl", sexe, taille)
+    L2, M2, S2 = _lms("wfh", sexe, taille)
+    L, M, S = np.where(couche, L1, L2), np.where(couche, M1, M2), np.where(couche, S1, S2)
+    return _z(poids, L, M, S, ajuster=True)
+
+
+def whz(poids, taille, age, sexe):
+    """Poids pour la taille : table couchée avant 24 mois, debout ensuite."""
+    return _plausibles("whz", _whz(poids, taille, age, code_sexe(sexe)))
+
+
+def haz(taille, age, sexe):
+    return _plausibles("haz", _z(taille, *_lms("hfa", code_sexe(sexe), age), ajuster=False))
+
+
+def waz(poids, age, sexe):
+    return _plausibles("waz", _z(poids, *_lms("wfa", code_sexe(sexe), age), ajuster=True))
+
+
+def mesure(indicateur, z, x, sexe):
+    """Mesure (taille pour « hfa », poids sinon) d'un z-score donné : formule LMS inversée, sans ajustement."""
+    L, M, S = _lms(indicateur, code_sexe(sexe), x)
+    with np.errstate(invalid="ignore"):
+        return M * (1 + L * S * np.asarray(z, dtype=np.float64)) ** (1 / L)
@@ -1,16 +1,25 @@
 import streamlit as st
-import pandas as pd
 from datetime import date
+from anisan.classification import classer_codes, libelles, obtenir_regle
+from anisan import prechargement, profilage
+from anisan.cube import Cube, afficher
+from anisan.export import exporteur
+from anisan.pagination import SourceTableau, afficher_table
 
 st.set_page_config(page_title="ANISAN - Application Nutritionnelle", layout="centered")
+profilage.demarrer()
 
 st.title("🍼 Application ANISAN - Suivi Nutritionnel des Enfants")
 
 # Initialisation
 if "enfants" not in st.session_state:
     st.session_state["enfants"] = []
+# Effectifs par mois, tranche d'âge, sexe et phase, tenus à jour à chaque ajout
+if "cube" not in st.session_state:
+    st.session_state["cube"] = Cube(regle="ipc")
 
 # Formulaire
+profilage.etape("formulaire")
 st.markdown("### ➕ Ajouter un nouvel enfant")
 with st.form("formulaire_enfant"):
     nom = st.text_input("Nom de l’enfant")
@@ -24,21 +33,8 @@ with st.form("formulaire_enfant"):
     submitted = st.form_submit_button("📨 Enregistrer")
 
 if submitted:
-    if oedeme == "Oui" or pb <= 11.0:
-        phase = "Famine nutritionnelle"
-        couleur = "🔴"
-    elif pb <= 11.5:
-        phase = "Urgence nutritionnelle"
-        couleur = "🟥"
-    elif pb <= 12.5:
-        phase = "Crise nutritionnelle (MAM)"
-        couleur = "🟧"
-    elif pb <= 12.9:
-        phase = "Stress nutritionnel"
-        couleur = "🟨"
-    else:
-        phase = "Phase minimale"
-        couleur = "🟢"
+    phase = int(classer_codes([pb], [oedeme], regle="ipc")[0])
+    statut = libelles(obtenir_regle("ipc"))[phase]
 
     enfant = {
         "Nom": nom,
@@ -49,47 +45,36 @@ if submitted:
         "PB (cm)": pb,
         "Œdème": oedeme,
         "Date de mesure": date_mesure.strftime("%d/%m/%Y"),
-        "Statut nutritionnel": f"{couleur} {phase}"
+        "Statut nutritionnel": statut
     }
     st.session_state["enfants"].append(enfant)
+    st.session_state["cube"].ajouter(None, None, date_mesure, age, sexe, phase)
     st.success("✅ Données enregistrées avec succès !")
 
 # Tableau
+profilage.etape("tableau")
 st.markdown("### 📊 Tableau des enfants enregistrés")
 if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    st.dataframe(df, use_container_width=True)
+    # Seule la page affichée est envoyée au navigateur
+    source = SourceTableau(st.session_state["enfants"], "Date de mesure")
+    afficher_table(source, "enfants", filtres=["Statut nutritionnel", "Sexe"], colonne_date="Date de mesure",
+                   colonnes=list(source.df.columns))
 
-    # Export
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button("📄 Télécharger les données (CSV)", data=csv, file_name="donnees_anisan.csv", mime="text/csv")
-
-    excel_path = "donnees_anisan.xlsx"
-    df.to_excel(excel_path, index=False)
-    with open(excel_path, "rb") as f:
-        st.download_button("📊 Télécharger les données (Excel)", data=f, file_name="donnees_anisan.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    enfants = st.session_state["enfants"]
+    st.download_button("📄 Télécharger les données (CSV)", data=exporteur(enfants, "csv"), file_name="donnees_anisan.csv", mime="text/csv")
+    st.download_button("📊 Télécharger les données (Excel)", data=exporteur(enfants, "xlsx"), file_name="donnees_anisan.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 else:
     st.info("Aucune donnée enregistrée pour le moment.")
 
 # Graphiques
+profilage.etape("graphiques")
 st.markdown("## 📈 Visualisation des données nutritionnelles")
 if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    df["Phase simplifiée"] = df["Statut nutritionnel"].str.extract(r"[🔴🟥🟧🟨🟢] (.*)")
-
-    st.markdown("### 📌 Nombre d’enfants par phase nutritionnelle")
-    phase_count = df["Phase simplifiée"].value_counts().sort_index()
-    st.bar_chart(phase_count)
-
-    st.markdown("### 👦👧 Répartition par sexe")
-    sexe_count = df["Sexe"].value_counts()
-    st.bar_chart(sexe_count)
-
-    st.markdown("### ⏳ Répartition par tranche d’âge (mois)")
-    bins = [0, 5, 11, 23, 59, 120]
-    labels = ["0–5", "6–11", "12–23", "24–59", "60+"]
-    df["Tranche d’âge"] = pd.cut(df["Âge (mois)"], bins=bins, labels=labels, include_lowest=True)
-    age_group_count = df["Tranche d’âge"].value_counts().sort_index()
-    st.bar_chart(age_group_count)
+    # Coupes du cube : pas de relecture des enfants ni d'analyse des libellés
+    afficher(st.session_state["cube"])
 else:
     st.info("➡️ Enregistrez des enfants pour visualiser les graphiques.")
+
+profilage.terminer()
+
+prechargement.prechauffer("openpyxl")
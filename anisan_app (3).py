@@ -1,14 +1,19 @@
 import streamlit as st
-import pandas as pd
 from datetime import date
+from anisan.classification import classer_enfant
+from anisan import prechargement, profilage
+from anisan.export import exporteur
+from anisan.pagination import SourceTableau, afficher_table
 
 st.set_page_config(page_title="ANISAN - Application Nutritionnelle", layout="centered")
+profilage.demarrer()
 
 st.title("🍼 Application ANISAN - Suivi Nutritionnel des Enfants")
 
 if "enfants" not in st.session_state:
     st.session_state["enfants"] = []
 
+profilage.etape("formulaire")
 st.markdown("### ➕ Ajouter un nouvel enfant")
 
 with st.form("formulaire_enfant"):
@@ -24,24 +29,7 @@ with st.form("formulaire_enfant"):
     submitted = st.form_submit_button("📨 Enregistrer")
 
 if submitted:
-    phase = ""
-    couleur = ""
-
-    if oedeme == "Oui" or pb <= 11.0:
-        phase = "Famine nutritionnelle"
-        couleur = "🔴"
-    elif pb <= 11.5:
-        phase = "Urgence nutritionnelle"
-        couleur = "🟥"
-    elif pb <= 12.5:
-        phase = "Crise nutritionnelle (MAM)"
-        couleur = "🟧"
-    elif pb <= 12.9:
-        phase = "Stress nutritionnel"
-        couleur = "🟨"
-    else:
-        phase = "Phase minimale"
-        couleur = "🟢"
+    statut, _ = classer_enfant(pb, oedeme, regle="ipc")
 
     enfant = {
         "Nom": nom,
@@ -52,41 +40,44 @@ if submitted:
         "PB (cm)": pb,
         "Œdème": oedeme,
         "Date de mesure": date_mesure.strftime("%d/%m/%Y"),
-        "Phase nutritionnelle": f"{couleur} {phase}"
+        "Phase nutritionnelle": statut
     }
 
     st.session_state["enfants"].append(enfant)
     st.success("✅ Données enregistrées avec succès !")
 
 # Section tableau
+profilage.etape("tableau")
 st.markdown("### 📊 Tableau des enfants enregistrés")
 
 if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    st.dataframe(df, use_container_width=True)
+    # Seule la page affichée est envoyée au navigateur
+    source = SourceTableau(st.session_state["enfants"], "Date de mesure")
+    afficher_table(source, "enfants", filtres=["Phase nutritionnelle", "Sexe"], colonne_date="Date de mesure",
+                   colonnes=list(source.df.columns))
 else:
     st.info("Aucun enfant enregistré pour l’instant.")
 
 
 # Boutons de téléchargement
+profilage.etape("export")
 st.markdown("### 📥 Exporter les données")
 
 if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    csv = df.to_csv(index=False).encode('utf-8')
-    excel = df.to_excel("enfants.xlsx", index=False)
-
     st.download_button(
         label="📄 Télécharger au format CSV",
-        data=csv,
+        data=exporteur(st.session_state["enfants"], "csv"),
         file_name='enfants_anisan.csv',
         mime='text/csv',
     )
 
-    with open("enfants.xlsx", "rb") as f:
-        st.download_button(
-            label="📊 Télécharger au format Excel",
-            data=f,
-            file_name="enfants_anisan.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+    st.download_button(
+        label="📊 Télécharger au format Excel",
+        data=exporteur(st.session_state["enfants"], "xlsx"),
+        file_name="enfants_anisan.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+profilage.terminer()
+
+prechargement.prechauffer("openpyxl")
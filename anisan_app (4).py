@@ -1,27 +1,73 @@
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import folium
-from streamlit_folium import st_folium
 from datetime import date
+from anisan.classification import classer_codes
+from anisan import geo, prechargement, profilage, surveillance, zscores
+from anisan.agregats import CATEGORIES, Agregats
+from anisan.registre import Registre
+from anisan.surveillance import Surveillance
+from anisan.suivi import Historiques, IndexIdentites, indicateurs
+from anisan.carte import CacheCouches, Pyramide, bornes_folium
+from anisan.export import FORMATS, exporteur
+from anisan.pagination import SourceTableau, afficher_table
 
 st.set_page_config(page_title="ANISAN - Suivi Nutritionnel", layout="wide")
+profilage.demarrer()
 
 st.title("🍼 ANISAN - Suivi Nutritionnel des Enfants au Sahel et en Afrique de l'Ouest")
 
-# Initialisation
-if "enfants" not in st.session_state:
-    st.session_state["enfants"] = []
-
-regions = ["Ziguinchor", "Dakar", "Thiès", "Kolda", "Saint-Louis", "Tambacounda", "Matam", "Kaolack"]
-
+# Initialisation : registre en colonnes typées (pas de liste de dictionnaires)
+if "registre" not in st.session_state:
+    st.session_state["registre"] = Registre(regle="mas_mam_129")
+# Statistiques tenues à jour à chaque ajout/suppression (pas de recalcul à chaque rerun)
+if "agregats" not in st.session_state:
+    st.session_state["agregats"] = Agregats()
+# Prévalences par région et par semaine, mises à jour de la même façon
+if "surveillance" not in st.session_state:
+    st.session_state["surveillance"] = Surveillance()
+# Chaque enregistrement est une visite, rattachée à un enfant (carte ou nom / sexe / naissance)
+if "identites" not in st.session_state:
+    st.session_state["identites"] = IndexIdentites()
+
+registre = st.session_state["registre"]
+
+# En-têtes de l'export CSV
+LIBELLES = {
+    "nom": "Nom", "sexe": "Sexe", "age": "Âge (mois)", "poids": "Poids (kg)", "taille": "Taille (cm)",
+    "pb": "PB (cm)", "whz": "WHZ", "oedeme": "Œdème", "region": "Région", "date": "Date de mesure",
+    "phase": "Phase nutritionnelle",
+}
+
+def suivre(enfant, signe=1):
+    """Répercute un ajout (signe 1) ou une suppression (-1) sur les statistiques et la surveillance."""
+    if signe > 0:
+        st.session_state["agregats"].ajouter(**mesures(enfant))
+        st.session_state["surveillance"].ajouter(enfant["pays"], enfant["region"], enfant["date"], enfant["categorie"])
+    else:
+        st.session_state["agregats"].retirer(**mesures(enfant))
+        st.session_state["surveillance"].retirer(enfant["pays"], enfant["region"], enfant["date"], enfant["categorie"])
+
+def mesures(enfant):
+    # HAZ et WAZ recalculés à partir des mesures : même valeur à l'ajout et au retrait
+    haz = float(zscores.haz([enfant["taille"]], [enfant["age"]], [enfant["sexe"]])[0])
+    waz = float(zscores.waz([enfant["poids"]], [enfant["age"]], [enfant["sexe"]])[0])
+    return dict(pays=enfant["pays"], region=enfant["region"], age=enfant["age"], sexe=enfant["sexe"],
+                categorie=enfant["categorie"], pb=enfant["pb"], poids=enfant["poids"],
+                taille=enfant["taille"], whz=enfant["whz"], haz=haz, waz=waz)
+
+# Tableau de bord du Sénégal : régions et coordonnées viennent du référentiel partagé
+PAYS = "Sénégal"
+reference = geo.reference()
+regions = reference.regions(PAYS)
+
+profilage.etape("formulaire")
 st.markdown("## ➕ Ajouter un nouvel enfant")
 
 with st.form("formulaire_enfant"):
     col1, col2 = st.columns(2)
     with col1:
         nom = st.text_input("Nom de l’enfant")
+        code = st.text_input("N° de carte (facultatif)")
         sexe = st.selectbox("Sexe", ["M", "F"])
         age = st.number_input("Âge (en mois)", min_value=0, max_value=120, step=1)
         region = st.selectbox("Région", regions)
@@ -35,96 +81,135 @@ with st.form("formulaire_enfant"):
     submitted = st.form_submit_button("📨 Enregistrer")
 
 if submitted:
-    if oedeme == "Oui" or pb < 11.5:
-        phase = "MAS (Aiguë sévère)"
-        couleur = "🔴🔴"
-    elif 11.5 <= pb < 12.5:
-        phase = "MAM (Aiguë modérée)"
-        couleur = "🟠"
-    elif 12.5 <= pb < 12.9:
-        phase = "Stress nutritionnel"
-        couleur = "🟡"
-    else:
-        phase = "Phase minimale"
-        couleur = "🟢"
-
-    enfant = {
-        "Nom": nom,
-        "Sexe": sexe,
-        "Âge (mois)": age,
-        "Poids (kg)": poids,
-        "Taille (cm)": taille,
-        "PB (cm)": pb,
-        "Œdème": oedeme,
-        "Région": region,
-        "Date de mesure": date_mesure.strftime("%d/%m/%Y"),
-        "Phase nutritionnelle": f"{couleur} {phase}"
-    }
-    st.session_state["enfants"].append(enfant)
+    whz = float(zscores.whz([poids], [taille], [age], [sexe])[0])
+    latitude, longitude = reference.coordonnees(PAYS, region)
+    phase = int(classer_codes([pb], [oedeme], regle="mas_mam_129", whz=[whz])[0])
+
+    identifiant = registre.ajouter(nom, sexe, age, poids, taille, pb, oedeme, region, date_mesure, phase,
+                                   whz=round(whz, 2), pays=PAYS, latitude=latitude, longitude=longitude)
+    st.session_state["identites"].identifier(identifiant, nom, sexe, date_mesure, age, code=code.strip() or None)
+    suivre(registre.enfant(identifiant))
     st.success("✅ Données enregistrées avec succès !")
 
 # Analyse et visualisation
+profilage.etape("statistiques")
 st.markdown("## 📊 Statistiques Nutritionnelles")
 
-if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    total = len(df)
-    mam = df["Phase nutritionnelle"].str.contains("MAM").sum()
-    mas = df["Phase nutritionnelle"].str.contains("MAS").sum()
-    pb_moy = df["PB (cm)"].mean()
-    poids_moy = df["Poids (kg)"].mean()
-    taille_moy = df["Taille (cm)"].mean()
+if len(registre):
+    stats = st.session_state["agregats"].resume()
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("👶 Total enfants", total)
-    col2.metric("🟠 % MAM", f"{(mam/total)*100:.1f}%")
-    col3.metric("🔴 % MAS", f"{(mas/total)*100:.1f}%")
+    col1.metric("👶 Total enfants", stats["total"])
+    col2.metric("🟠 % MAM", f"{stats['% MAM']:.1f}%")
+    col3.metric("🔴 % MAS", f"{stats['% MAS']:.1f}%")
 
     col4, col5, col6 = st.columns(3)
-    col4.metric("📏 PB moyen", f"{pb_moy:.1f} cm")
-    col5.metric("⚖️ Poids moyen", f"{poids_moy:.1f} kg")
-    col6.metric("📐 Taille moyenne", f"{taille_moy:.1f} cm")
-
+    col4.metric("📏 PB moyen", f"{stats['pb_moyen']:.1f} cm")
+    col5.metric("⚖️ Poids moyen", f"{stats['poids_moyen']:.1f} kg")
+    col6.metric("📐 Taille moyenne", f"{stats['taille_moyen']:.1f} cm")
+
+    # Aucun z-score plausible (mesures hors des tables OMS) : pas de moyenne
+    moyenne_z = lambda cle: f"{stats[cle]:.2f}" if stats[cle] == stats[cle] else "–"
+    col7, col8, col9, col10 = st.columns(4)
+    col7.metric("📉 WHZ moyen", moyenne_z("whz_moyen"))
+    col8.metric("⚠️ % émaciation (WHZ < -2)", f"{stats['% emacies']:.1f}%")
+    col9.metric("📏 HAZ moyen", moyenne_z("haz_moyen"))
+    col10.metric("⚖️ WAZ moyen", moyenne_z("waz_moyen"))
+
+    profilage.etape("surveillance")
+    st.markdown("## 📉 Surveillance hebdomadaire")
+    # Fenêtres glissantes lues dans les compteurs par semaine : pas de parcours du registre
+    surveillance.afficher(st.session_state["surveillance"])
+
+    profilage.etape("suivi")
+    st.markdown("## 🩺 Suivi PCIMA")
+    # Historiques par enfant (contigus), recalculés seulement après un ajout ou une suppression
+    if st.session_state.get("historiques_version") != registre.version:
+        vue = registre.vue()
+        enfants = st.session_state["identites"].enfants_de(vue["id"].to_numpy())
+        st.session_state["historiques"] = Historiques(enfants, vue["date"].to_numpy(), poids=vue["poids"].to_numpy(),
+                                                      pb=vue["pb"].to_numpy())
+        categories = registre.codes_categories()
+        st.session_state["malnutris"] = (categories >= 0) & (categories < CATEGORIES.index("Normal"))
+        st.session_state["historiques_version"] = registre.version
+    historiques = st.session_state["historiques"]
+    resultats = indicateurs(historiques.issues(st.session_state["malnutris"], reference=date.today()))
+
+    # Taux calculés sur les enfants sortis du programme ; aucun sorti : pas de taux
+    taux = lambda issue: f"{resultats['% ' + issue]:.1f}%" if resultats["sortis"] else "–"
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🧒 Admis", resultats["admis"])
+    col2.metric("✅ % guéris", taux("guéri"), help="Norme Sphère : > 75 %")
+    col3.metric("🚶 % abandons", taux("abandon"), help="Norme Sphère : < 15 %")
+    col4.metric("⏳ % non-répondants", taux("non-répondant"))
+
+    vitesses = historiques.vitesses().reset_index()
+    vitesses.insert(1, "nom", [st.session_state["identites"].noms[k] for k in vitesses["enfant"]])
+    afficher_table(SourceTableau(vitesses, "admission"), "vitesses", colonne_date="admission",
+                   colonnes=list(vitesses.columns), tri="gain (g/kg/j)")
+    enfant = st.selectbox("Historique d'un enfant", vitesses["enfant"], index=None, key="historique_enfant",
+                          format_func=lambda k: st.session_state["identites"].noms[k])
+    if enfant is not None:
+        st.line_chart(historiques.visites(enfant).set_index("date"))
+
+    profilage.etape("carte")
     st.markdown("## 🗺️ Répartition géographique")
-    region_counts = df["Région"].value_counts().reset_index()
-    region_counts.columns = ["Région", "Nombre"]
+    import folium
+    from streamlit_folium import st_folium
+    # Agrégats par cellule de grille : seules les cellules visibles partent au navigateur
+    if st.session_state.get("pyramide_version") != registre.version:
+        st.session_state["pyramide"] = Pyramide(registre.colonne("latitude"), registre.colonne("longitude"),
+                                                registre.codes_categories())
+        st.session_state["pyramide_version"] = registre.version
+    etat = st.session_state.get("carte") or {}
+    zoom = etat.get("zoom") or 6
+    centre = etat.get("center") or {"lat": 14.5, "lng": -14.5}
+    cellules = st.session_state["pyramide"].visibles(zoom, bornes_folium(etat))
+    # Couche des marqueurs mémorisée par empreinte des cellules (LRU) ; la carte de
+    # fond ne contient que les tuiles et n'est jamais rechargée par le navigateur
+    if "couches" not in st.session_state:
+        st.session_state["couches"] = CacheCouches()
+    couche = st.session_state["couches"].obtenir(cellules)
     m = folium.Map(location=[14.5, -14.5], zoom_start=6)
-    coords = {
-        "Ziguinchor": [12.5, -16.3],
-        "Dakar": [14.7, -17.5],
-        "Thiès": [14.8, -16.9],
-        "Kolda": [12.9, -14.9],
-        "Saint-Louis": [16.0, -16.5],
-        "Tambacounda": [13.8, -13.7],
-        "Matam": [15.3, -13.3],
-        "Kaolack": [14.2, -16.1]
-    }
-    for _, row in region_counts.iterrows():
-        nom = row["Région"]
-        n = row["Nombre"]
-        if nom in coords:
-            folium.CircleMarker(
-                location=coords[nom],
-                radius=10,
-                popup=f"{nom} : {n} cas",
-                color="blue",
-                fill=True,
-                fill_color="blue"
-            ).add_to(m)
-    st_folium(m, width=700, height=400)
+    st_folium(m, width=700, height=400, key="carte", zoom=zoom, center=(centre["lat"], centre["lng"]),
+              feature_group_to_add=couche, returned_objects=["bounds", "zoom", "center"])
 
+    profilage.etape("tableau")
     st.markdown("## 🧾 Tableau des enfants")
-    for i, enfant in enumerate(st.session_state["enfants"]):
-        st.write(f"**{i+1}.** {enfant['Nom']} ({enfant['Phase nutritionnelle']}) – {enfant['Région']}")
-        if st.button(f"🗑️ Supprimer {enfant['Nom']}", key=f"delete_{i}"):
-            st.session_state["enfants"].pop(i)
-            st.experimental_rerun()
+    # Filtres, tri et découpage côté serveur : seule la page courante part vers le navigateur
+    afficher_table(SourceTableau(registre.vue(), "date"), "enfants", filtres=["region", "phase"], colonne_date="date",
+                   colonnes=["id", "nom", "sexe", "age", "pb", "phase", "region", "date"])
+
+    # Un seul bouton : l'enfant est choisi par recherche, pas un bouton par ligne
+    st.markdown("### 🗑️ Supprimer un enfant")
+    recherche = st.text_input("Rechercher par nom", key="recherche_suppression")
+    trouves = registre.rechercher_nom(recherche)
+    choix = st.selectbox("Enfant à supprimer", trouves, key="choix_suppression",
+                         format_func=lambda i: "{nom} ({phase}) – {region} · n°{id}".format(**registre.enfant(i)))
+    if choix is not None and st.button("🗑️ Supprimer", key="supprimer_enfant"):
+        suivre(registre.supprimer(choix), -1)
+        st.rerun()
 
 else:
     st.info("Aucun enfant enregistré pour l’instant.")
 
+profilage.etape("export")
 st.markdown("## 📥 Exporter les données")
-if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("📄 Télécharger CSV", csv, "enfants_anisan.csv", mime="text/csv")
+def tableau_export():
+    df = registre.vue()[list(LIBELLES)].rename(columns=LIBELLES)
+    df["Date de mesure"] = df["Date de mesure"].dt.strftime("%d/%m/%Y")
+    return df
+
+if len(registre):
+    regions_export = st.multiselect("Régions à exporter (toutes si vide)", regions, key="regions_export")
+    filtre = (lambda bloc: bloc["Région"].isin(regions_export)) if regions_export else None
+    colonnes = st.columns(3)
+    for colonne, (format, libelle) in zip(colonnes, [("csv", "📄 Télécharger CSV"), ("xlsx", "📊 Télécharger Excel"),
+                                                     ("parquet", "🧱 Télécharger Parquet")]):
+        mime, extension = FORMATS[format]
+        colonne.download_button(libelle, exporteur(tableau_export, format, filtre=filtre),
+                                f"enfants_anisan{extension}", mime=mime)
+
+profilage.terminer()
+
+prechargement.prechauffer("folium", "streamlit_folium", "openpyxl")
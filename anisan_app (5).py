@@ -1,8 +1,12 @@
 import streamlit as st
-import pandas as pd
 from datetime import date
+from anisan.classification import classer_enfant
+from anisan import prechargement, profilage
+from anisan.export import exporteur
+from anisan.pagination import SourceTableau, afficher_table
 
 st.set_page_config(page_title="ANISAN - Application Nutritionnelle", layout="centered")
+profilage.demarrer()
 
 st.title("🍼 Application ANISAN - Suivi Nutritionnel des Enfants")
 
@@ -11,6 +15,7 @@ if "enfants" not in st.session_state:
     st.session_state["enfants"] = []
 
 # Formulaire de saisie
+profilage.etape("formulaire")
 st.markdown("### ➕ Ajouter un nouvel enfant")
 
 with st.form("formulaire_enfant"):
@@ -25,24 +30,7 @@ with st.form("formulaire_enfant"):
     submitted = st.form_submit_button("📨 Enregistrer")
 
 if submitted:
-    phase = ""
-    couleur = ""
-
-    if oedeme == "Oui" or pb <= 11.0:
-        phase = "Famine nutritionnelle"
-        couleur = "🔴"
-    elif pb <= 11.5:
-        phase = "Urgence nutritionnelle"
-        couleur = "🟥"
-    elif pb <= 12.5:
-        phase = "Crise nutritionnelle (MAM)"
-        couleur = "🟧"
-    elif pb <= 12.9:
-        phase = "Stress nutritionnel"
-        couleur = "🟨"
-    else:
-        phase = "Phase minimale"
-        couleur = "🟢"
+    statut, _ = classer_enfant(pb, oedeme, regle="ipc")
 
     enfant = {
         "Nom": nom,
@@ -53,37 +41,38 @@ if submitted:
         "PB (cm)": pb,
         "Œdème": oedeme,
         "Date de mesure": date_mesure.strftime("%d/%m/%Y"),
-        "Statut nutritionnel": f"{couleur} {phase}"
+        "Statut nutritionnel": statut
     }
 
     st.session_state["enfants"].append(enfant)
     st.success("✅ Données enregistrées avec succès !")
 
 # Affichage du tableau des enfants enregistrés
+profilage.etape("tableau")
 st.markdown("### 📊 Tableau des enfants enregistrés")
 
 if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    st.dataframe(df, use_container_width=True)
+    # Seule la page affichée est envoyée au navigateur
+    source = SourceTableau(st.session_state["enfants"], "Date de mesure")
+    afficher_table(source, "enfants", filtres=["Statut nutritionnel", "Sexe"], colonne_date="Date de mesure",
+                   colonnes=list(source.df.columns))
 
-    # Export CSV
-    csv = df.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="📄 Télécharger les données (CSV)",
-        data=csv,
+        data=exporteur(st.session_state["enfants"], "csv"),
         file_name='donnees_anisan.csv',
         mime='text/csv',
     )
 
-    # Export Excel
-    excel_path = "donnees_anisan.xlsx"
-    df.to_excel(excel_path, index=False)
-    with open(excel_path, "rb") as f:
-        st.download_button(
-            label="📊 Télécharger les données (Excel)",
-            data=f,
-            file_name="donnees_anisan.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+    st.download_button(
+        label="📊 Télécharger les données (Excel)",
+        data=exporteur(st.session_state["enfants"], "xlsx"),
+        file_name="donnees_anisan.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
 else:
     st.info("Aucune donnée enregistrée pour le moment.")
+
+profilage.terminer()
+
+prechargement.prechauffer("openpyxl")
@@ -1,49 +1,32 @@
 import streamlit as st
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-
-# Entraînement modèle IA
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-X = [[6.0, 5.2, 60.0, 11.2, 0.0, 1.0], [12.0, 7.8, 72.0, 13.4, 0.0, 0.0], 
-     [24.0, 10.5, 85.0, 14.1, 0.0, 1.0], [18.0, 8.0, 75.0, 12.0, 1.0, 1.0], 
-     [36.0, 12.0, 90.0, 15.0, 0.0, 0.0], [9.0, 6.0, 65.0, 11.0, 1.0, 1.0], 
-     [30.0, 11.0, 88.0, 14.0, 0.0, 0.0], [15.0, 7.5, 70.0, 12.5, 1.0, 0.0], 
-     [21.0, 9.0, 78.0, 13.0, 0.0, 1.0], [27.0, 10.0, 83.0, 13.5, 0.0, 1.0]]
-y = [2, 0, 0, 1, 0, 2, 0, 1, 1, 0]
-model.fit(X, y)
-
+import pandas as pd
+from anisan.modele import dernier_artefact, obtenir_artefact, predire_un
+from anisan.inference import CODES_CLASSES, PHASES, RECOMMANDATIONS, soumettre_lot
+from anisan import prechargement, profilage
+from anisan.export import exporteur
+from anisan.pagination import SourceTableau, afficher_table
+
+# Modèle IA : artefact versionné, entraîné hors ligne (python -m anisan.entrainement)
+def charger_modele():
+    chemin = dernier_artefact()
+    if chemin is None:
+        st.error("Aucun modèle entraîné. Lancez : python -m anisan.entrainement --demo")
+        st.stop()
+    return obtenir_artefact(chemin)
+
+@profilage.chronometre()
 def predire_nutrition(age, poids, taille, pb, oedeme, sexe):
-    data = np.array([[age, poids, taille, pb, oedeme, sexe]])
-    prediction = model.predict(data)[0]
-    probabilites = model.predict_proba(data)[0]
-
-    phases = {
-        0: ("🟢 Bon", "Statut nutritionnel normal"),
-        1: ("🟡 MAM", "Malnutrition aiguë modérée"),
-        2: ("🔴 MAS", "Malnutrition aiguë sévère")
-    }
-
-    recommandations = {
-        0: (
-            "✅ L’enfant présente un bon état nutritionnel.",
-            "🔁 Maintenez une alimentation équilibrée : allaitement exclusif jusqu’à 6 mois, puis diversification avec des aliments riches en énergie, protéines, fer, vitamine A.",
-            "📅 Continuez le suivi mensuel de la croissance (poids, taille, PB)."
-        ),
-        1: (
-            "⚠️ L’enfant est en malnutrition aiguë modérée (MAM).",
-            "🍲 Enrichissez son alimentation avec des bouillies fortifiées, purée d’arachide, poisson, œufs, huile.",
-            "🏥 Consultez un agent de santé pour un appui communautaire (PCMA)."
-        ),
-        2: (
-            "🚨 L’enfant est en malnutrition aiguë sévère (MAS).",
-            "🏥 Consultez immédiatement un centre CRENAS ou CRENI pour une prise en charge thérapeutique.",
-            "🍽️ Donnez-lui des aliments thérapeutiques prêts à l’emploi (ATPE) si disponibles, et assurez un suivi médical rigoureux."
-        )
-    }
-
-    return phases[prediction], probabilites, recommandations[prediction]
+    model = charger_modele()["modele"]
+    prediction, probabilites = predire_un(model, [age, poids, taille, pb, oedeme, sexe])
+    # Probabilités remises dans l'ordre Bon / MAM / MAS, quel que soit l'ordre des classes
+    probas = np.zeros(len(PHASES))
+    probas[[CODES_CLASSES[c] for c in model.classes_.tolist()]] = probabilites
+    code = CODES_CLASSES[prediction]
+    return PHASES[code], probas, RECOMMANDATIONS[code]
 
 st.set_page_config(page_title="Prédiction nutritionnelle IA", page_icon="🧠")
+profilage.demarrer()
 st.title("🔬 Module IA - Prédiction nutritionnelle intégrée")
 
 st.markdown("Remplissez les champs ci-dessous pour évaluer le statut nutritionnel d’un enfant.")
@@ -63,6 +46,7 @@ with col2:
 oedeme_val = 1 if oedeme == "Oui" else 0
 sexe_val = 1 if sexe == "Garçon" else 0
 
+profilage.etape("prediction")
 if st.button("📊 Lancer la prédiction"):
     try:
         (label, description), probs, conseils = predire_nutrition(age, poids, taille, pb, oedeme_val, sexe_val)
@@ -89,3 +73,35 @@ if st.button("📊 Lancer la prédiction"):
 
     except Exception as e:
         st.error(f"Erreur lors de la prédiction : {e}")
+
+profilage.etape("lot")
+# 📂 Prédiction par lot (CSV : age, poids, taille, pb, oedeme, sexe)
+st.markdown("---")
+st.markdown("### 📂 Prédiction pour tout un fichier")
+fichier = st.file_uploader("Fichier CSV des enfants", type=["csv"])
+
+if fichier is not None and st.button("🚀 Lancer la prédiction par lot"):
+    enfants = pd.read_csv(fichier)
+    # Le calcul tourne dans le pool de threads : la page reste utilisable
+    artefact = charger_modele()
+    st.session_state["lot_ia"] = (enfants, soumettre_lot(artefact["modele"], enfants, artefact["meta"]["colonnes"]))
+
+if "lot_ia" in st.session_state:
+    enfants, travail = st.session_state["lot_ia"]
+    if not travail.done():
+        st.info(f"⏳ Prédiction en cours pour {len(enfants)} enfants...")
+        st.button("🔄 Actualiser")
+    elif travail.exception() is not None:
+        st.error(f"Erreur lors de la prédiction : {travail.exception()}")
+    else:
+        resultats = enfants.join(travail.result())
+        resultats["recommandations"] = resultats["recommandations"].str.join(" ")
+        st.success(f"✅ {len(resultats)} enfants évalués")
+        # Fichiers de plusieurs milliers d'enfants : affichage page par page
+        afficher_table(SourceTableau(resultats), "resultats", filtres=["phase"], colonnes=list(resultats.columns))
+        st.download_button("📄 Télécharger les résultats (CSV)", exporteur(resultats, "csv"),
+                           "predictions_anisan.csv", mime="text/csv")
+
+profilage.terminer()
+
+prechargement.prechauffer("sklearn.ensemble", modele=True)
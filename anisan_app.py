@@ -1,46 +1,38 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
-import pydeck as pdk
+from anisan.classification import categorie_de, classer_enfant
+from anisan.agregats import CATEGORIES
+from anisan.carte import agreger, couche_pydeck, vue_initiale
+from anisan import geo, prechargement, profilage, surveillance
+from anisan.export import exporteur
+from anisan.pagination import SourceTableau, afficher_table
+from anisan.surveillance import Surveillance
 
 # Configuration
 st.set_page_config(page_title="ANISAN", layout="centered")
+profilage.demarrer()
 
 st.title("🍼 Application ANISAN - Suivi Nutritionnel des Enfants")
 
-# Données des régions avec coordonnées géographiques
-pays_regions = {
-    "Bénin": ["Alibori", "Atacora", "Atlantique", "Borgou", "Collines", "Donga", "Kouffo", "Littoral", "Mono", "Ouémé", "Plateau", "Zou"],
-    "Burkina Faso": ["Boucle du Mouhoun", "Cascades", "Centre", "Centre-Est", "Centre-Nord", "Centre-Ouest", "Centre-Sud", "Est", "Hauts-Bassins", "Nord", "Plateau-Central", "Sahel", "Sud-Ouest"],
-    "Côte d'Ivoire": ["Abidjan", "Bas-Sassandra", "Comoé", "Denguélé", "Gôh-Djiboua", "Lacs", "Lagunes", "Montagnes", "Sassandra-Marahoué", "Savanes", "Vallée du Bandama", "Woroba", "Yamoussoukro", "Zanzan"],
-    "Niger": ["Agadez", "Diffa", "Dosso", "Maradi", "Niamey", "Tahoua", "Tillabéri", "Zinder"],
-    "Sénégal": ["Dakar", "Diourbel", "Fatick", "Kaffrine", "Kaolack", "Kédougou", "Kolda", "Louga", "Matam", "Saint-Louis", "Sédhiou", "Tambacounda", "Thiès", "Ziguinchor"],
-    "Togo": ["Centrale", "Kara", "Maritime", "Plateaux", "Savanes"],
-    "Mali": ["Bamako", "Gao", "Kayes", "Kidal", "Koulikoro", "Mopti", "Ségou", "Sikasso", "Tombouctou"],
-    "Guinée": ["Boké", "Conakry", "Faranah", "Kankan", "Kindia", "Labé", "Mamou", "Nzérékoré"],
-    "Gambie": ["Banjul", "Kanifing", "Brikama", "Mansa Konko", "Kerewan", "Kuntaur", "Janjanbureh", "Basse"],
-    "Ghana": ["Greater Accra", "Ashanti", "Brong-Ahafo", "Central", "Eastern", "Northern", "Upper East", "Upper West", "Volta", "Western"],
-    "Cap-Vert": ["Santiago", "São Vicente", "Santo Antão", "Fogo", "Brava", "Maio", "Sal", "Boa Vista"],
-    "Guinée-Bissau": ["Bafatá", "Biombo", "Bissau", "Bolama", "Cacheu", "Gabu", "Oio", "Quinara", "Tombali"],
-    "Tchad": ["N'Djamena", "Kanem", "Lac", "Logone Occidental", "Logone Oriental", "Mandoul", "Mayo-Kebbi Est", "Mayo-Kebbi Ouest", "Ouaddaï", "Salamat", "Tandjilé"],
-    "Mauritanie": ["Adrar", "Assaba", "Brakna", "Dakhlet Nouadhibou", "Gorgol", "Guidimakha", "Hodh Ech Chargui", "Hodh El Gharbi", "Inchiri", "Nouakchott Nord", "Nouakchott Ouest", "Nouakchott Sud", "Tagant", "Tiris Zemmour", "Trarza"],
-    "Nigeria": ["Abuja", "Lagos", "Kano", "Kaduna", "Rivers", "Oyo", "Benue", "Borno", "Edo", "Enugu", "Imo", "Ondo", "Osun", "Sokoto", "Zamfara"],
-    "Liberia": ["Bomi", "Bong", "Gbarpolu", "Grand Bassa", "Grand Cape Mount", "Grand Gedeh", "Grand Kru", "Lofa", "Margibi", "Maryland", "Montserrado", "Nimba", "River Cess", "River Gee", "Sinoe"],
-    "Sierra Leone": ["Eastern", "Northern", "Southern", "Western Area Rural", "Western Area Urban"]
-}
+# Référentiel géographique partagé (pays, régions, coordonnées), chargé une fois
+reference = geo.reference()
 
 # Interface utilisateur
-pays = st.selectbox("Pays", list(pays_regions.keys()))
-region = st.selectbox("Région", pays_regions[pays])
+# Hors du formulaire : la liste des régions suit le pays choisi
+pays = st.selectbox("Pays", reference.pays)
+region = st.selectbox("Région", reference.regions(pays))
 # Initialisation de la session
 if "enfants" not in st.session_state:
     st.session_state.enfants = []
+# Prévalences par région et par semaine, incrémentées à chaque enregistrement
+if "surveillance" not in st.session_state:
+    st.session_state.surveillance = Surveillance()
 
+profilage.etape("formulaire")
 # 📋 Formulaire
 st.header("➕ Ajouter un enfant")
 with st.form("ajout_enfant"):
-    pays = st.selectbox("Pays", list(regions_coords.keys()))
-    region = st.selectbox("Région", list(regions_coords[pays].keys()))
     nom = st.text_input("Nom de l’enfant")
     sexe = st.radio("Sexe", ["M", "F"], horizontal=True)
     age = st.number_input("Âge (en mois)", min_value=0, max_value=60)
@@ -54,19 +46,12 @@ with st.form("ajout_enfant"):
 
 # 🔎 Analyse nutritionnelle
 def evaluer_statut(pb, oedeme):
-    if oedeme == "Oui" or pb < 11.5:
-        return "🔴 MAS (Malnutrition aiguë sévère)", "Fournir une alimentation thérapeutique d’urgence. Référer à un centre de santé immédiatement."
-    elif pb < 12.5:
-        return "🟠 MAM (Malnutrition aiguë modérée)", "Apporter un complément nutritionnel spécifique et surveiller l’état de santé."
-    elif pb < 13.0:
-        return "🟡 Stress nutritionnel", "Renforcer l’alimentation. Suivi mensuel recommandé."
-    else:
-        return "🟢 Bonne situation nutritionnelle", "Continuer une alimentation équilibrée. Contrôle régulier mensuel."
+    return classer_enfant(pb, oedeme, regle="mas_mam")
 
 # ✅ Enregistrement
 if valider:
     statut, conseil = evaluer_statut(pb, oedeme)
-    lat, lon = regions_coords[pays][region]
+    lat, lon = reference.coordonnees(pays, region)
     
     enfant = {
         "Nom": nom,
@@ -86,32 +71,56 @@ if valider:
     }
 
     st.session_state.enfants.append(enfant)
+    st.session_state.surveillance.ajouter(pays, region, date_mesure, categorie_de(statut, "mas_mam"))
     st.success("✅ Données enregistrées avec succès !")
 
+profilage.etape("tableau")
 # 📊 Tableau
 if st.session_state.enfants:
     df = pd.DataFrame(st.session_state.enfants)
     
     st.markdown("### 🗂️ Tableau de Suivi")
-    st.dataframe(df.drop(columns=["latitude", "longitude"]), use_container_width=True)
+    # Filtres, tri et découpage côté serveur : seule la page affichée part vers le navigateur
+    page = afficher_table(SourceTableau(df, "Date"), "suivi", filtres=["Région", "Statut"], colonne_date="Date",
+                          colonnes=[c for c in df.columns if c not in ("latitude", "longitude")])
 
+    profilage.etape("export")
     # 📥 Export CSV
     st.markdown("### 📥 Export des données")
     st.download_button(
         label="📄 Télécharger les données (CSV)",
-        data=df.to_csv(index=False).encode('utf-8'),
+        data=exporteur(df, "csv"),
         file_name="anisan_data.csv",
         mime="text/csv"
     )
 
     # 📌 Conseils
     st.markdown("### 📌 Conseils nutritionnels")
-    for e in st.session_state.enfants:
-        st.markdown(f"**{e['Nom']} ({e['Statut']})** : ✅ {e['Conseil']}")
+    # Un seul bloc Markdown, pour les enfants de la page affichée
+    st.markdown("\n".join(f"- **{e['Nom']} ({e['Statut']})** : ✅ {e['Conseil']}" for e in page.to_dict("records")))
 
+    profilage.etape("surveillance")
+    # 📉 Surveillance
+    st.markdown("### 📉 Surveillance hebdomadaire")
+    surveillance.afficher(st.session_state.surveillance)
+
+    profilage.etape("carte")
     # 🗺️ Carte de localisation
     st.markdown("### 🗺️ Carte de localisation des enfants")
-    geo_df = df.rename(columns={"latitude": "lat", "longitude": "lon"})
-    st.map(geo_df[['lat', 'lon']])
+    import pydeck as pdk
+    # Les enfants d'une même région partagent ses coordonnées : on envoie
+    # une pastille par cellule (effectif, part de MAS/MAM), pas un point par enfant
+    categories = {statut: CATEGORIES.index(categorie_de(statut, "mas_mam")) for statut in df["Statut"].unique()}
+    lat, lon, zoom = vue_initiale(df["latitude"], df["longitude"])
+    cellules = agreger(df["latitude"], df["longitude"], df["Statut"].map(categories), zoom)
+    st.pydeck_chart(pdk.Deck(
+        layers=[couche_pydeck(cellules)],
+        initial_view_state=pdk.ViewState(latitude=lat, longitude=lon, zoom=zoom),
+        tooltip={"text": "{n} enfants · MAS {pct_mas} % · MAM {pct_mam} %"},
+    ))
 else:
     st.info("📋 Enregistrez des enfants pour visualiser les tableaux et cartes.")
+
+profilage.terminer()
+
+prechargement.prechauffer("pydeck")
@@ -1,14 +1,13 @@
 import streamlit as st
-import streamlit as st
+from anisan import geo, prechargement, profilage
+from anisan.export import exporteur
+from anisan.pagination import SourceTableau, afficher_table
+
+profilage.demarrer()
 
-# Dictionnaire des pays et régions
-countries_regions = {
-    "Niger": ["Agadez", "Diffa", "Dosso", "Maradi", "Niamey",
-              "Tahoua", "Tillabéri", "Zinder"],
-    "Sénégal": ["Dakar", "Diourbel", "Fatick", "Kaffrine", "Kaolack", "Kédougou",
-                "Kolda", "Louga", "Matam", "Saint‑Louis", "Sédhiou",
-                "Tambacounda", "Thiès", "Ziguinchor"]
-}
+# Pays et régions du référentiel partagé (anisan/donnees/pays_regions_coords.json)
+reference = geo.reference()
+countries_regions = {pays: reference.regions(pays) for pays in ("Niger", "Sénégal")}
 
 # Initialisation session state
 if 'country' not in st.session_state:
@@ -35,28 +34,10 @@ st.selectbox(
     key='region'
 )
 
-# Dictionnaire des pays avec leurs régions
-countries_regions = {
-    "Niger": [
-        "Agadez", "Diffa", "Dosso", "Maradi", "Niamey",
-        "Tahoua", "Tillabéri", "Zinder"
-    ],
-    "Sénégal": [
-        "Dakar", "Diourbel", "Fatick", "Kaffrine", "Kaolack", "Kédougou",
-        "Kolda", "Louga", "Matam", "Saint-Louis", "Sédhiou",
-        "Tambacounda", "Thiès", "Ziguinchor"
-    ]
-}
-
-# Sélection du pays
-# Sélection de la région en fonction du pays
-selected_region = st.selectbox("Sélectionnez la région", countries_regions[selected_country])
+selected_region = st.session_state.region
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import folium
-from streamlit_folium import st_folium
 from datetime import date
 
 st.set_page_config(page_title="ANISAN - Suivi Nutritionnel", layout="wide")
@@ -67,8 +48,9 @@ st.title("🍼 ANISAN - Suivi Nutritionnel des Enfants au Sahel et en Afrique de
 if "enfants" not in st.session_state:
     st.session_state["enfants"] = []
 
-regions = ["Ziguinchor", "Dakar", "Thiès", "Kolda", "Saint-Louis", "Tambacounda", "Matam", "Kaolack"]
+regions = countries_regions[st.session_state.country]
 
+profilage.etape("formulaire")
 st.markdown("## ➕ Ajouter un nouvel enfant")
 
 with st.form("formulaire_enfant"):
@@ -117,6 +99,7 @@ if submitted:
     st.success("✅ Données enregistrées avec succès !")
 
 # Analyse et visualisation
+profilage.etape("statistiques")
 st.markdown("## 📊 Statistiques Nutritionnelles")
 
 if st.session_state["enfants"]:
@@ -138,26 +121,20 @@ if st.session_state["enfants"]:
     col5.metric("⚖️ Poids moyen", f"{poids_moy:.1f} kg")
     col6.metric("📐 Taille moyenne", f"{taille_moy:.1f} cm")
 
+    profilage.etape("carte")
     st.markdown("## 🗺️ Répartition géographique")
+    import folium
+    from streamlit_folium import st_folium
     region_counts = df["Région"].value_counts().reset_index()
     region_counts.columns = ["Région", "Nombre"]
     m = folium.Map(location=[14.5, -14.5], zoom_start=6)
-    coords = {
-        "Ziguinchor": [12.5, -16.3],
-        "Dakar": [14.7, -17.5],
-        "Thiès": [14.8, -16.9],
-        "Kolda": [12.9, -14.9],
-        "Saint-Louis": [16.0, -16.5],
-        "Tambacounda": [13.8, -13.7],
-        "Matam": [15.3, -13.3],
-        "Kaolack": [14.2, -16.1]
-    }
+
     for _, row in region_counts.iterrows():
         nom = row["Région"]
         n = row["Nombre"]
-        if nom in coords:
+        if nom in regions:
             folium.CircleMarker(
-                location=coords[nom],
+                location=reference.coordonnees(st.session_state.country, nom),
                 radius=10,
                 popup=f"{nom} : {n} cas",
                 color="blue",
@@ -166,18 +143,27 @@ if st.session_state["enfants"]:
             ).add_to(m)
     st_folium(m, width=700, height=400)
 
+    profilage.etape("tableau")
     st.markdown("## 🧾 Tableau des enfants")
-    for i, enfant in enumerate(st.session_state["enfants"]):
-        st.write(f"**{i+1}.** {enfant['Nom']} ({enfant['Phase nutritionnelle']}) – {enfant['Région']}")
-        if st.button(f"🗑️ Supprimer {enfant['Nom']}", key=f"delete_{i}"):
-            st.session_state["enfants"].pop(i)
-            st.experimental_rerun()
+    # Page courante seulement ; l'index du tableau est la position dans la liste de session
+    page = afficher_table(SourceTableau(df, "Date de mesure"), "enfants", filtres=["Région", "Phase nutritionnelle"],
+                          colonne_date="Date de mesure", colonnes=list(df.columns))
+    # Un seul bouton pour la page, pas un par enfant
+    choix = st.selectbox("Enfant à supprimer", list(page.index), index=None, key="choix_suppression",
+                         format_func=lambda i: f"{i + 1}. {df.at[i, 'Nom']} ({df.at[i, 'Phase nutritionnelle']}) – {df.at[i, 'Région']}")
+    if choix is not None and st.button("🗑️ Supprimer", key="supprimer_enfant"):
+        st.session_state["enfants"].pop(choix)
+        st.rerun()
 
 else:
     st.info("Aucun enfant enregistré pour l’instant.")
 
+profilage.etape("export")
 st.markdown("## 📥 Exporter les données")
 if st.session_state["enfants"]:
-    df = pd.DataFrame(st.session_state["enfants"])
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("📄 Télécharger CSV", csv, "enfants_anisan.csv", mime="text/csv")
+    st.download_button("📄 Télécharger CSV", exporteur(st.session_state["enfants"], "csv"), "enfants_anisan.csv",
+                       mime="text/csv")
+
+profilage.terminer()
+
+prechargement.prechauffer("folium", "streamlit_folium")
@@ -1,116 +1,156 @@
 import streamlit as st
 import pandas as pd
-import json
-import os
-import joblib
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
+from anisan import geo, noyau, prechargement, profilage
+from anisan.noyau import donner_recommandations, reevaluer_registre
+from anisan.importation import importer_enquete
+from anisan.modele import dernier_artefact, obtenir_artefact, predire_un
+from anisan.inference import executeur, preparer_entrees
+from anisan.pagination import afficher_table
 
 st.set_page_config(page_title="ANISAN", layout="centered")
+profilage.demarrer()
 
 # ---------- FONCTIONS ----------
-def charger_coords():
-    with open("pays_regions_coords.json", "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def charger_donnees():
-    if os.path.exists("enfants.json"):
-        with open("enfants.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-def enregistrer_donnees(data):
-    with open("enfants.json", "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def entrainer_modele():
-    X = [[24, 12.5, 8.2, 80], [36, 11.2, 7.5, 75], [18, 13.0, 8.5, 82], [30, 10.5, 7.2, 70]]
-    y = ["Normal", "MAS", "Normal", "MAM"]
-    model = RandomForestClassifier()
-    model.fit(X, y)
-    joblib.dump(model, "model.pkl")
+@profilage.chronometre()
+def enregistrer_donnees(enfant):
+    return noyau.enregistrer(enfant)
 
 def charger_modele():
-    if not os.path.exists("model.pkl"):
-        entrainer_modele()
-    return joblib.load("model.pkl")
-
-def faire_prediction(age, pb_cm, poids, taille):
-    model = charger_modele()
-    prediction = model.predict([[age, pb_cm, poids, taille]])[0]
-    proba = model.predict_proba([[age, pb_cm, poids, taille]])[0]
-    return prediction, proba
-
-def donner_recommandations(prediction):
-    if prediction == "MAS":
-        return "⚠️ L'enfant est en malnutrition aiguë sévère. Référez immédiatement au centre de santé pour prise en charge thérapeutique."
-    elif prediction == "MAM":
-        return "⚠️ L'enfant est en malnutrition aiguë modérée. Fournir des suppléments nutritionnels et un suivi rapproché."
-    else:
-        return "✅ L'état nutritionnel est normal. Poursuivre l’alimentation équilibrée et les consultations régulières."
+    # Le modèle est entraîné hors ligne : python -m anisan.entrainement
+    chemin = dernier_artefact()
+    if chemin is None:
+        st.error("Aucun modèle entraîné. Lancez : python -m anisan.entrainement --demo")
+        st.stop()
+    return obtenir_artefact(chemin)
+
+@profilage.chronometre()
+def faire_prediction(age, pb_cm, poids, taille, oedeme, sexe):
+    artefact = charger_modele()
+    enfant = pd.DataFrame([{"age": age, "poids": poids, "taille": taille, "pb": pb_cm, "oedeme": oedeme, "sexe": sexe}])
+    X = preparer_entrees(enfant, artefact["meta"]["colonnes"])
+    return predire_un(artefact["modele"], X[0])
 
 # ---------- INTERFACE UTILISATEUR ----------
+profilage.etape("formulaire")
 st.title("🧒🏽 ANISAN - Suivi Nutritionnel de l’Enfant")
 
-data_geo = charger_coords()
-donnees = charger_donnees()
+# Référentiel chargé une fois par processus, index pays → régions et (pays, région) → coordonnées
+reference = geo.reference()
+noyau.demarrer_archive()
 
-pays = st.selectbox("🌍 Sélectionner un pays", list(data_geo.keys()))
-regions = [r["region"] for r in data_geo[pays]]
-region = st.selectbox("📍 Sélectionner une région", regions)
-coords = next((r for r in data_geo[pays] if r["region"] == region), None)
+pays = st.selectbox("🌍 Sélectionner un pays", reference.pays)
+region = st.selectbox("📍 Sélectionner une région", reference.regions(pays))
+latitude, longitude = reference.coordonnees(pays, region)
 
 nom = st.text_input("Nom de l'enfant")
+sexe = st.radio("Sexe", ["M", "F"], horizontal=True)
 age = st.number_input("Âge (mois)", min_value=0, max_value=60, step=1)
 pb = st.number_input("Périmètre brachial (mm)", min_value=50.0, max_value=200.0, step=1.0)
 poids = st.number_input("Poids (kg)", min_value=2.0, max_value=30.0, step=0.1)
 taille = st.number_input("Taille (cm)", min_value=30.0, max_value=120.0, step=0.1)
+oedeme = st.radio("Œdème ?", ["Non", "Oui"], horizontal=True)
 
 if st.button("📥 Enregistrer et Analyser"):
     pb_cm = pb / 10  # conversion mm → cm
-    pred, proba = faire_prediction(age, pb_cm, poids, taille)
+    pred, proba = faire_prediction(age, pb_cm, poids, taille, oedeme, sexe)
     reco = donner_recommandations(pred)
 
     enfant = {
         "nom": nom,
+        "sexe": sexe,
         "age": age,
         "pb": pb,  # stocké en mm
         "poids": poids,
         "taille": taille,
+        "oedeme": oedeme,
         "pays": pays,
         "region": region,
-        "latitude": coords["latitude"],
-        "longitude": coords["longitude"],
+        "latitude": latitude,
+        "longitude": longitude,
         "prediction": pred,
         "recommandation": reco,
         "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
 
-    donnees.append(enfant)
-    enregistrer_donnees(donnees)
+    enfant["id"] = enregistrer_donnees(enfant)
 
     st.success(f"✅ Données enregistrées pour {nom}")
     st.info(f"**Évaluation IA :** {pred}")
     st.write(f"**Recommandation :** {reco}")
 
     st.map(pd.DataFrame([{
-        "lat": coords["latitude"],
-        "lon": coords["longitude"]
+        "lat": latitude,
+        "lon": longitude
     }], columns=["lat", "lon"]))
 
+profilage.etape("import")
+# ---------- IMPORT D'ENQUÊTE ----------
+st.subheader("📤 Importer une enquête (CSV / Excel)")
+fichier = st.file_uploader("Fichier d'enquête (une ligne par enfant)", type=["csv", "xlsx"])
+
+if fichier is not None and st.button("📤 Importer le fichier"):
+    barre = st.progress(0.0)
+    journal = st.empty()
+    rapport = None
+    for rapport in importer_enquete(fichier, fichier.name, noyau.stockage(), pays=pays, region=region,
+                                    coordonnees=reference.coordonnees_par_region):
+        if rapport["avancement"] is not None:
+            barre.progress(min(rapport["avancement"], 1.0))
+        journal.write(f"Lot {rapport['lot']} : {rapport['lues']} lignes lues, "
+                      f"{rapport['importees']} importées, {rapport['rejetees']} rejetées")
+    barre.progress(1.0)
+
+    if rapport is not None:
+        st.success(f"✅ {rapport['importees']} enfants importés depuis {fichier.name}")
+        if rapport["rejets"]:
+            st.warning(f"⚠️ {rapport['rejetees']} lignes rejetées")
+            st.dataframe(pd.DataFrame(rapport["rejets"]))
+
+profilage.etape("tableau")
 # ---------- TABLEAU DES DONNÉES ----------
 st.subheader("📊 Enregistrements existants")
 
-if donnees:
-    df = pd.DataFrame(donnees)
-    st.dataframe(df[["nom", "age", "pb", "poids", "taille", "pays", "region", "prediction", "date"]])
+if noyau.stockage().compter():
+    # Filtres, tri et découpage en SQL : seule la page affichée est lue et envoyée
+    page = afficher_table(noyau.stockage(), "registre", filtres=["pays", "region", "prediction"],
+                          colonne_date="date",
+                          colonnes=["id", "nom", "age", "pb", "poids", "taille", "pays", "region", "prediction", "date"])
+
+    if st.button("🔁 Réévaluer tout le registre avec le modèle actuel"):
+        st.session_state["reevaluation"] = executeur().submit(reevaluer_registre, charger_modele())
+    if "reevaluation" in st.session_state:
+        travail = st.session_state["reevaluation"]
+        if not travail.done():
+            st.info("⏳ Réévaluation en cours...")
+        elif travail.exception() is not None:
+            st.error(f"Erreur lors de la réévaluation : {travail.exception()}")
+        else:
+            st.success(f"✅ {travail.result()} enregistrements réévalués")
 
     st.subheader("🗑️ Supprimer un enregistrement")
-    noms = [e["nom"] for e in donnees]
-    choix_nom = st.selectbox("Choisir un enfant à supprimer", noms)
-    if st.button("Supprimer"):
-        donnees = [e for e in donnees if e["nom"] != choix_nom]
-        enregistrer_donnees(donnees)
-        st.success(f"Enregistrement pour {choix_nom} supprimé.")
+    # Suppression par identifiant, parmi les enfants de la page affichée : les homonymes ne sont pas touchés
+    enfants = dict(zip(page["id"], page.to_dict("records")))
+    choix = st.selectbox("Choisir un enfant à supprimer", list(enfants), key="choix_suppression",
+                         format_func=lambda i: "{nom} – {region} ({date}) · n°{id}".format(**enfants[i]))
+    if choix is not None and st.button("Supprimer"):
+        enfant = noyau.stockage().obtenir(choix)
+        if enfant is not None and noyau.supprimer(enfant):
+            st.success(f"Enregistrement n°{choix} ({enfant['nom']}) supprimé.")
 else:
     st.info("Aucun enregistrement disponible pour le moment.")
+
+profilage.etape("tendance")
+# ---------- TENDANCE PLURIANNUELLE ----------
+st.subheader("📈 Tendance annuelle (archive)")
+# Lue dans l'archive Parquet : seules la colonne « prediction » et les partitions du pays sont ouvertes
+historique = noyau.tendance(pays)
+if historique.empty:
+    st.info("L'archive est encore vide : elle est alimentée toutes les heures depuis le registre.")
+else:
+    st.line_chart(historique[["% MAS", "% MAM"]])
+    st.dataframe(historique.round(1))
+
+profilage.terminer()
+
+prechargement.prechauffer("sklearn.ensemble", "openpyxl", "scipy.spatial", modele=True)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from anisan import geo, zscores
+
+# ---------- ENFANTS SYNTHÉTIQUES ----------
+# Taille tirée autour de la médiane OMS pour l'âge (HAZ), poids autour de la
+# médiane pour la taille (WHZ), PB corrélé au WHZ et à l'âge : les phases
+# obtenues ressemblent à celles d'un dépistage sahélien (quelques % de MAS).
+HAZ_MOYEN, HAZ_ECART = -1.3, 1.1
+WHZ_MOYEN, WHZ_ECART = -0.6, 1.0
+TAUX_OEDEME = 0.01
+PREMIERE_DATE = np.datetime64("2022-01-01")
+JOURS = 3 * 365
+
+PRENOMS = ["Awa", "Fatou", "Aminata", "Mariam", "Aïcha", "Hawa", "Kadiatou", "Ramatou", "Zeinab", "Safiatou",
+           "Moussa", "Ibrahim", "Oumar", "Abdoulaye", "Mamadou", "Issa", "Seydou", "Boubacar", "Adama", "Souleymane"]
+NOMS = ["Diop", "Traoré", "Coulibaly", "Diallo", "Keïta", "Ouédraogo", "Sawadogo", "Mahamadou", "Issoufou",
+        "Abdou", "Ndiaye", "Sy", "Camara", "Sidibé", "Maïga", "Touré", "Cissé", "Barry", "Kaboré", "Idrissa"]
+
+
+def generer(n, graine=0):
+    """DataFrame de n enfants de 0 à 60 mois, aux colonnes du stockage (PB en cm)."""
+    alea = np.random.default_rng(graine)
+    age = alea.integers(0, 61, n)
+    sexe = np.where(alea.random(n) < 0.5, "M", "F")
+
+    haz = np.clip(alea.normal(HAZ_MOYEN, HAZ_ECART, n), -5, 3)
+    taille = zscores.mesure("hfa", haz, age, sexe)
+    # Tables de poids pour la taille couchée (45–110 cm) et debout (65–120 cm)
+    taille = np.clip(np.round(taille, 1), np.where(age < 24, 45.0, 65.0), np.where(age < 24, 110.0, 120.0))
+    whz = np.clip(alea.normal(WHZ_MOYEN, WHZ_ECART, n), -4.5, 3)
+    debout = age >= 24
+    poids = np.where(debout, zscores.mesure("wfh", whz, taille, sexe), zscores.mesure("wfl", whz, taille, sexe))
+    poids = np.round(poids, 1)
+
+    # PB : environ +1 cm par écart-type de WHZ et +0,5 cm par année d'âge
+    pb = np.round(np.clip(13.9 + 0.9 * whz + 0.04 * (age - 24) + alea.normal(0, 0.5, n), 8.0, 20.0), 1)
+    oedeme = np.where(alea.random(n) < TAUX_OEDEME, "Oui", "Non")
+
+    # Pays et régions du référentiel, coordonnées du chef-lieu légèrement dispersées
+    reference = geo.reference()
+    lieux = [(pays, region, *reference.coordonnees(pays, region))
+             for pays in reference.pays for region in reference.regions(pays)]
+    tirage = alea.integers(0, len(lieux), n)
+    lieux = pd.DataFrame(lieux, columns=["pays", "region", "latitude", "longitude"]).iloc[tirage]
+
+    return pd.DataFrame({
+        "nom": np.char.add(np.char.add(np.array(PRENOMS)[alea.integers(0, len(PRENOMS), n)], " "),
+                           np.array(NOMS)[alea.integers(0, len(NOMS), n)]),
+        "sexe": sexe,
+        "age": age,
+        "poids": poids,
+        "taille": taille,
+        "pb": pb,
+        "oedeme": oedeme,
+        "pays": lieux["pays"].to_numpy(),
+        "region": lieux["region"].to_numpy(),
+        "latitude": lieux["latitude"].to_numpy() + alea.normal(0, 0.3, n),
+        "longitude": lieux["longitude"].to_numpy() + alea.normal(0, 0.3, n),
+        "date": PREMIERE_DATE + alea.integers(0, JOURS, n).astype("timedelta64[D]"),
+    })
+
+
+def enregistrements(df):
+    """Liste de dictionnaires au format de app.py (PB en mm, date en texte)."""
+    df = df.assign(pb=df["pb"] * 10, date=pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d %H:%M:%S"))
+    return df.to_dict("records")
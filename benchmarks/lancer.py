@@ -0,0 +1,274 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generateur import enregistrements, generer
+
+# ---------- BANC D'ESSAI ----------
+# Chronomètre les chemins chauds des applications sur des enfants synthétiques
+# (1k / 100k / 1M) et écrit un rapport JSON comparable d'une version à l'autre :
+#   python -m benchmarks.lancer
+#   python -m benchmarks.lancer --tailles 1000 100000 --cas classification export_csv
+#   python -m benchmarks.lancer --reference benchmarks/resultats/ancien.json
+TAILLES = [1_000, 100_000, 1_000_000]
+REPETITIONS = 3
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(__file__), "resultats")
+
+# Les chemins appelés enfant par enfant (formulaires) sont mesurés sur un
+# échantillon ; le rapport donne le temps par ligne et le total extrapolé
+LIMITE_UNITAIRE = 200
+# openpyxl écrit quelques milliers de lignes par seconde : l'export Excel est plafonné
+LIMITE_XLSX = 20_000
+# Au-delà de ce rapport avec la référence, le cas est signalé comme régression
+SEUIL_REGRESSION = 1.2
+# ... et d'au moins cette durée : les cas de quelques microsecondes sont surtout du bruit
+ECART_MINIMAL = 0.001
+
+CAS = {}
+
+
+def cas(nom):
+    """Enregistre une fonction de préparation : (donnees, contexte) → [(libellé, fonction, lignes)]."""
+    def enregistrer(preparer):
+        CAS[nom] = preparer
+        return preparer
+
+    return enregistrer
+
+
+# ---------- CAS MESURÉS ----------
+@cas("classification")
+def _classification(df, contexte):
+    """Échelles de phases (tables de règles) sur des colonnes entières, et enfant par enfant."""
+    from anisan.classification import REGLES, classer, classer_enfant
+
+    mesures = [(f"classer[{regle}]", lambda regle=regle: classer(df["pb"], df["oedeme"], regle=regle), len(df))
+               for regle in REGLES]
+    echantillon = df.iloc[:LIMITE_UNITAIRE]
+    lignes = list(zip(echantillon["pb"].tolist(), echantillon["oedeme"].tolist()))
+    mesures.append(("classer_enfant", lambda: [classer_enfant(pb, oedeme, regle="ipc") for pb, oedeme in lignes],
+                    len(lignes)))
+    return mesures
+
+
+@cas("zscores")
+def _zscores(df, contexte):
+    """WHZ, HAZ et WAZ de colonnes entières, par les fonctions publiques du moteur."""
+    from anisan import zscores
+
+    return [("whz", lambda: zscores.whz(df["poids"], df["taille"], df["age"], df["sexe"]), len(df)),
+            ("haz", lambda: zscores.haz(df["taille"], df["age"], df["sexe"]), len(df)),
+            ("waz", lambda: zscores.waz(df["poids"], df["age"], df["sexe"]), len(df))]
+
+
+@cas("prediction")
+def _prediction(df, contexte):
+    """faire_prediction() de app.py et predire_nutrition() de anisan_app (7), puis la prédiction par lot."""
+    from anisan.inference import preparer_entrees, predire_lot
+    from anisan.modele import predire_un
+
+    artefact = contexte["artefact"]
+    modele, colonnes = artefact["modele"], artefact["meta"]["colonnes"]
+    echantillon = df.iloc[:LIMITE_UNITAIRE]
+    enfants = echantillon[colonnes].to_dict("records")
+
+    def faire_prediction():
+        # Corps de faire_prediction() : DataFrame d'une ligne, préparation, prédiction
+        for enfant in enfants:
+            predire_un(modele, preparer_entrees(pd.DataFrame([enfant]), colonnes)[0])
+
+    X = preparer_entrees(echantillon, colonnes)
+
+    def predire_nutrition():
+        for ligne in X.tolist():
+            predire_un(modele, ligne)
+
+    return [("faire_prediction", faire_prediction, len(enfants)),
+            ("predire_nutrition", predire_nutrition, len(X)),
+            ("predire_lot", lambda: predire_lot(modele, df, colonnes=colonnes), len(df))]
+
+
+@cas("tableau")
+def _tableau(df, contexte):
+    """Rerun de anisan_app (4) : vue du registre (DataFrame) et statistiques."""
+    from anisan import zscores
+    from anisan.agregats import Agregats
+    from anisan.classification import classer_codes
+    from anisan.registre import Registre
+
+    registre, agregats = Registre(regle="mas_mam_129", capacite=len(df)), Agregats()
+    whz = zscores.whz(df["poids"], df["taille"], df["age"], df["sexe"])
+    phases = classer_codes(df["pb"], df["oedeme"], regle="mas_mam_129", whz=whz)
+    colonnes = ["nom", "sexe", "age", "poids", "taille", "pb", "oedeme", "region"]
+    debut = time.perf_counter()
+    for (nom, sexe, age, poids, taille, pb, oedeme, region), jour, phase, z, pays in zip(
+            df[colonnes].itertuples(index=False, name=None), df["date"].dt.date, phases, whz, df["pays"]):
+        registre.ajouter(nom, sexe, age, poids, taille, pb, oedeme, region, jour, int(phase), whz=z, pays=pays)
+        agregats.ajouter(pays, region, age, sexe, registre.categories[phase], pb=pb, poids=poids, taille=taille, whz=z)
+    contexte["construction registre (s)"] = round(time.perf_counter() - debut, 3)
+    return [("registre.vue", registre.vue, len(df)),
+            ("agregats.resume", agregats.resume, len(df)),
+            ("agregats.resume[region]", lambda: agregats.resume(pays=df["pays"].iat[0], region=df["region"].iat[0]),
+             len(df))]
+
+
+@cas("export")
+def _export(df, contexte):
+    from anisan.export import csv_octets, parquet_octets, xlsx_octets
+
+    return [("export_csv", lambda: csv_octets(df), len(df)),
+            ("export_xlsx", lambda: xlsx_octets(df.iloc[:LIMITE_XLSX]), min(len(df), LIMITE_XLSX)),
+            ("export_parquet", lambda: parquet_octets(df), len(df))]
+
+
+@cas("stockage")
+def _stockage(df, contexte):
+    """enregistrer_donnees() de app.py et lecture de tout le registre, sur une base SQLite temporaire."""
+    from anisan.stockage import ouvrir_stockage
+
+    dossier = tempfile.mkdtemp(prefix="anisan-bench-")
+    contexte["dossiers"].append(dossier)
+    stockage = ouvrir_stockage(os.path.join(dossier, "enfants.db"))
+    contexte["stockages"].append(stockage)
+    lignes = enregistrements(df)
+    stockage.ajouter_lot(lignes)
+    echantillon = lignes[:LIMITE_UNITAIRE]
+    return [("enregistrer_donnees", lambda: [stockage.ajouter(e) for e in echantillon], len(echantillon)),
+            ("ajouter_lot", lambda: stockage.ajouter_lot(echantillon), len(echantillon)),
+            ("charger_donnees", stockage.tous, len(df))]
+
+
+# ---------- MESURE ----------
+def chronometrer(fonction, repetitions=REPETITIONS):
+    """Durées de `repetitions` appels, après un appel d'échauffement (imports, caches) non compté."""
+    fonction()
+    durees = []
+    for _ in range(repetitions):
+        gc.collect()
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def artefact_synthetique(graine=1):
+    """Forêt entraînée sur 5 000 enfants synthétiques, en mémoire (aucun fichier dans modeles/)."""
+    from anisan.entrainement import construire_jeu, entrainer
+    from anisan.inference import COLONNES_MODELE
+
+    donnees = generer(5_000, graine)
+    X, y = construire_jeu(donnees.assign(pb=donnees["pb"] * 10))
+    return {"modele": entrainer(X, y), "meta": {"colonnes": COLONNES_MODELE}}
+
+
+def environnement():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import pyarrow
+    import sklearn
+
+    return {
+        "commit": commit,
+        "cree_le": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "processeurs": os.cpu_count(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "scikit-learn": sklearn.__version__,
+                     "pyarrow": pyarrow.__version__},
+    }
+
+
+def lancer(tailles=TAILLES, noms=None, repetitions=REPETITIONS, graine=0):
+    """Rapport {environnement, resultats} : une ligne par (cas, taille)."""
+    noms = list(CAS) if not noms else noms
+    rapport = dict(environnement(), repetitions=repetitions, resultats=[], preparation={})
+    contexte = {"artefact": artefact_synthetique() if "prediction" in noms else None,
+                "dossiers": [], "stockages": []}
+    try:
+        for taille in tailles:
+            df = generer(taille, graine)
+            for nom in noms:
+                for libelle, fonction, lignes in CAS[nom](df, contexte):
+                    durees = chronometrer(fonction, repetitions)
+                    mediane = float(np.median(durees))
+                    resultat = {
+                        "cas": libelle, "taille": taille, "lignes": lignes,
+                        "mediane_s": round(mediane, 6), "min_s": round(min(durees), 6),
+                        "us_par_ligne": round(1e6 * mediane / lignes, 3) if lignes else None,
+                        # Sur échantillon : temps qu'aurait pris la taille complète
+                        "extrapole_s": round(mediane * taille / lignes, 3) if 0 < lignes < taille else None,
+                    }
+                    rapport["resultats"].append(resultat)
+                    print(f"{libelle:28} {taille:>9} {mediane:10.4f} s  {resultat['us_par_ligne']:>10} µs/ligne",
+                          flush=True)
+            for cle in [c for c in contexte if c.endswith("(s)")]:
+                rapport["preparation"][f"{cle} [{taille}]"] = contexte.pop(cle)
+    finally:
+        for stockage in contexte["stockages"]:
+            stockage.fermer()
+        for dossier in contexte["dossiers"]:
+            shutil.rmtree(dossier, ignore_errors=True)
+    return rapport
+
+
+def comparer(rapport, reference):
+    """Rapport des meilleurs temps par ligne (actuel / référence) par (cas, taille), et régressions.
+
+    Par ligne : les échantillons des cas unitaires peuvent changer de taille d'une version à l'autre.
+    """
+    anciens = {(r["cas"], r["taille"]): r["min_s"] / r["lignes"] for r in reference["resultats"] if r["lignes"]}
+    comparaison = []
+    for r in rapport["resultats"]:
+        ancien = anciens.get((r["cas"], r["taille"]))
+        if ancien and r["lignes"]:
+            rapport_temps = r["min_s"] / r["lignes"] / ancien
+            comparaison.append({"cas": r["cas"], "taille": r["taille"], "rapport": round(rapport_temps, 3),
+                                "regression": (rapport_temps > SEUIL_REGRESSION
+                                               and r["min_s"] - ancien * r["lignes"] > ECART_MINIMAL)})
+    return comparaison
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai ANISAN sur données synthétiques")
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES)
+    parser.add_argument("--cas", nargs="+", choices=list(CAS), help="cas à mesurer (tous par défaut)")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--sortie", help="rapport JSON (par défaut benchmarks/resultats/<date>-<commit>.json)")
+    parser.add_argument("--reference", help="rapport JSON d'une version précédente, pour comparaison")
+    args = parser.parse_args(arguments)
+
+    rapport = lancer(args.tailles, args.cas, args.repetitions, args.graine)
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            rapport["comparaison"] = comparer(rapport, json.load(f))
+        for ligne in rapport["comparaison"]:
+            alerte = "  ⚠️ régression" if ligne["regression"] else ""
+            print(f"{ligne['cas']:28} {ligne['taille']:>9}  × {ligne['rapport']:.2f}{alerte}")
+
+    sortie = args.sortie or os.path.join(
+        DOSSIER_RESULTATS, f"{datetime.now():%Y%m%d-%H%M%S}-{rapport['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f"✅ Rapport écrit dans {sortie}")
+    if any(ligne["regression"] for ligne in rapport.get("comparaison", [])):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import streamlit as st
+from anisan import noyau, profilage
+from anisan.carte import CacheCouches, bornes_folium, vue_initiale
+
+profilage.etape("carte")
+st.title("🗺️ Répartition géographique")
+synthese = noyau.synthese()
+synthese.actualiser()
+
+if not len(synthese.ids):
+    st.info("Aucun enregistrement disponible pour le moment.")
+    st.stop()
+
+import folium
+from streamlit_folium import st_folium
+
+# Agrégats par cellule de grille, partagés par toutes les sessions : seules les cellules visibles partent au navigateur
+pyramide = synthese.pyramide()
+latitude, longitude, zoom_initial = vue_initiale(synthese.latitude, synthese.longitude)
+etat = st.session_state.get("carte") or {}
+zoom = etat.get("zoom") or zoom_initial
+centre = etat.get("center") or {"lat": latitude, "lng": longitude}
+cellules = pyramide.visibles(zoom, bornes_folium(etat))
+# Couche des marqueurs mémorisée par empreinte des cellules (LRU) ; la carte de
+# fond ne contient que les tuiles et n'est jamais rechargée par le navigateur
+if "couches" not in st.session_state:
+    st.session_state["couches"] = CacheCouches()
+couche = st.session_state["couches"].obtenir(cellules)
+m = folium.Map(location=[latitude, longitude], zoom_start=zoom_initial)
+st_folium(m, height=500, use_container_width=True, key="carte", zoom=zoom, center=(centre["lat"], centre["lng"]),
+          feature_group_to_add=couche, returned_objects=["bounds", "zoom", "center"])
+st.caption(f"{len(cellules)} zones affichées · {len(synthese.ids)} enfants")
@@ -0,0 +1,72 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from anisan import noyau, profilage, zscores
+from anisan.classification import classer_enfant
+
+# ---------- FORMULAIRE ----------
+profilage.etape("formulaire")
+st.title("➕ Enregistrer un enfant")
+if noyau.URL_CENTRAL:
+    st.caption("📶 Saisie conservée sur ce poste, puis envoyée au serveur central dès que le réseau le permet.")
+
+reference = noyau.reference()
+pays = st.selectbox("🌍 Sélectionner un pays", reference.pays)
+region = st.selectbox("📍 Sélectionner une région", reference.regions(pays))
+latitude, longitude = reference.coordonnees(pays, region)
+
+nom = st.text_input("Nom de l'enfant")
+sexe = st.radio("Sexe", ["M", "F"], horizontal=True)
+age = st.number_input("Âge (mois)", min_value=0, max_value=60, step=1)
+pb = st.number_input("Périmètre brachial (mm)", min_value=50.0, max_value=200.0, step=1.0)
+poids = st.number_input("Poids (kg)", min_value=2.0, max_value=30.0, step=0.1)
+taille = st.number_input("Taille (cm)", min_value=30.0, max_value=120.0, step=0.1)
+oedeme = st.radio("Œdème ?", ["Non", "Oui"], horizontal=True)
+
+if st.button("📥 Enregistrer et Analyser"):
+    pb_cm = pb / 10  # conversion mm → cm
+    # Phase selon l'échelle des agrégats (PB, œdème, poids pour la taille)
+    whz = float(zscores.whz([poids], [taille], [age], [sexe])[0])
+    phase, conseil = classer_enfant(pb_cm, oedeme, regle=noyau.REGLE, whz=whz)
+
+    modele = noyau.artefact()
+    if modele is not None:
+        with profilage.section("faire_prediction"):
+            code, _ = noyau.predire(modele, {"age": age, "poids": poids, "taille": taille, "pb": pb_cm,
+                                             "oedeme": oedeme, "sexe": sexe})
+        pred = noyau.LIBELLES_PREDICTION[code]
+    else:
+        pred = None
+    reco = noyau.donner_recommandations(pred) if pred is not None else conseil
+
+    enfant = {
+        "nom": nom,
+        "sexe": sexe,
+        "age": age,
+        "pb": pb,  # stocké en mm
+        "poids": poids,
+        "taille": taille,
+        "oedeme": oedeme,
+        "pays": pays,
+        "region": region,
+        "latitude": latitude,
+        "longitude": longitude,
+        "prediction": pred,
+        "recommandation": reco,
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    with profilage.section("enregistrer_donnees"):
+        enfant["id"] = noyau.enregistrer(enfant)
+
+    st.success(f"✅ Données enregistrées pour {nom}")
+    st.info(f"**Phase :** {phase}")
+    if pred is not None:
+        st.info(f"**Évaluation IA :** {pred}")
+    else:
+        st.warning("Aucun modèle entraîné : seule la phase est donnée. Lancez : python -m anisan.entrainement --demo")
+    st.write(f"**Recommandation :** {reco}")
+
+    st.map(pd.DataFrame([{
+        "lat": latitude,
+        "lon": longitude
+    }], columns=["lat", "lon"]))
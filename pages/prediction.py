@@ -0,0 +1,80 @@
+import streamlit as st
+import pandas as pd
+from anisan import noyau, profilage
+from anisan.export import exporteur
+from anisan.inference import PHASES, RECOMMANDATIONS, soumettre_lot
+from anisan.pagination import SourceTableau, afficher_table
+
+profilage.etape("prediction")
+st.title("🧠 Module IA - Prédiction nutritionnelle intégrée")
+
+# Modèle IA : artefact versionné, entraîné hors ligne (python -m anisan.entrainement), partagé par le processus
+modele = noyau.artefact()
+if modele is None:
+    st.error("Aucun modèle entraîné. Lancez : python -m anisan.entrainement --demo")
+    st.stop()
+
+st.markdown("Remplissez les champs ci-dessous pour évaluer le statut nutritionnel d’un enfant.")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    age = st.number_input("Âge (mois)", min_value=0, max_value=60, value=12)
+    poids = st.number_input("Poids (kg)", min_value=2.0, max_value=25.0, value=6.5, step=0.1)
+    taille = st.number_input("Taille (cm)", min_value=40, max_value=120, value=70)
+
+with col2:
+    pb = st.number_input("Périmètre brachial (cm)", min_value=8.0, max_value=20.0, value=12.0, step=0.1)
+    oedeme = st.selectbox("Œdème", options=["Non", "Oui"])
+    sexe = st.radio("Sexe", options=["Garçon", "Fille"])
+
+if st.button("📊 Lancer la prédiction"):
+    try:
+        with profilage.section("predire_nutrition"):
+            code, probs = noyau.predire(modele, {"age": age, "poids": poids, "taille": taille, "pb": pb,
+                                                 "oedeme": oedeme, "sexe": sexe})
+        label, description = PHASES[code]
+
+        st.success(f"**Résultat : {label}**")
+        st.caption(f"{description}")
+
+        st.markdown("### 📈 Probabilités estimées par l’IA :")
+        st.write({
+            "Bon": f"{probs[0]*100:.1f}%",
+            "MAM": f"{probs[1]*100:.1f}%",
+            "MAS": f"{probs[2]*100:.1f}%"
+        })
+
+        st.markdown("### 🛡️ Recommandations personnalisées :")
+        for reco in RECOMMANDATIONS[code]:
+            st.write(reco)
+
+    except Exception as e:
+        st.error(f"Erreur lors de la prédiction : {e}")
+
+profilage.etape("lot")
+# 📂 Prédiction par lot (CSV : age, poids, taille, pb, oedeme, sexe)
+st.markdown("---")
+st.markdown("### 📂 Prédiction pour tout un fichier")
+fichier = st.file_uploader("Fichier CSV des enfants", type=["csv"])
+
+if fichier is not None and st.button("🚀 Lancer la prédiction par lot"):
+    enfants = pd.read_csv(fichier)
+    # Le calcul tourne dans le pool de threads : la page reste utilisable
+    st.session_state["lot_ia"] = (enfants, soumettre_lot(modele["modele"], enfants, modele["meta"]["colonnes"]))
+
+if "lot_ia" in st.session_state:
+    enfants, travail = st.session_state["lot_ia"]
+    if not travail.done():
+        st.info(f"⏳ Prédiction en cours pour {len(enfants)} enfants...")
+        st.button("🔄 Actualiser")
+    elif travail.exception() is not None:
+        st.error(f"Erreur lors de la prédiction : {travail.exception()}")
+    else:
+        resultats = enfants.join(travail.result())
+        resultats["recommandations"] = resultats["recommandations"].str.join(" ")
+        st.success(f"✅ {len(resultats)} enfants évalués")
+        # Fichiers de plusieurs milliers d'enfants : affichage page par page
+        afficher_table(SourceTableau(resultats), "resultats", filtres=["phase"], colonnes=list(resultats.columns))
+        st.download_button("📄 Télécharger les résultats (CSV)", exporteur(resultats, "csv"),
+                           "predictions_anisan.csv", mime="text/csv")
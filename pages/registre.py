@@ -0,0 +1,84 @@
+import streamlit as st
+import pandas as pd
+from anisan import noyau, profilage, synchro
+from anisan.export import exporteur
+from anisan.importation import importer_enquete
+from anisan.inference import executeur
+from anisan.pagination import afficher_table
+
+profilage.etape("tableau")
+st.title("🧾 Registre des enfants")
+stockage = noyau.stockage()
+
+# ---------- TABLEAU DES DONNÉES ----------
+if stockage.compter():
+    # Filtres, tri et découpage en SQL : seule la page affichée est lue et envoyée
+    page = afficher_table(stockage, "registre", filtres=["pays", "region", "prediction"], colonne_date="date",
+                          colonnes=["id", "nom", "age", "pb", "poids", "taille", "pays", "region", "prediction", "date"])
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("📄 CSV", exporteur(stockage.par_lots, "csv"), "registre_anisan.csv", mime="text/csv")
+    col2.download_button("📊 Excel", exporteur(stockage.par_lots, "xlsx"), "registre_anisan.xlsx",
+                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    col3.download_button("🗃️ Parquet", exporteur(stockage.par_lots, "parquet"), "registre_anisan.parquet",
+                         mime="application/octet-stream")
+
+    profilage.etape("reevaluation")
+    modele = noyau.artefact()
+    if modele is not None and st.button("🔁 Réévaluer tout le registre avec le modèle actuel"):
+        st.session_state["reevaluation"] = executeur().submit(noyau.reevaluer_registre, modele)
+    if "reevaluation" in st.session_state:
+        travail = st.session_state["reevaluation"]
+        if not travail.done():
+            st.info("⏳ Réévaluation en cours...")
+        elif travail.exception() is not None:
+            st.error(f"Erreur lors de la réévaluation : {travail.exception()}")
+        else:
+            st.success(f"✅ {travail.result()} enregistrements réévalués")
+
+    st.subheader("🗑️ Supprimer un enregistrement")
+    # Suppression par identifiant, parmi les enfants de la page affichée : les homonymes ne sont pas touchés
+    enfants = dict(zip(page["id"], page.to_dict("records")))
+    choix = st.selectbox("Choisir un enfant à supprimer", list(enfants), key="choix_suppression",
+                         format_func=lambda i: "{nom} – {region} ({date}) · n°{id}".format(**enfants[i]))
+    if choix is not None and st.button("Supprimer"):
+        # La page n'a pas toutes les colonnes : l'enregistrement complet est relu pour les agrégats
+        enfant = stockage.obtenir(choix)
+        if enfant is not None and noyau.supprimer(enfant):
+            st.success(f"Enregistrement n°{choix} ({enfant['nom']}) supprimé.")
+else:
+    st.info("Aucun enregistrement disponible pour le moment.")
+
+if noyau.URL_CENTRAL:
+    profilage.etape("synchronisation")
+    st.subheader("🔄 Synchronisation avec le serveur central")
+    synchro.afficher(stockage, noyau.URL_CENTRAL)
+
+profilage.etape("import")
+# ---------- IMPORT D'ENQUÊTE ----------
+st.subheader("📤 Importer une enquête (CSV / Excel)")
+reference = noyau.reference()
+col1, col2 = st.columns(2)
+pays = col1.selectbox("🌍 Pays par défaut", reference.pays, key="import_pays")
+region = col2.selectbox("📍 Région par défaut", reference.regions(pays), key="import_region")
+fichier = st.file_uploader("Fichier d'enquête (une ligne par enfant)", type=["csv", "xlsx"])
+
+if fichier is not None and st.button("📤 Importer le fichier"):
+    barre = st.progress(0.0)
+    journal = st.empty()
+    rapport = None
+    for rapport in importer_enquete(fichier, fichier.name, stockage, pays=pays, region=region,
+                                    coordonnees=reference.coordonnees_par_region):
+        if rapport["avancement"] is not None:
+            barre.progress(min(rapport["avancement"], 1.0))
+        journal.write(f"Lot {rapport['lot']} : {rapport['lues']} lignes lues, "
+                      f"{rapport['importees']} importées, {rapport['rejetees']} rejetées")
+    barre.progress(1.0)
+    # Les lignes importées rejoignent les agrégats du tableau de bord et de la carte
+    noyau.synthese().actualiser()
+
+    if rapport is not None:
+        st.success(f"✅ {rapport['importees']} enfants importés depuis {fichier.name}")
+        if rapport["rejets"]:
+            st.warning(f"⚠️ {rapport['rejetees']} lignes rejetées")
+            st.dataframe(pd.DataFrame(rapport["rejets"]))
@@ -0,0 +1,33 @@
+import streamlit as st
+from anisan import archive, cube, noyau, profilage, surveillance
+
+profilage.etape("statistiques")
+st.title("📊 Tableau de bord")
+# Agrégats communs à toutes les sessions : seuls les nouveaux enregistrements sont lus
+synthese = noyau.synthese()
+synthese.actualiser()
+
+if not len(synthese.cube):
+    st.info("Aucun enregistrement disponible pour le moment.")
+else:
+    cube.afficher(synthese.cube)
+
+    profilage.etape("surveillance")
+    st.markdown("## 📉 Surveillance hebdomadaire")
+    # Alerte si la MAG (MAS + MAM) dépasse 15 % ou augmente brutalement d'une fenêtre à l'autre
+    surveillance.afficher(synthese.surveillance)
+
+profilage.etape("tendance")
+# ---------- TENDANCE PLURIANNUELLE ----------
+st.markdown("## 📈 Tendance annuelle (archive)")
+reference = noyau.reference()
+pays = st.selectbox("🌍 Pays", reference.pays, key="tendance_pays")
+# Lue dans l'archive Parquet : seules la colonne « prediction » et les partitions du pays sont ouvertes
+historique = noyau.tendance(pays)
+if archive.DERNIER_PASSAGE["erreur"]:
+    st.warning(f"⚠️ Archivage en échec ({archive.DERNIER_PASSAGE['erreur']}) : la tendance peut être en retard.")
+if historique.empty:
+    st.info("L'archive est encore vide : elle est alimentée toutes les heures depuis le registre.")
+else:
+    st.line_chart(historique[["% MAS", "% MAM"]])
+    st.dataframe(historique.round(1))